@@ -1,13 +1,27 @@
 import os
-from backend.src.domain.models import InputData, OutputData
-from backend.src.domain.interfaces import IStorage, IEmotionDetector, IVideoFactory
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Counter, List, Optional
+
+from backend.src.domain.models import EmotionSegment, InputData, OutputData
+from backend.src.domain.interfaces import (
+    IEmotionDetector, IFaceCropper, IFaceCropStore, IImageReader, IStorage, IVideoFactory
+)
+from backend.src.application.cross_batch import CrossVideoBatcher
+from backend.src.application.dimensions import DimensionService
 from backend.src.application.frame import Frame
+from backend.src.application.realtime import RealTimeController
+from backend.src.application.summary import SummarySampler
+from backend.src.application.timeline import SegmentBuilder
 from backend.src.application.video import Video
 
 # TODO: We have dependency here from application to infrastructure layer. Fix it.
 from backend.src.infrastructure.file_utils import FileUtils
 
 from backend.src.infrastructure.logger import setup_logger
+from backend.src.infrastructure.memory_budget import MB, RESULT_BYTES, MemoryBudget
+from backend.src.infrastructure.tracing import tracer
 
 # TODO: Analzyer is dependent on infrastructure layer. It should depend on domain (interfaces) only.
 logger = setup_logger("core.analyzer.py")
@@ -20,6 +34,11 @@ class EmotionAnalyzer:
         input_data (InputData): Configuration and input paths.
         detector (IEmotionDetector): Service for emotion detection.
         storage (IStorage): Service for saving results.
+        video_factory (IVideoFactory): Factory creating video sources.
+        image_reader (IImageReader): Decoder for image directories (None = detector reads paths).
+        cropper (IFaceCropper): Face cropper of the optional crop store stage.
+        crop_store (IFaceCropStore): Keeps the face crops of analyzed video frames for re-scoring.
+        memory_budget (MemoryBudget): Bounds the frames and results held in memory (None = unbounded).
     """
 
     def __init__(
@@ -28,33 +47,91 @@ class EmotionAnalyzer:
         detector: IEmotionDetector,
         storage: IStorage,
         video_factory: IVideoFactory,
+        image_reader: Optional[IImageReader] = None,
+        cropper: Optional[IFaceCropper] = None,
+        crop_store: Optional[IFaceCropStore] = None,
+        memory_budget: Optional[MemoryBudget] = None,
     ):
         """Initializes the analyzer with dependencies."""
         self.input_data = input_data
         self.detector = detector
         self.storage = storage
         self.video_factory = video_factory
+        self.image_reader = image_reader
+        self.cropper = cropper
+        self.crop_store = crop_store
+        self.memory_budget = memory_budget
+        self._stop_event = threading.Event()
+
+        self.realtime: Optional[RealTimeController] = None
+        if input_data.realtime:
+            self.realtime = RealTimeController(
+                input_data.realtime, base_step=int(input_data.interval), workers=self._workers()
+            )
+
+    def request_stop(self):
+        """Asks a running analysis to stop after flushing the current results (thread/signal safe)."""
+        self._stop_event.set()
+
+    @property
+    def stop_requested(self) -> bool:
+        return self._stop_event.is_set()
+
+    def process_video(self, video_path: str) -> bool:
+        """
+        Analyzes a single video file and appends its results to storage.
+
+        Returns:
+            bool: True if the whole video was analyzed; False if it failed or a stop
+            ended it early (its partial results are written all the same).
+        """
+        completed = self._process_video(video_path)
+        if self.crop_store:
+            self.crop_store.flush()
+        return completed
 
     def run(self):
         """Executes the analysis workflow for images or videos."""
-        logger.info(f"Starting analysis on {self.input_data.video_path}")
+        logger.info(f"Starting analysis on {self.input_data.image_path or self.input_data.video_path}")
 
         
         try:
             if self.input_data.image_path:
-                self._process_image(self.input_data.image_path) 
+                if os.path.isdir(self.input_data.image_path):
+                    self._process_image_directory(self.input_data.image_path)
+                else:
+                    self._process_image(self.input_data.image_path)
             elif self.input_data.video_path:
                 if os.path.isdir(self.input_data.video_path):
                     self._process_directory(self.input_data.video_path)
                 else:
-                    self._process_video(self.input_data.video_path)     
+                    if self.realtime:
+                        self._plan_single_video_realtime(self.input_data.video_path)
+                    self._process_video(self.input_data.video_path)
             else:
                 logger.error("No input image or video directory specified.")
                 return
         except Exception as e:
             logger.error(f"Error during analysis: {e}")
 
-        
+        self.storage.flush()
+        if self.crop_store:
+            self.crop_store.flush()
+
+        detector_stats = self.detector.get_stats()
+        if detector_stats:
+            logger.info(f"Detector stats: {detector_stats}")
+
+        if self.realtime:
+            logger.info(f"Real-time mode: {self.realtime.report()}")
+
+        if self.memory_budget:
+            report = self.memory_budget.report()
+            logger.info(
+                f"Memory: peak {report['peak_bytes'] / MB:.1f} MB of frames and results "
+                f"(budget {report['max_bytes'] / MB:.0f} MB), peak RSS {report['peak_rss_bytes'] / MB:.0f} MB"
+            )
+
     def _process_image(self, image_path: str):
 
         logger.info(f"Analyzing single image: {image_path}")
@@ -80,32 +157,181 @@ class EmotionAnalyzer:
             logger.error(f"Failed to process image {image_path}: {e}")
     
 
-    def _process_video(self, video_path: str):
+    def _process_image_directory(self, directory: str):
+        logger.info(f"Analyzing images in directory: {directory}")
+
+        try:
+            images = FileUtils.get_image_files(directory)
+        except FileNotFoundError as e:
+            logger.error(str(e))
+            return
+
+        logger.info(f"Found {len(images)} images in {directory}")
+
+        start = time.perf_counter()
+        detected = 0
+        with ThreadPoolExecutor(max_workers=self._decode_threads()) as pool:
+            paths = images[:self._batch_size(self.input_data.batch_size)]
+            pending = self._decode_batch(pool, paths)
+            position = len(paths)
+            while paths:
+                decoded = [future.result() for future in pending]
+                held = sum(getattr(image, "nbytes", 0) for image in decoded)
+                self._reserve(held)
+
+                # Decode the next batch while the current one is being analyzed,
+                # unless a second batch in memory would exceed the memory budget
+                next_paths = images[position:position + self._batch_size(self.input_data.batch_size)]
+                prefetch = self.memory_budget is None or self.memory_budget.fits(held)
+                if prefetch:
+                    pending = self._decode_batch(pool, next_paths)
+                detected += self._analyze_image_batch(paths, decoded)
+                decoded = None
+                self._release(held)
+                if not prefetch:
+                    pending = self._decode_batch(pool, next_paths)
+
+                paths = next_paths
+                position += len(paths)
+
+        elapsed = max(time.perf_counter() - start, 1e-9)
+        logger.info(
+            f"Analyzed {len(images)} images ({detected} with faces) in {elapsed:.1f}s: "
+            f"{len(images) / elapsed:.1f} images/s"
+        )
+
+    def _decode_batch(self, pool: ThreadPoolExecutor, paths: List[str]) -> List[Future]:
+        if self.image_reader is None:
+            # The detector decodes the files itself
+            return [pool.submit(lambda path: path, path) for path in paths]
+        return [pool.submit(self.image_reader.read, path) for path in paths]
+
+    def _analyze_image_batch(self, paths: List[str], decoded: List[Any]) -> int:
+        valid = [(path, image) for path, image in zip(paths, decoded) if image is not None]
+        if not valid:
+            return 0
+
+        try:
+            with tracer.span("detect.batch", image=os.path.basename(paths[0]), images=len(valid)):
+                results = self.detector.detect_batch([image for _, image in valid])
+        except Exception as e:
+            logger.error(f"Failed to analyze image batch starting at {paths[0]}: {e}")
+            return 0
+
+        outputs = [
+            Frame.to_output(result, os.path.basename(path))
+            for (path, _), result in zip(valid, results)
+            if result
+        ]
+        if outputs:
+            with tracer.span("storage.write_batch", rows=len(outputs)):
+                self.storage.write_batch(outputs)
+        return len(outputs)
+
+    def _process_video(self, video_path: str) -> bool:
+        if self.input_data.summary:
+            return self._summarize_video(video_path)
+
         logger.info(f"Analyzing video: {video_path}")
 
+        batch_buffer = []  # every buffered result holds a RESULT_BYTES reservation until it is written
         try:
             # 1. Using factory to create the infrastructure implementation (Source)
             source = self.video_factory.create(video_path)
             source_id = os.path.basename(video_path)
             
             # 2. Inject source into the logic (Video)
-            video = Video(source, self.detector, source_id)
+            video = Video(source, self.detector, source_id, cropper=self.cropper, crop_store=self.crop_store,
+                          memory_budget=self.memory_budget, stop_event=self._stop_event)
             
-            results_generator = video.process(frame_step=self.input_data.interval)
+            results_generator = video.process(
+                frame_step=self.realtime.step if self.realtime else self.input_data.interval,
+                adaptive=self.input_data.adaptive,
+            )
             
-            batch_buffer = []
+            # 3. Segments are built while streaming, so the frame rows never have to be re-read
+            segment_builder = SegmentBuilder() if self.input_data.timeline in ("segments", "both") else None
+
+            segment_buffer = []
+            emotion_counts: Counter = Counter()
+            last_seconds = 0.0
             for result in results_generator:
                 batch_buffer.append(result)
-                if len(batch_buffer) >= 10:
-                    self.storage.write_batch(batch_buffer)
+                self._reserve(RESULT_BYTES)
+                emotion_counts[result.dominant_emotion] += 1
+                if self.realtime:
+                    self.realtime.record(result.seconds - last_seconds)
+                    last_seconds = result.seconds
+                    video.set_frame_step(self.realtime.step)
+                if segment_builder:
+                    segment = segment_builder.add(result)
+                    if segment:
+                        segment_buffer.append(segment)
+
+                if len(batch_buffer) >= self._batch_size(10):
+                    self._write_results(batch_buffer, segment_buffer)
                     batch_buffer = []
-            
-            if batch_buffer:
-                self.storage.write_batch(batch_buffer)
-                
+                    segment_buffer = []
+
+            if video.stopped:
+                logger.warning(f"Stop requested, flushing partial results of {source_id}")
+
+            if segment_builder:
+                segment = segment_builder.flush()
+                if segment:
+                    segment_buffer.append(segment)
+
+            self._write_results(batch_buffer, segment_buffer)
+            batch_buffer = []
+            with tracer.span("storage.flush", video=source_id):
+                self.storage.flush()
+            if self.realtime and video.fps > 0:
+                # The frames after the last face were covered as well
+                self.realtime.record(video.frames_read / video.fps - last_seconds, samples=0)
+
+            # 4. Index the video by its Guest_Host_Topic name for the dimension reports
+            if emotion_counts:
+                self.storage.save_aggregates([DimensionService.build_aggregate(source_id, emotion_counts)])
+            return video.opened and not video.stopped
+
         except Exception as e:
             logger.error(f"Failed to process video {video_path}: {e}")
-            
+            return False
+        finally:
+            # Results dropped by a failure would otherwise keep their reservation for the rest of the run
+            self._release(len(batch_buffer) * RESULT_BYTES)
+
+    def _summarize_video(self, video_path: str) -> bool:
+        logger.info(f"Summarizing video: {video_path}")
+
+        try:
+            source_id = os.path.basename(video_path)
+            sampler = SummarySampler(self.detector, self.input_data.summary, step=int(self.input_data.interval))
+            stats, results = sampler.sample(self.video_factory.create(video_path), source_id)
+
+            # The random samples are kept for auditing; they do not form a timeline
+            if results and self.input_data.timeline in ("frames", "both"):
+                self.storage.write_batch(results)
+            self.storage.flush()
+            if stats:
+                counts = Counter(result.dominant_emotion for result in results)
+                self.storage.save_aggregates([DimensionService.build_aggregate(source_id, counts)])
+                # Saved per video, so a daemon or an interrupted run keeps the summaries of finished videos
+                self.storage.upsert_stats([stats])
+            return True
+        except Exception as e:
+            logger.error(f"Failed to summarize video {video_path}: {e}")
+            return False
+
+    def _write_results(self, results: List[OutputData], segments: List[EmotionSegment]):
+        if results and self.input_data.timeline in ("frames", "both"):
+            with tracer.span("storage.write_batch", video=results[0].file_name, rows=len(results)):
+                self.storage.write_batch(results)
+        if segments:
+            with tracer.span("storage.write_segments", video=segments[0].file_name, rows=len(segments)):
+                self.storage.write_segments(segments)
+        self._release(len(results) * RESULT_BYTES)
+
     def _process_directory(self, directory: str):
         logger.info(f"Analyzing videos in directory: {self.input_data.video_path}")
 
@@ -115,6 +341,92 @@ class EmotionAnalyzer:
             logger.error(str(e))
             return
 
-        logger.info(f"Found {len(videos)} videos in {directory}")
+        # The durations come from the metadata index, so planning does not decode anything
+        media_duration = self._media_duration(videos)
+        logger.info(f"Found {len(videos)} videos in {directory} ({media_duration / 3600:.2f} hours)")
+        if self.realtime:
+            if self.realtime.target.deadline:
+                self.realtime.set_total_media(media_duration)
+            self._process_directory_realtime(videos)
+            return
+
+        if self.input_data.cross_batch > 1:
+            logger.info(f"Batching the frames of {self.input_data.cross_batch} videos at a time")
+            batcher = CrossVideoBatcher(
+                self.input_data, self.detector, self.storage, self.video_factory,
+                videos_in_flight=self.input_data.cross_batch, stop_event=self._stop_event,
+            )
+            batcher.run(videos)
+            return
+
+        workers = self._workers()
+        if workers == 1:
+            for video_path in videos:
+                if self._stop_event.is_set():
+                    break
+                self._process_video(video_path)
+            return
+
+        logger.info(f"Analyzing {workers} videos in parallel")
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="video-worker") as pool:
+            for video_path in videos:
+                pool.submit(self._process_next_video, video_path)
+
+    def _plan_single_video_realtime(self, video_path: str):
+        # A single video cannot be split between workers, only the sampling can adapt
+        self.realtime.max_workers = self.realtime.workers = 1
+        if self.realtime.target.deadline:
+            self.realtime.set_total_media(self._media_duration([video_path]))
+
+    def _process_directory_realtime(self, videos: List[str]):
+        # The pool is sized for the maximum, the controller decides how many videos run at once
+        with ThreadPoolExecutor(max_workers=self.realtime.max_workers, thread_name_prefix="video-worker") as pool:
+            for video_path in videos:
+                pool.submit(self._process_next_video_realtime, video_path)
+
+    def _process_next_video_realtime(self, video_path: str):
+        with self.realtime.worker_slot():
+            self._process_next_video(video_path)
+
+    def _media_duration(self, videos: List[str]) -> float:
+        total = 0.0
         for video_path in videos:
-            self._process_video(video_path)
\ No newline at end of file
+            metadata = self.video_factory.probe(video_path)
+            if metadata is not None:
+                total += metadata.duration
+                continue
+
+            source = self.video_factory.create(video_path)
+            if not source.open():
+                continue
+            try:
+                total += source.get_duration()
+            finally:
+                source.release()
+        return total
+
+    def _process_next_video(self, video_path: str):
+        # Videos still queued when a stop is requested are skipped
+        if not self._stop_event.is_set():
+            self._process_video(video_path)
+
+    def _batch_size(self, size: int) -> int:
+        """Shrinks a batch size while the memory budget is under pressure."""
+        size = max(1, size)
+        return self.memory_budget.scaled(size) if self.memory_budget else size
+
+    def _reserve(self, nbytes: int):
+        if self.memory_budget and nbytes:
+            self.memory_budget.reserve(nbytes)
+
+    def _release(self, nbytes: int):
+        if self.memory_budget and nbytes:
+            self.memory_budget.release(nbytes)
+
+    def _workers(self) -> int:
+        budget = self.input_data.thread_budget
+        return max(1, budget.workers) if budget else 1
+
+    def _decode_threads(self) -> int:
+        budget = self.input_data.thread_budget
+        return max(1, budget.decode_threads if budget else self.input_data.decode_threads)
\ No newline at end of file
@@ -0,0 +1,169 @@
+import asyncio
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Counter, Dict, List, Optional
+
+from backend.src.domain.interfaces import IAsyncStorage, IAsyncVideoSource, IEmotionDetector
+from backend.src.domain.models import EmotionSegment, InputData, OutputData
+from backend.src.application.dimensions import DimensionService
+from backend.src.application.frame import Frame
+from backend.src.application.timeline import SegmentBuilder
+from backend.src.application.video import Video
+from backend.src.infrastructure.logger import setup_logger
+
+logger = setup_logger("core.async_analyzer.py")
+
+
+class AsyncEmotionAnalyzer:
+    """
+    Asyncio entry point analyzing many videos or live recordings from one event loop.
+
+    Frames are read through async sources and inference runs in an executor, so
+    the loop is never blocked. A semaphore limits the inferences in flight across
+    all streams, which keeps the model from being oversubscribed however many
+    streams are open. The semaphore is created inside the running loop (asyncio
+    primitives bind to a loop on Python 3.9), so one analyzer can serve several
+    asyncio.run calls. Call close() to stop the executor the analyzer created.
+
+    Attributes:
+        input_data (InputData): Sampling interval, batch and timeline settings.
+        detector (IEmotionDetector): Service for emotion detection (must be thread safe).
+        storage (IAsyncStorage): Async writer for the results.
+    """
+
+    def __init__(
+        self,
+        input_data: InputData,
+        detector: IEmotionDetector,
+        storage: IAsyncStorage,
+        max_concurrent_inferences: int = 4,
+        executor: Optional[Executor] = None,
+    ):
+        """
+        Args:
+            input_data: Sampling interval and timeline settings.
+            detector: The emotion detector shared by all streams.
+            storage: The async result writer.
+            max_concurrent_inferences: Global limit of inferences in flight.
+            executor: Executor running the inferences (default: one thread per allowed inference,
+                      shut down by close()).
+        """
+        self.input_data = input_data
+        self.detector = detector
+        self.storage = storage
+        self.max_concurrent_inferences = max(1, max_concurrent_inferences)
+        self._owns_executor = executor is None
+        self.executor = executor or ThreadPoolExecutor(
+            max_workers=self.max_concurrent_inferences, thread_name_prefix="async-inference"
+        )
+        self._inference_limit: Optional[asyncio.Semaphore] = None
+        self._limit_loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def close(self) -> None:
+        """Shuts down the inference executor if the analyzer created it."""
+        if self._owns_executor:
+            self.executor.shutdown(wait=True)
+
+    async def analyze_many(self, sources: Dict[str, IAsyncVideoSource]) -> Dict[str, int]:
+        """
+        Analyzes several streams concurrently.
+
+        Args:
+            sources: The streams keyed by their source id (file name).
+
+        Returns:
+            Dict[str, int]: Number of results per source; failed streams count 0.
+        """
+        counts = await asyncio.gather(
+            *(self.analyze(source_id, source) for source_id, source in sources.items()),
+            return_exceptions=True,
+        )
+        results = {}
+        for source_id, count in zip(sources, counts):
+            if isinstance(count, BaseException):
+                logger.error(f"Failed to process stream {source_id}: {count}")
+                count = 0
+            results[source_id] = count
+        return results
+
+    async def analyze(self, source_id: str, source: IAsyncVideoSource) -> int:
+        """
+        Analyzes one stream until it ends (or the task is cancelled) and returns
+        the number of results. Buffered results are written in both cases.
+        """
+        if not await source.open():
+            logger.error(f"Could not open source: {source_id}")
+            return 0
+
+        fps = source.get_fps()
+        if fps <= 0:
+            logger.error(f"Invalid FPS ({fps}) for source: {source_id}")
+            await source.release()
+            return 0
+
+        step = max(1, int(self.input_data.interval))
+        segment_builder = SegmentBuilder() if self.input_data.timeline in ("segments", "both") else None
+        batch_buffer: List[OutputData] = []
+        segment_buffer: List[EmotionSegment] = []
+        emotion_counts: Counter = Counter()
+        frame_idx = 0
+
+        logger.info(f"Starting stream: {source_id} (FPS: {fps:.2f}) Step: every {step} frames")
+        try:
+            while True:
+                frame_data = await source.read()
+                if frame_data is None:
+                    break
+
+                if frame_idx % step == 0:
+                    result = await self._analyze(frame_data, source_id)
+                    if result:
+                        Video.stamp(result, frame_idx / fps)
+                        batch_buffer.append(result)
+                        emotion_counts[result.dominant_emotion] += 1
+                        if segment_builder:
+                            segment = segment_builder.add(result)
+                            if segment:
+                                segment_buffer.append(segment)
+
+                if len(batch_buffer) >= max(1, self.input_data.batch_size):
+                    await self._write_results(batch_buffer, segment_buffer)
+                    batch_buffer, segment_buffer = [], []
+
+                frame_idx += 1
+        finally:
+            # Shielded, so a cancelled stream still keeps what it has analyzed
+            await asyncio.shield(self._finish(source_id, source, batch_buffer, segment_buffer,
+                                              segment_builder, emotion_counts))
+
+        logger.info(f"Finished stream {source_id}. Total detections: {sum(emotion_counts.values())}")
+        return sum(emotion_counts.values())
+
+    async def _analyze(self, frame_data, source_id: str) -> Optional[OutputData]:
+        frame = Frame(image_data=frame_data, source_id=source_id, emotion_detector=self.detector)
+        loop = asyncio.get_running_loop()
+        async with self._limit(loop):
+            return await loop.run_in_executor(self.executor, frame.analyze)
+
+    def _limit(self, loop: asyncio.AbstractEventLoop) -> asyncio.Semaphore:
+        """The inference semaphore of the running loop, created on its first use there."""
+        if self._limit_loop is not loop:
+            self._inference_limit = asyncio.Semaphore(self.max_concurrent_inferences)
+            self._limit_loop = loop
+        return self._inference_limit
+
+    async def _finish(self, source_id, source, batch_buffer, segment_buffer, segment_builder, emotion_counts):
+        if segment_builder:
+            segment = segment_builder.flush()
+            if segment:
+                segment_buffer.append(segment)
+        await self._write_results(batch_buffer, segment_buffer)
+        if emotion_counts:
+            await self.storage.save_aggregates([DimensionService.build_aggregate(source_id, emotion_counts)])
+        await self.storage.flush()
+        await source.release()
+
+    async def _write_results(self, results: List[OutputData], segments: List[EmotionSegment]):
+        if results and self.input_data.timeline in ("frames", "both"):
+            await self.storage.write_batch(results)
+        if segments:
+            await self.storage.write_segments(segments)
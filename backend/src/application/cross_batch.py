@@ -0,0 +1,178 @@
+import os
+import threading
+from collections import deque
+from typing import Counter, Generator, List, Optional, Tuple
+
+import numpy as np
+
+from backend.src.domain.interfaces import IEmotionDetector, IStorage, IVideoFactory
+from backend.src.domain.models import EmotionSegment, InputData, OutputData
+from backend.src.application.dimensions import DimensionService
+from backend.src.application.frame import Frame
+from backend.src.application.timeline import SegmentBuilder
+from backend.src.application.video import Video
+from backend.src.infrastructure.logger import RateLimitedLogger, setup_logger
+from backend.src.infrastructure.tracing import tracer
+
+logger = setup_logger("core.cross_batch.py")
+batch_logger = RateLimitedLogger(logger)
+
+
+class _Stream:
+    """An open video of the batcher with its own result buffers."""
+
+    def __init__(self, video: Video, frames: Generator[Tuple[int, np.ndarray], None, None]):
+        self.video = video
+        self.frames = frames
+        self.results: List[OutputData] = []
+        self.segments: List[EmotionSegment] = []
+        self.emotion_counts: Counter = Counter()
+        self.segment_builder: Optional[SegmentBuilder] = None
+
+
+class CrossVideoBatcher:
+    """
+    Analyzes a list of videos with detector batches that mix frames of several videos.
+
+    Up to `videos_in_flight` videos are open at once and contribute their sampled
+    frames in turn, so every detect_batch call is full even when single videos
+    are only a few seconds long. Each result goes back to its video with its own
+    timestamp; rows, segments and aggregates are written as in the per-video path.
+    When a video ends, the next one is opened in its place.
+
+    Frames are kept until their batch runs, so the sources must return a new
+    array per read (no reused decode buffers).
+    """
+
+    def __init__(
+        self,
+        input_data: InputData,
+        detector: IEmotionDetector,
+        storage: IStorage,
+        video_factory: IVideoFactory,
+        videos_in_flight: int = 4,
+        stop_event: Optional[threading.Event] = None,
+    ):
+        """
+        Args:
+            input_data: Sampling interval, batch size and timeline settings.
+            detector: The emotion detector (its detect_batch gets the mixed batches).
+            storage: Service for saving results.
+            video_factory: Factory creating the video sources.
+            videos_in_flight: Number of videos interleaved into the batches.
+            stop_event: Stops opening and reading videos once set; analyzed frames are still written.
+        """
+        self.input_data = input_data
+        self.detector = detector
+        self.storage = storage
+        self.video_factory = video_factory
+        self.videos_in_flight = max(1, videos_in_flight)
+        self.batch_size = max(1, input_data.batch_size)
+        self._stop_event = stop_event or threading.Event()
+
+    def run(self, videos: List[str]) -> int:
+        """Analyzes the videos and returns the number of detected faces."""
+        queue = deque(videos)
+        streams: List[_Stream] = []
+        ended: List[_Stream] = []  # finished reading, waiting for their last batch
+        batch: List[Tuple[_Stream, int, np.ndarray]] = []
+        detected = 0
+
+        while (queue or streams) and not self._stop_event.is_set():
+            while queue and len(streams) < self.videos_in_flight:
+                stream = self._open(queue.popleft())
+                if stream:
+                    streams.append(stream)
+
+            # One sampled frame of every open video per turn
+            for stream in list(streams):
+                sample = next(stream.frames, None)
+                if sample is None:
+                    streams.remove(stream)
+                    ended.append(stream)
+                    continue
+
+                frame_idx, frame_data = sample
+                batch.append((stream, frame_idx, frame_data))
+                if len(batch) >= self.batch_size:
+                    detected += self._analyze(batch)
+                    batch = []
+                    self._finish_all(ended)
+
+        for stream in streams:
+            stream.frames.close()
+            ended.append(stream)
+        detected += self._analyze(batch)
+        self._finish_all(ended)
+        return detected
+
+    def _open(self, video_path: str) -> Optional[_Stream]:
+        source_id = os.path.basename(video_path)
+        try:
+            video = Video(self.video_factory.create(video_path), self.detector, source_id)
+        except Exception as e:
+            logger.error(f"Failed to open video {video_path}: {e}")
+            return None
+
+        logger.info(f"Analyzing video: {video_path} (batched with other videos)")
+        stream = _Stream(video, video.sampled_frames(frame_step=self.input_data.interval))
+        if self.input_data.timeline in ("segments", "both"):
+            stream.segment_builder = SegmentBuilder()
+        return stream
+
+    def _analyze(self, batch: List[Tuple[_Stream, int, np.ndarray]]) -> int:
+        if not batch:
+            return 0
+
+        try:
+            with tracer.span("detect.batch", frames=len(batch), videos=len({id(s) for s, _, _ in batch})):
+                results = self.detector.detect_batch([frame for _, _, frame in batch])
+        except Exception as e:
+            batch_logger.error("Failed to analyze a batch of %d frames: %s", len(batch), e)
+            return 0
+
+        detected = 0
+        for (stream, frame_idx, _), result in zip(batch, results):
+            if not result:
+                continue
+            output = Frame.to_output(result, stream.video.source_id)
+            Video.stamp(output, frame_idx / stream.video.fps)
+            self._keep(stream, output)
+            detected += 1
+        return detected
+
+    def _keep(self, stream: _Stream, result: OutputData):
+        stream.results.append(result)
+        stream.emotion_counts[result.dominant_emotion] += 1
+        if stream.segment_builder:
+            segment = stream.segment_builder.add(result)
+            if segment:
+                stream.segments.append(segment)
+        if len(stream.results) >= 10:
+            self._write(stream)
+
+    def _finish_all(self, ended: List[_Stream]):
+        for stream in ended:
+            self._finish(stream)
+        ended.clear()
+
+    def _finish(self, stream: _Stream):
+        if stream.segment_builder:
+            segment = stream.segment_builder.flush()
+            if segment:
+                stream.segments.append(segment)
+        self._write(stream)
+        self.storage.flush()
+
+        source_id = stream.video.source_id
+        if stream.emotion_counts:
+            self.storage.save_aggregates([DimensionService.build_aggregate(source_id, stream.emotion_counts)])
+        logger.info(f"Finished {source_id}. Total detections: {sum(stream.emotion_counts.values())}")
+
+    def _write(self, stream: _Stream):
+        if stream.results and self.input_data.timeline in ("frames", "both"):
+            self.storage.write_batch(stream.results)
+        if stream.segments:
+            self.storage.write_segments(stream.segments)
+        stream.results = []
+        stream.segments = []
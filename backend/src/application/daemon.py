@@ -0,0 +1,183 @@
+import json
+import os
+import signal
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+
+from backend.src.application.analyzer import EmotionAnalyzer
+from backend.src.domain.interfaces import IStagedStorage
+from backend.src.infrastructure.logger import setup_logger
+
+logger = setup_logger("core.daemon.py")
+
+
+class WatchFolderDaemon:
+    """
+    Long-running ingest mode: watches a folder and analyzes new videos with the
+    detectors of one warm EmotionAnalyzer.
+
+    A video is queued once its size and modification time have stopped changing
+    for `stable_checks` consecutive polls, i.e. once the copy into the folder has
+    finished. Processed videos are recorded in a ledger so a restart does not
+    analyze them again.
+
+    The analyzer writes into a staged storage. The results of a video are
+    committed right before its ledger entry, so an interrupted or failed video
+    leaves no rows behind and is analyzed from the start on the next run,
+    without duplicates.
+    """
+
+    def __init__(
+        self,
+        analyzer: EmotionAnalyzer,
+        directory: str,
+        ledger_path: str,
+        list_videos: Callable[[str], List[str]],
+        staging: Optional[IStagedStorage] = None,
+        poll_interval: float = 5.0,
+        stable_checks: int = 2,
+    ):
+        """
+        Args:
+            analyzer: The analyzer holding the loaded detectors and storage.
+            directory: The folder to watch (recursively).
+            ledger_path: JSON file recording the processed videos.
+            list_videos: Lists the video files of a folder; raises FileNotFoundError if it is missing.
+            staging: The analyzer's storage, committed per finished video (None = written directly).
+            poll_interval: Seconds between two scans of the folder.
+            stable_checks: Polls a file must stay unchanged before it is processed.
+        """
+        self.analyzer = analyzer
+        self.directory = directory
+        self.ledger_path = ledger_path
+        self.list_videos = list_videos
+        self.staging = staging
+        self.poll_interval = poll_interval
+        self.stable_checks = max(1, stable_checks)
+
+        # structure: {'path': ((size, mtime), polls seen unchanged)}
+        self._candidates: Dict[str, Tuple[Tuple[int, float], int]] = {}
+        self._processed: Dict[str, List[float]] = self._load_ledger()
+        # structure: {'path': [size, mtime]}, retried once the file changes or the daemon restarts
+        self._failed: Dict[str, List[float]] = {}
+        self._stop_event = threading.Event()
+
+    def run(self):
+        """Polls the folder until stop() is called or SIGTERM/SIGINT is received."""
+        previous_handlers = {}
+        if threading.current_thread() is threading.main_thread():
+            for signum in (signal.SIGTERM, signal.SIGINT):
+                previous_handlers[signum] = signal.signal(signum, self._handle_signal)
+
+        logger.info(f"Watching {self.directory} for new videos (every {self.poll_interval}s)")
+        try:
+            while not self._stop_event.is_set():
+                self.poll_once()
+                self._stop_event.wait(self.poll_interval)
+        finally:
+            for signum, handler in previous_handlers.items():
+                signal.signal(signum, handler)
+
+        logger.info("Watch-folder daemon stopped.")
+
+    def stop(self):
+        """Stops the daemon; the results of the video in progress are dropped and it is left for the next start."""
+        self._stop_event.set()
+        self.analyzer.request_stop()
+
+    def poll_once(self) -> List[str]:
+        """
+        Scans the folder once and analyzes the videos that became ready.
+
+        Returns:
+            List[str]: The videos processed during this poll.
+        """
+        processed = []
+        for video_path in self._find_ready_videos():
+            if self._stop_event.is_set():
+                break
+
+            signature = self._signature(video_path)
+            completed = self.analyzer.process_video(video_path)
+            self._candidates.pop(video_path, None)
+
+            if self.analyzer.stop_requested:
+                # Neither its rows nor a ledger entry are kept, so the next start analyzes it once more
+                self._discard()
+                break
+
+            if not completed:
+                self._discard()
+                if signature:
+                    self._failed[video_path] = list(signature)
+                logger.error(f"Analysis of {video_path} failed, it is retried once the file changes")
+                continue
+
+            if self.staging:
+                self.staging.commit()
+            if signature:
+                self._processed[video_path] = list(signature)
+                self._save_ledger()
+            processed.append(video_path)
+
+        return processed
+
+    def _find_ready_videos(self) -> List[str]:
+        try:
+            videos = self.list_videos(self.directory)
+        except FileNotFoundError as e:
+            logger.error(str(e))
+            return []
+
+        ready = []
+        for video_path in sorted(videos):
+            signature = self._signature(video_path)
+            if signature is None or list(signature) in (self._processed.get(video_path), self._failed.get(video_path)):
+                continue
+
+            previous, unchanged = self._candidates.get(video_path, (None, -1))
+            unchanged = unchanged + 1 if previous == signature else 0
+            self._candidates[video_path] = (signature, unchanged)
+
+            if unchanged >= self.stable_checks:
+                ready.append(video_path)
+
+        # Forget files that were removed before they became ready
+        for video_path in set(self._candidates) - set(videos):
+            del self._candidates[video_path]
+
+        return ready
+
+    def _signature(self, video_path: str) -> Optional[Tuple[int, float]]:
+        try:
+            stat = os.stat(video_path)
+        except OSError:
+            return None
+        return stat.st_size, stat.st_mtime
+
+    def _discard(self):
+        if self.staging:
+            self.staging.discard()
+
+    def _handle_signal(self, signum, frame):
+        logger.info(f"Received signal {signum}, shutting down gracefully...")
+        self.stop()
+
+    def _load_ledger(self) -> Dict[str, List[float]]:
+        if not os.path.exists(self.ledger_path):
+            return {}
+        try:
+            with open(self.ledger_path, mode="r", encoding="utf-8") as ledger_file:
+                return json.load(ledger_file)
+        except Exception as e:
+            logger.error(f"Error reading processed-video ledger: {e}")
+            return {}
+
+    def _save_ledger(self):
+        try:
+            tmp_path = self.ledger_path + ".tmp"
+            with open(tmp_path, mode="w", encoding="utf-8") as ledger_file:
+                json.dump(self._processed, ledger_file, indent=1)
+            os.replace(tmp_path, self.ledger_path)
+        except Exception as e:
+            logger.error(f"Error saving processed-video ledger: {e}")
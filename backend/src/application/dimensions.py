@@ -0,0 +1,103 @@
+import os
+from typing import Counter, Dict, List, Tuple
+
+from backend.src.domain.interfaces import IStorage
+from backend.src.domain.models import DimensionStats, VideoAggregate
+from backend.src.infrastructure.logger import setup_logger
+
+logger = setup_logger("DimensionService")
+
+DIMENSIONS = ("guest", "host", "topic")
+
+
+def parse_file_name(file_name: str) -> Tuple[str, str, str]:
+    """
+    Splits a file named by the Guest_Host_Topic.mp4 convention.
+    Missing parts are returned as empty strings; extra underscores belong to the topic.
+    """
+    stem = os.path.splitext(os.path.basename(file_name))[0]
+    parts = stem.split("_", 2)
+    parts += [""] * (3 - len(parts))
+    return parts[0], parts[1], parts[2]
+
+
+class DimensionService:
+    """
+    Answers per-guest, per-host and per-topic questions from the video index,
+    i.e. from the precomputed per-video aggregates instead of the raw frames.
+    """
+
+    def __init__(self, storage: IStorage):
+        self.storage = storage
+
+    @staticmethod
+    def build_aggregate(file_name: str, emotion_counts: Dict[str, int]) -> VideoAggregate:
+        """Creates the index entry of a video from its dominant emotion counts."""
+        guest, host, topic = parse_file_name(file_name)
+        return VideoAggregate(
+            file_name=file_name,
+            guest=guest,
+            host=host,
+            topic=topic,
+            total_frames=sum(emotion_counts.values()),
+            emotion_counts=dict(emotion_counts),
+        )
+
+    def distribution_by(self, dimension: str) -> List[DimensionStats]:
+        """
+        Computes the emotion distribution per value of a dimension.
+
+        Args:
+            dimension: One of 'guest', 'host' or 'topic'.
+
+        Returns:
+            List[DimensionStats]: One entry per dimension value, sorted by value.
+        """
+        if dimension not in DIMENSIONS:
+            raise ValueError(f"Unknown dimension: {dimension} (use one of {', '.join(DIMENSIONS)})")
+
+        # structure: {'dimension_value': (videos, emotion counts)}
+        groups: Dict[str, Tuple[int, Counter]] = {}
+        for aggregate in self.storage.load_aggregates():
+            value = getattr(aggregate, dimension) or "unknown"
+            videos, counts = groups.get(value, (0, Counter()))
+            counts.update(aggregate.emotion_counts)
+            groups[value] = (videos + 1, counts)
+
+        stats_list: List[DimensionStats] = []
+        for value, (videos, counts) in sorted(groups.items()):
+            total = sum(counts.values())
+            if not total:
+                continue
+
+            stats_list.append(DimensionStats(
+                dimension=dimension,
+                value=value,
+                videos=videos,
+                total_frames=total,
+                most_frequent_emotion=counts.most_common(1)[0][0],
+                emotion_distribution={
+                    emotion: round((count / total) * 100, 2)
+                    for emotion, count in counts.items()
+                },
+            ))
+
+        return stats_list
+
+    def rebuild_index(self) -> int:
+        """
+        Rebuilds the video index from the raw results, e.g. for results written
+        before the index existed. Returns the number of indexed videos.
+        """
+        counts: Dict[str, Counter] = {}
+        for row in self.storage.iter_all():
+            filename = row.get("file_name")
+            emotion = row.get("dominant_emotion")
+            if filename and emotion:
+                counts.setdefault(filename, Counter())[emotion] += 1
+
+        self.storage.save_aggregates([
+            self.build_aggregate(filename, emotion_counts) for filename, emotion_counts in counts.items()
+        ])
+        logger.info(f"Video index rebuilt for {len(counts)} videos.")
+        return len(counts)
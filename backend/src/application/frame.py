@@ -2,11 +2,13 @@ import os
 import numpy as np
 
 from backend.src.infrastructure.detectors import DeepFaceEmotionDetector
-from backend.src.infrastructure.logger import setup_logger
+from backend.src.infrastructure.logger import RateLimitedLogger, setup_logger
 from backend.src.domain.models import OutputData
 
 # Configure local logger
 logger = setup_logger("core.frame.py")
+# Per-frame events are rate limited so long videos do not flood the log
+frame_logger = RateLimitedLogger(logger)
 
 
 class Frame:
@@ -57,7 +59,7 @@ class Frame:
         source_name = self.image_path if self.image_path else "InMemoryFrame"
 
         try:
-            logger.debug(f"Analyzing frame: {source_name}")
+            logger.debug("Analyzing frame: %s", source_name)
 
             file_name = (
                 os.path.basename(source_name) if self.image_path else self.source_id
@@ -65,17 +67,34 @@ class Frame:
             results = self.emotion_detector.detect(target)
 
             if results is None:
-                logger.warning(f"No face detected in frame: {source_name}")
+                frame_logger.warning("No face detected in frame: %s", source_name)
                 return None
 
-            output_data = OutputData(
-                file_name=file_name,
-                dominant_emotion=results.get("dominant_emotion"),
-                emotion=results.get("emotion", {}),
-            )
-
-            return output_data
+            return self.to_output(results, file_name)
 
         except Exception as e:
-            logger.error(f"Error analyzing {source_name}: {e}")
+            frame_logger.error("Error analyzing %s: %s", source_name, e)
             return None
+
+    @staticmethod
+    def to_output(results: dict, file_name: str) -> OutputData:
+        """Maps a raw detector result to the output model.
+
+        Args:
+            results (dict): Result dictionary returned by the emotion detector.
+            file_name (str): Name of the analyzed file.
+
+        Returns:
+            OutputData: The analysis result.
+        """
+        region = results.get("region") or {}
+        face_box = None
+        if all(key in region for key in ("x", "y", "w", "h")):
+            face_box = tuple(int(region[key]) for key in ("x", "y", "w", "h"))
+
+        return OutputData(
+            file_name=file_name,
+            dominant_emotion=results.get("dominant_emotion"),
+            emotion=results.get("emotion", {}),
+            face_box=face_box,
+        )
@@ -0,0 +1,167 @@
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Optional
+
+from backend.src.domain.models import RealTimeTarget
+from backend.src.infrastructure.logger import setup_logger
+
+logger = setup_logger("core.realtime.py")
+
+# A single adjustment never thins the sampling by more than this factor
+_MAX_STEP_GROWTH = 4.0
+
+
+class RealTimeController:
+    """
+    Tunes the sampling step and the number of parallel videos to meet a
+    real-time-factor target or a deadline.
+
+    Throughput is measured in video seconds analyzed per wall-clock second over
+    windows of `target.window` samples; the first window only warms up the
+    models and caches and is not used. When it is too low, another worker is
+    added first, since that keeps the sampling dense; once more workers stop
+    paying off, the sampling step grows instead. When there is headroom, the
+    step shrinks back towards the requested interval.
+    """
+
+    def __init__(
+        self,
+        target: RealTimeTarget,
+        base_step: int,
+        workers: int = 1,
+        clock: Callable[[], float] = time.time,
+    ):
+        """
+        Args:
+            target: The RTF target or deadline.
+            base_step: The requested sampling step, i.e. the densest one allowed.
+            workers: Parallel videos to start with.
+            clock: Wall clock (unix time), replaceable in tests.
+        """
+        if not target.factor and not target.deadline:
+            raise ValueError("A real-time target needs a factor or a deadline")
+
+        self.target = target
+        self.base_step = max(1, base_step)
+        self.step = self.base_step
+        self.max_workers = max(1, target.max_workers)
+        self.workers = max(1, min(workers, self.max_workers))
+        self.total_media: Optional[float] = None  # seconds of video in the run, needed for deadlines
+
+        self._clock = clock
+        self._condition = threading.Condition()
+        self._active_workers = 0
+        self._started: Optional[float] = None
+        self._media_done = 0.0
+        self._samples = 0
+        self._window_start = 0.0
+        self._window_media = 0.0
+        self._window_samples = 0
+        self._warmed_up = False
+        self._saturated = False  # more workers did not increase the throughput
+        self._rate_before_new_worker: Optional[float] = None
+
+    def set_total_media(self, seconds: float):
+        """Sets the total video duration of the run (deadline mode)."""
+        self.total_media = seconds
+
+    @contextmanager
+    def worker_slot(self):
+        """Blocks until fewer than `workers` videos are being analyzed."""
+        with self._condition:
+            while self._active_workers >= self.workers:
+                self._condition.wait()
+            self._active_workers += 1
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._active_workers -= 1
+                self._condition.notify_all()
+
+    def record(self, media_seconds: float, samples: int = 1):
+        """
+        Records analysis progress of any worker.
+
+        Args:
+            media_seconds: Video time covered since the worker's previous record.
+            samples: Analyzed samples in that time.
+        """
+        with self._condition:
+            now = self._clock()
+            if self._started is None:
+                self._started = self._window_start = now
+
+            self._media_done += max(0.0, media_seconds)
+            self._window_media += max(0.0, media_seconds)
+            self._samples += samples
+            self._window_samples += samples
+
+            if self._window_samples >= self.target.window:
+                self._adjust(now)
+                self._condition.notify_all()
+
+    def required_rate(self, now: Optional[float] = None) -> float:
+        """Video seconds per wall-clock second needed from now on."""
+        now = self._clock() if now is None else now
+        if self.target.deadline and self.total_media:
+            remaining_media = max(0.0, self.total_media - self._media_done)
+            remaining_time = self.target.deadline - now
+            if remaining_time <= 0:
+                return math.inf
+            deadline_rate = remaining_media / remaining_time
+            if not self.target.factor:
+                return deadline_rate
+            return max(deadline_rate, 1.0 / self.target.factor)
+        return 1.0 / self.target.factor
+
+    def report(self) -> Dict[str, Any]:
+        """Returns the achieved real-time factor and the final settings."""
+        with self._condition:
+            now = self._clock()
+            elapsed = now - self._started if self._started is not None else 0.0
+            required = self.required_rate(now)
+            return {
+                "achieved_rtf": round(elapsed / self._media_done, 4) if self._media_done else None,
+                "required_rtf": round(1.0 / required, 4) if 0 < required < math.inf else None,
+                "media_seconds": round(self._media_done, 1),
+                "elapsed_seconds": round(elapsed, 1),
+                "samples": self._samples,
+                "frame_step": self.step,
+                "workers": self.workers,
+            }
+
+    def _adjust(self, now: float):
+        elapsed = now - self._window_start
+        if not self._warmed_up:
+            self._warmed_up = True
+        elif elapsed > 0 and self._window_media > 0:
+            rate = self._window_media / elapsed
+            required = self.required_rate(now)
+
+            if self._rate_before_new_worker is not None:
+                # Keep the extra worker only if it raised the throughput noticeably
+                if rate < self._rate_before_new_worker * 1.1:
+                    self.workers -= 1
+                    self._saturated = True
+                    logger.info(f"Real-time mode: more workers do not help, keeping {self.workers}")
+                self._rate_before_new_worker = None
+            elif rate < required * 0.95:
+                if not self._saturated and self.workers < self.max_workers:
+                    self._rate_before_new_worker = rate
+                    self.workers += 1
+                    logger.info(f"Real-time mode: {rate:.2f}x < {required:.2f}x, using {self.workers} workers")
+                else:
+                    growth = min(_MAX_STEP_GROWTH, required / rate)
+                    self.step = max(self.step + 1, math.ceil(self.step * growth))
+                    logger.info(f"Real-time mode: {rate:.2f}x < {required:.2f}x, sampling every {self.step} frames")
+            elif rate > required * 1.25 and self.step > self.base_step:
+                # Head room: sample denser again, with a 10% safety margin
+                self.step = max(self.base_step, math.floor(self.step * required * 1.1 / rate))
+                logger.info(f"Real-time mode: {rate:.2f}x > {required:.2f}x, sampling every {self.step} frames")
+
+        self._window_start = now
+        self._window_media = 0.0
+        self._window_samples = 0
@@ -0,0 +1,93 @@
+from typing import Counter, List
+
+from backend.src.domain.interfaces import IEmotionDetector, IFaceCropStore, IStorage
+from backend.src.domain.models import FaceCrop, InputData, OutputData
+from backend.src.application.dimensions import DimensionService
+from backend.src.application.frame import Frame
+from backend.src.application.timeline import SegmentBuilder
+from backend.src.application.video import Video
+from backend.src.infrastructure.logger import setup_logger
+
+logger = setup_logger("core.rescore.py")
+
+
+class CropRescorer:
+    """
+    Re-scores an archive from its stored face crops.
+
+    Only the classifier of the detector runs (see IEmotionDetector.classify_faces);
+    nothing is decoded and no face detection is repeated. Results are written like
+    the ones of a normal run, so the output folder of another model can be
+    compared with the original one. The results are appended, so the storage must
+    not hold results of the stored videos yet (a separate output folder).
+    """
+
+    def __init__(
+        self,
+        input_data: InputData,
+        detector: IEmotionDetector,
+        storage: IStorage,
+        crop_store: IFaceCropStore,
+    ):
+        self.input_data = input_data
+        self.detector = detector
+        self.storage = storage
+        self.crop_store = crop_store
+
+    def run(self) -> int:
+        """Re-scores every stored video and returns the number of videos."""
+        videos = self.crop_store.videos()
+        analyzed = {aggregate.file_name for aggregate in self.storage.load_aggregates()} & set(videos)
+        if analyzed:
+            logger.error(
+                f"The output folder already holds results of {len(analyzed)} of the stored videos "
+                f"(e.g. {sorted(analyzed)[0]}); re-score into a separate output folder to avoid duplicate rows."
+            )
+            return 0
+
+        logger.info(f"Re-scoring the face crops of {len(videos)} videos")
+        for file_name in videos:
+            self._rescore_video(file_name)
+        self.storage.flush()
+        return len(videos)
+
+    def _rescore_video(self, file_name: str):
+        batch_size = max(1, self.input_data.batch_size)
+        results: List[OutputData] = []
+        batch: List[FaceCrop] = []
+
+        for crop in self.crop_store.load(file_name):
+            batch.append(crop)
+            if len(batch) >= batch_size:
+                results.extend(self._classify(batch))
+                batch = []
+        results.extend(self._classify(batch))
+
+        # Refined samples of adaptive runs were stored after their coarse neighbours
+        results.sort(key=lambda result: result.seconds)
+
+        if self.input_data.timeline in ("frames", "both"):
+            self.storage.write_batch(results)
+        if self.input_data.timeline in ("segments", "both"):
+            builder = SegmentBuilder()
+            segments = builder.add_all(results)
+            last = builder.flush()
+            self.storage.write_segments(segments + ([last] if last else []))
+
+        emotion_counts = Counter(result.dominant_emotion for result in results)
+        if emotion_counts:
+            self.storage.save_aggregates([DimensionService.build_aggregate(file_name, emotion_counts)])
+        logger.info(f"Re-scored {file_name}: {len(results)} faces")
+
+    def _classify(self, crops: List[FaceCrop]) -> List[OutputData]:
+        if not crops:
+            return []
+
+        outputs = []
+        for crop, result in zip(crops, self.detector.classify_faces([crop.image for crop in crops])):
+            if not result:
+                continue
+            output = Frame.to_output(result, crop.file_name)
+            Video.stamp(output, crop.seconds)
+            outputs.append(output)
+        return outputs
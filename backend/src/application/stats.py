@@ -1,50 +1,77 @@
-from typing import List, Dict, Counter
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Counter, Optional
 from backend.src.domain.models import VideoStats
 from backend.src.domain.interfaces import IStorage
-from backend.src.infrastructure.logger import setup_logger
+from backend.src.infrastructure.logger import forward_logging, forwarded_logs, setup_logger
 
 logger = setup_logger("StatsService")
 
 
+def count_emotions(rows: Iterable[Dict[str, Any]]) -> Dict[str, Counter]:
+    """Groups the dominant emotions of result rows by video."""
+    # structure: {'video_name': Counter of dominant emotions}
+    video_groups: Dict[str, Counter] = {}
+    skipped = 0
+    for row in rows:
+        filename = row.get("file_name")
+        emotion = row.get("dominant_emotion")
+
+        if filename and emotion:
+            video_groups.setdefault(filename, Counter())[emotion] += 1
+        else:
+            skipped += 1
+    if skipped:
+        logger.warning(f"Skipped {skipped} result rows without a video or an emotion")
+    return video_groups
+
+
+def count_partition(reader: Callable[[], Iterator[Dict[str, Any]]]) -> Dict[str, Counter]:
+    """Partial aggregate of one storage partition (runs in a worker process)."""
+    return count_emotions(reader())
+
+
 class StatisticsService:
     """
     Read raw analysis data and generating a statistical summary.
     """
 
-    def __init__(self, storage: IStorage):
+    def __init__(self, storage: IStorage, workers: Optional[int] = None):
+        """
+        Args:
+            storage: The results to summarize.
+            workers: Processes aggregating partitioned storages (None = CPU count).
+        """
         self.storage = storage
+        self.workers = workers or os.cpu_count() or 1
 
-    def generate_report(self):
+    def generate_report(self, from_segments: bool = False):
         """
         Reads all raw data, aggregates by video file, and saves the summary.
-        """
-        logger.info("Generating statistical report...")
 
-        # 1. Load Data
-        raw_rows = self.storage.load_all()
-        if not raw_rows:
-            logger.warning("No data found to generate report.")
+        Args:
+            from_segments: Build the report from the run-length encoded timeline
+                           instead of the per-frame rows.
+        """
+        if from_segments:
+            self.generate_segment_report()
             return
 
-        # 2. Group by Video
-        # structure: {'video_name': [list of dominant emotions]}
-        video_groups: Dict[str, List[str]] = {}
+        logger.info("Generating statistical report...")
 
-        for row in raw_rows:
-            filename = row.get("file_name")
-            emotion = row.get("dominant_emotion")
+        # 1. Stream the data and group it by video
+        video_groups = self._count_emotions()
 
-            if filename and emotion:
-                if filename not in video_groups:
-                    video_groups[filename] = []
-                video_groups[filename].append(emotion)
+        if not video_groups:
+            logger.warning("No data found to generate report.")
+            return
 
-        # 3. Calculate Stats for each video
+        # 2. Calculate Stats for each video
         stats_list: List[VideoStats] = []
 
-        for filename, emotions in video_groups.items():
-            total = len(emotions)
-            counts = Counter(emotions)
+        for filename, counts in video_groups.items():
+            total = sum(counts.values())
 
             # Find winner
             most_frequent = counts.most_common(1)[0][0]
@@ -63,6 +90,75 @@ class StatisticsService:
             )
             stats_list.append(stats)
 
-        # 4. Save Report
+        # 3. Save Report
         self.storage.save_stats(stats_list)
         logger.info(f"Report generated for {len(stats_list)} videos.")
+
+    def generate_segment_report(self):
+        """
+        Aggregates the emotion segments by video, weighting each segment by its duration.
+        """
+        logger.info("Generating statistical report from segments...")
+
+        # structure: {'video_name': {'emotion': seconds}} and {'video_name': samples}
+        durations: Dict[str, Dict[str, float]] = {}
+        samples: Dict[str, Dict[str, int]] = {}
+
+        # Streamed, only the per-video sums are kept in memory
+        for segment in self.storage.iter_segments():
+            if not segment.file_name or not segment.dominant_emotion:
+                continue
+            video_durations = durations.setdefault(segment.file_name, {})
+            video_samples = samples.setdefault(segment.file_name, {})
+            video_durations[segment.dominant_emotion] = (
+                video_durations.get(segment.dominant_emotion, 0.0) + segment.duration
+            )
+            video_samples[segment.dominant_emotion] = (
+                video_samples.get(segment.dominant_emotion, 0) + segment.sample_count
+            )
+
+        if not durations:
+            logger.warning("No segments found to generate report.")
+            return
+
+        stats_list: List[VideoStats] = []
+        for filename, weights in durations.items():
+            # Single-sample videos have no duration, fall back to sample counts
+            if sum(weights.values()) <= 0:
+                weights = {emotion: float(count) for emotion, count in samples[filename].items()}
+            total_weight = sum(weights.values()) or 1.0
+
+            stats = VideoStats(
+                file_name=filename,
+                total_frames=sum(samples[filename].values()),
+                most_frequent_emotion=max(weights, key=weights.get),
+                emotion_distribution={
+                    emotion: round((weight / total_weight) * 100, 2)
+                    for emotion, weight in weights.items()
+                },
+            )
+            stats_list.append(stats)
+
+        self.storage.save_stats(stats_list)
+        logger.info(f"Report generated for {len(stats_list)} videos.")
+
+    def _count_emotions(self) -> Dict[str, Counter]:
+        """Counts in one pass, or per partition in worker processes when the storage is sharded."""
+        partitions = self.storage.partitions()
+        workers = min(self.workers, len(partitions))
+        if workers <= 1:
+            return count_emotions(self.storage.iter_all())
+
+        logger.info(f"Aggregating {len(partitions)} result partitions in {workers} processes")
+        video_groups: Dict[str, Counter] = {}
+        # Forking would copy the model runtime and logging threads of this process mid-state, so workers start fresh
+        context = multiprocessing.get_context("spawn")
+        with forwarded_logs(context) as log_queue:
+            with ProcessPoolExecutor(
+                max_workers=workers, mp_context=context, initializer=forward_logging, initargs=(log_queue,)
+            ) as pool:
+                # A video may span partitions (e.g. a re-run), so the partial counts are added up
+                for partial_groups in pool.map(count_partition, partitions):
+                    for filename, counts in partial_groups.items():
+                        video_groups.setdefault(filename, Counter()).update(counts)
+        return video_groups
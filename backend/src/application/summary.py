@@ -0,0 +1,180 @@
+import math
+import random
+from statistics import NormalDist
+from typing import Counter, Iterator, List, Optional, Tuple
+
+from backend.src.domain.interfaces import IEmotionDetector, IVideoSource
+from backend.src.domain.models import OutputData, SummarySampling, VideoStats
+from backend.src.application.frame import Frame
+from backend.src.application.video import Video
+from backend.src.infrastructure.logger import setup_logger
+
+logger = setup_logger("core.summary.py")
+
+# Emotions whose shares are bounded, also when they were never observed
+EMOTIONS = ["angry", "disgust", "fear", "happy", "sad", "surprise", "neutral"]
+
+
+def stratified_order(population: int, strata: int, rng: random.Random) -> Iterator[int]:
+    """
+    Yields every index of range(population) once, in a randomized stratified order.
+
+    The range is split into `strata` equal parts and every round takes one random,
+    not yet visited index of each part (parts in random order), so any prefix of
+    the order covers the whole video evenly.
+    """
+    strata = max(1, min(strata, population))
+    remaining = [list(range(population * i // strata, population * (i + 1) // strata)) for i in range(strata)]
+    for stratum in remaining:
+        rng.shuffle(stratum)
+
+    while remaining:
+        rng.shuffle(remaining)
+        for stratum in remaining:
+            yield stratum.pop()
+        remaining = [stratum for stratum in remaining if stratum]
+
+
+def error_bound(counts: Counter, visited: int, population: int, confidence: float) -> float:
+    """
+    Largest confidence interval half-width of the emotion shares, in percentage points.
+
+    Uses the Wilson score interval (well behaved for shares near 0 and 100%)
+    with a finite population correction, so a fully sampled video has no error.
+
+    Args:
+        counts: Dominant emotions of the sampled faces.
+        visited: Frames visited so far (with or without a face).
+        population: Frames that could be sampled.
+        confidence: Confidence level, e.g. 0.95.
+    """
+    n = sum(counts.values())
+    if n == 0:
+        return 100.0
+    if population > 1:
+        correction = math.sqrt(max(0.0, (population - visited) / (population - 1)))
+    else:
+        correction = 0.0
+
+    z = NormalDist().inv_cdf((1 + confidence) / 2)
+    widest = 0.0
+    for emotion in set(EMOTIONS) | set(counts):
+        p = counts[emotion] / n
+        half_width = z / (1 + z * z / n) * math.sqrt(p * (1 - p) / n + z * z / (4 * n * n))
+        widest = max(widest, half_width)
+    return widest * correction * 100
+
+
+class SummarySampler:
+    """
+    Estimates the emotion distribution of a video from as few frames as needed.
+
+    Frames on the sampling grid (every `step`-th frame) are visited in a
+    randomized stratified order by seeking, and sampling stops once every emotion
+    share is known within the tolerance. Sources that cannot seek are scanned in
+    full, which gives an exact summary.
+    """
+
+    def __init__(self, detector: IEmotionDetector, settings: SummarySampling, step: int = 1):
+        self.detector = detector
+        self.settings = settings
+        self.step = max(1, step)
+
+    def sample(self, source: IVideoSource, source_id: str) -> Tuple[Optional[VideoStats], List[OutputData]]:
+        """
+        Samples a video.
+
+        Returns:
+            Tuple[Optional[VideoStats], List[OutputData]]: The summary with its error
+            bound (None when no face was found) and the sampled results by time.
+        """
+        if not source.open():
+            logger.error(f"Could not open source: {source_id}")
+            return None, []
+
+        try:
+            fps = source.get_fps()
+            if fps <= 0:
+                logger.error(f"Invalid FPS ({fps}) for source: {source_id}")
+                return None, []
+
+            frame_count = source.get_frame_count()
+            if frame_count > 0 and source.seek(0):
+                results, visited, population = self._sample_randomized(source, source_id, fps, frame_count)
+            else:
+                logger.warning(f"{source_id} cannot seek, scanning every sampled frame for the summary")
+                results, visited, population = self._scan(source, source_id, fps)
+        finally:
+            source.release()
+
+        results.sort(key=lambda result: result.seconds)
+        counts = Counter(result.dominant_emotion for result in results)
+        if not counts:
+            logger.warning(f"No face found in the {visited} sampled frames of {source_id}")
+            return None, results
+
+        bound = error_bound(counts, visited, population, self.settings.confidence)
+        logger.info(
+            f"Summary of {source_id}: {visited} of {population} frames visited, {len(results)} faces, "
+            f"±{bound:.2f} pts at {self.settings.confidence:.0%}"
+        )
+        total = len(results)
+        stats = VideoStats(
+            file_name=source_id,
+            total_frames=total,
+            most_frequent_emotion=counts.most_common(1)[0][0],
+            emotion_distribution={emotion: round(count / total * 100, 2) for emotion, count in counts.items()},
+            error_bound=round(bound, 2),
+            confidence=self.settings.confidence,
+        )
+        return stats, results
+
+    def _sample_randomized(self, source: IVideoSource, source_id: str, fps: float, frame_count: int):
+        population = math.ceil(frame_count / self.step)
+        rng = random.Random(self.settings.seed)
+        results: List[OutputData] = []
+        counts: Counter = Counter()
+        visited = 0
+
+        for position in stratified_order(population, self.settings.strata, rng):
+            frame_idx = position * self.step
+            if not source.seek(frame_idx):
+                continue
+            frame_data = source.read()
+            if frame_data is None:
+                continue
+
+            visited += 1
+            result = self._analyze(frame_data, source_id, frame_idx, fps)
+            if result:
+                results.append(result)
+                counts[result.dominant_emotion] += 1
+
+            if visited >= self.settings.min_samples and (
+                error_bound(counts, visited, population, self.settings.confidence) <= self.settings.tolerance
+            ):
+                break
+
+        return results, visited, population
+
+    def _scan(self, source: IVideoSource, source_id: str, fps: float):
+        results: List[OutputData] = []
+        frame_idx = 0
+        visited = 0
+        while True:
+            frame_data = source.read()
+            if frame_data is None:
+                break
+            if frame_idx % self.step == 0:
+                visited += 1
+                result = self._analyze(frame_data, source_id, frame_idx, fps)
+                if result:
+                    results.append(result)
+            frame_idx += 1
+        return results, visited, visited
+
+    def _analyze(self, frame_data, source_id: str, frame_idx: int, fps: float) -> Optional[OutputData]:
+        result = Frame(image_data=frame_data, source_id=source_id, emotion_detector=self.detector).analyze()
+        if result:
+            Video.stamp(result, frame_idx / fps)
+        return result
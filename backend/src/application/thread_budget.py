@@ -0,0 +1,178 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, List, Optional
+
+from backend.src.domain.interfaces import IEmotionDetector, IImageReader, IVideoFactory
+from backend.src.domain.models import InputData, ThreadBudget
+
+from backend.src.infrastructure.logger import setup_logger
+
+logger = setup_logger("core.thread_budget.py")
+
+
+def plan_thread_budget(total_cores: Optional[int] = None, workers: Optional[int] = None) -> ThreadBudget:
+    """
+    Splits a core budget without measuring anything.
+
+    A quarter of the cores (at least one) decodes frames, the rest is shared by
+    the inference runtime. A single core is not split: decoding then runs on the
+    calling thread (decode_threads = 0). Without an explicit worker count, one
+    video is analyzed at a time and the runtime parallelizes inside the model instead.
+
+    Args:
+        total_cores: Cores to use, None = all cores of the machine.
+        workers: Videos analyzed in parallel.
+    """
+    total_cores = max(1, total_cores or os.cpu_count() or 1)
+    decode_threads = max(1, total_cores // 4) if total_cores > 1 else 0
+    workers = max(1, min(workers or 1, total_cores - decode_threads))
+    inference_threads = max(1, (total_cores - decode_threads) // workers)
+    return ThreadBudget(
+        total_cores=total_cores,
+        workers=workers,
+        decode_threads=decode_threads,
+        inference_threads=inference_threads,
+    )
+
+
+def candidate_budgets(total_cores: Optional[int] = None) -> List[ThreadBudget]:
+    """Returns the splits tried by the calibration: 1, 2, 4, ... workers."""
+    # Every worker needs at least one inference thread next to the decode threads
+    max_workers = plan_thread_budget(total_cores).inference_threads
+    candidates = []
+    workers = 1
+    while workers <= max_workers:
+        candidates.append(plan_thread_budget(total_cores, workers))
+        workers *= 2
+    return candidates
+
+
+def collect_sample_frames(
+    input_data: InputData,
+    video_factory: IVideoFactory,
+    list_images: Callable[[str], List[str]],
+    list_videos: Callable[[str], List[str]],
+    image_reader: Optional[IImageReader] = None,
+    count: int = 8,
+) -> List[Any]:
+    """
+    Reads a few frames of the actual input for the calibration run: the first
+    images of an image input, or frames of the first video at the sampling interval.
+
+    Args:
+        input_data: The input of the run.
+        video_factory: Opens the first video.
+        list_images: Lists the image files of a folder.
+        list_videos: Lists the video files of a folder.
+        image_reader: Decodes the images (None = the paths are returned).
+        count: Frames to collect.
+    """
+    if input_data.image_path:
+        if os.path.isdir(input_data.image_path):
+            paths = list_images(input_data.image_path)[:count]
+        else:
+            paths = [input_data.image_path]
+        if image_reader is None:
+            return paths
+        return [image for image in map(image_reader.read, paths) if image is not None]
+
+    if not input_data.video_path:
+        return []
+    if os.path.isdir(input_data.video_path):
+        videos = list_videos(input_data.video_path)
+        if not videos:
+            return []
+        video_path = sorted(videos)[0]
+    else:
+        video_path = input_data.video_path
+
+    source = video_factory.create(video_path)
+    if not source.open():
+        return []
+
+    frames = []
+    step = max(1, int(input_data.interval))
+    try:
+        frame_idx = 0
+        while len(frames) < count:
+            frame = source.read()
+            if frame is None:
+                break
+            if frame_idx % step == 0:
+                frames.append(frame)
+            frame_idx += 1
+    finally:
+        source.release()
+    return frames
+
+
+class ThreadBudgetCalibrator:
+    """
+    Picks the split of a core budget with a short calibration run.
+
+    Every candidate budget is applied first, then a detector is created for it,
+    so runtimes that size their thread pools at construction (ONNX sessions)
+    really run with the candidate's inference threads. The sample frames are
+    then analyzed by `workers` threads for `duration` seconds. The split with the
+    highest throughput wins.
+
+    A factory returning one shared detector (TensorFlow, whose pools are fixed
+    once its context exists) only calibrates the worker count.
+    """
+
+    def __init__(
+        self,
+        detector_factory: Callable[[ThreadBudget], IEmotionDetector],
+        frames: List[Any],
+        apply_budget: Callable[[ThreadBudget], None],
+        duration: float = 2.0,
+    ):
+        """
+        Args:
+            detector_factory: Creates the detector for a budget, called after the budget is applied.
+            frames: Sample frames of the input (see collect_sample_frames).
+            apply_budget: Applies a budget to the libraries (infrastructure side).
+            duration: Seconds measured per candidate.
+        """
+        self.detector_factory = detector_factory
+        self.frames = frames
+        self.apply_budget = apply_budget
+        self.duration = duration
+
+    def calibrate(self, candidates: List[ThreadBudget]) -> ThreadBudget:
+        """Returns the fastest candidate (the first one if nothing could be measured)."""
+        if not self.frames or len(candidates) == 1:
+            return candidates[0]
+
+        best, best_rate = candidates[0], 0.0
+        for budget in candidates:
+            self.apply_budget(budget)
+            detector = self.detector_factory(budget)
+            # The first call loads the model, which must not be measured
+            detector.detect(self.frames[0])
+            rate = self._measure(detector, budget.workers)
+            logger.info(
+                f"Calibration: {budget.workers} workers x {budget.inference_threads} inference threads, "
+                f"{budget.decode_threads} decode threads -> {rate:.1f} frames/s"
+            )
+            if rate > best_rate:
+                best, best_rate = budget, rate
+
+        return best
+
+    def _measure(self, detector: IEmotionDetector, workers: int) -> float:
+        deadline = time.perf_counter() + self.duration
+        frame_count = len(self.frames)
+
+        def work(offset: int) -> int:
+            done = 0
+            while time.perf_counter() < deadline:
+                detector.detect(self.frames[(offset + done) % frame_count])
+                done += 1
+            return done
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            done = sum(pool.map(work, range(workers)))
+        return done / max(time.perf_counter() - start, 1e-9)
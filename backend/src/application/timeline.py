@@ -0,0 +1,82 @@
+from typing import Dict, List, Optional
+
+from backend.src.domain.models import EmotionSegment, OutputData
+
+
+class SegmentBuilder:
+    """
+    Run-length encodes a stream of results into emotion segments.
+
+    Consecutive samples of the same video with the same dominant emotion are
+    merged into one segment with averaged scores. A segment lasts until the
+    first sample of the next segment; the last one of a video is extended by the
+    last observed sampling gap.
+    """
+
+    def __init__(self):
+        self._file_name: Optional[str] = None
+        self._emotion: Optional[str] = None
+        self._start = 0.0
+        self._last = 0.0
+        self._last_gap = 0.0
+        self._count = 0
+        self._score_sums: Dict[str, float] = {}
+
+    def add(self, result: OutputData) -> Optional[EmotionSegment]:
+        """
+        Adds the next sample in timeline order.
+
+        Returns:
+            EmotionSegment: The segment closed by this sample, if any.
+        """
+        closed = None
+        if self._count and result.file_name != self._file_name:
+            closed = self.flush()
+        elif self._count and result.dominant_emotion != self._emotion:
+            self._last_gap = result.seconds - self._last
+            closed = self._close(end=result.seconds)
+
+        if self._count:
+            self._last_gap = result.seconds - self._last
+        else:
+            self._file_name = result.file_name
+            self._emotion = result.dominant_emotion
+            self._start = result.seconds
+
+        self._last = result.seconds
+        self._count += 1
+        for emotion, score in result.emotion.items():
+            self._score_sums[emotion] = self._score_sums.get(emotion, 0.0) + float(score)
+
+        return closed
+
+    def add_all(self, results: List[OutputData]) -> List[EmotionSegment]:
+        """Adds several samples and returns the segments they closed."""
+        segments = []
+        for result in results:
+            segment = self.add(result)
+            if segment:
+                segments.append(segment)
+        return segments
+
+    def flush(self) -> Optional[EmotionSegment]:
+        """Closes the open segment at the end of a video."""
+        if not self._count:
+            return None
+
+        segment = self._close(end=self._last + self._last_gap)
+        self._last_gap = 0.0
+        return segment
+
+    def _close(self, end: float) -> EmotionSegment:
+        segment = EmotionSegment(
+            file_name=self._file_name,
+            start=self._start,
+            end=end,
+            dominant_emotion=self._emotion,
+            emotion={emotion: total / self._count for emotion, total in self._score_sums.items()},
+            sample_count=self._count,
+        )
+        self._count = 0
+        self._score_sums = {}
+        return segment
@@ -1,12 +1,21 @@
-from typing import Generator
+import threading
+import time
+from typing import Generator, List, Optional, Tuple
 
-from backend.src.domain.interfaces import IEmotionDetector, IVideoSource
-from backend.src.domain.models import OutputData
+import numpy as np
+
+from backend.src.domain.interfaces import IEmotionDetector, IFaceCropper, IFaceCropStore, IVideoSource
+from backend.src.domain.models import AdaptiveSampling, FaceCrop, OutputData
 from backend.src.application.frame import Frame
 from backend.src.infrastructure.logger import setup_logger
+from backend.src.infrastructure.memory_budget import MemoryBudget
+from backend.src.infrastructure.tracing import tracer
 
 logger = setup_logger("VideoProcessor")
 
+# (frame index, analysis result or None when no face was found)
+Sample = Tuple[int, Optional[OutputData]]
+
 
 class Video:
     """
@@ -15,74 +24,391 @@ class Video:
     """
 
     def __init__(
-        self, source: IVideoSource, detector: IEmotionDetector, source_id: str
+        self,
+        source: IVideoSource,
+        detector: IEmotionDetector,
+        source_id: str,
+        cropper: Optional[IFaceCropper] = None,
+        crop_store: Optional[IFaceCropStore] = None,
+        memory_budget: Optional[MemoryBudget] = None,
+        stop_event: Optional[threading.Event] = None,
     ):
         """
         Args:
             source: The interface to read frames.
             detector: The interface to analyze emotions.
             source_id: The identifier (filename) for reporting.
+            cropper: Optional face cropper; with a crop store, the face the detector
+                     classified in every analyzed frame is kept for later re-scoring.
+            crop_store: Optional store receiving the face crops.
+            memory_budget: Optional budget accounting the frames held in memory; when
+                           it runs short, adaptive refinement stops buffering frames.
+            stop_event: Optional event ending the scan at the next frame once set.
         """
         self.source = source
         self.detector = detector
         self.source_id = source_id
+        self.cropper = cropper if crop_store else None
+        self.crop_store = crop_store
+        self._crops: List[FaceCrop] = []
+        self.memory_budget = memory_budget
+        self._pending_bytes = 0  # buffered frames reserved in the memory budget
+        self._stop_event = stop_event or threading.Event()
+
+        self.opened = False  # the source was opened and has a valid FPS
+        self.fps = 0.0
+        self.frames_read = 0
+        self.frame_step = 1
 
-    def process(self, frame_step: int = 1) -> Generator[OutputData, None, None]:
+    def process(
+        self, frame_step: int = 1, adaptive: Optional[AdaptiveSampling] = None
+    ) -> Generator[OutputData, None, None]:
         """
         Process for frame extraction and analysis.
         Args:
             frame_step: The step size for frame extraction.
-                        1 = Process every frame. 
+                        1 = Process every frame.
                           10 = Process every 10th frame.
+            adaptive: Optional adaptive sampling settings. When given, frame_step is
+                      the coarse scan step and gaps with emotion changes are refined.
         """
-        if not self.source.open():
-            logger.error(f"Could not open source: {self.source_id}")
+        if not self._open():
+            return
+
+        fps = self.fps
+        step = self.frame_step = max(1, frame_step)
+        processed_count = 0
+
+        mode = "adaptive" if adaptive else "fixed"
+        logger.info("Starting processing: %s (FPS: %.2f) Step: every %d frames (%s)", self.source_id, fps, step, mode)
+        completed = False
+        try:
+            if adaptive:
+                processed_count = yield from self._process_adaptive(fps, step, adaptive)
+            else:
+                processed_count = yield from self._process_fixed(fps)
+            completed = not self.stopped
+        finally:
+            self.source.release()
+            self._release_pending()
+            self._flush_crops()
+            # Crops of an interrupted scan must not replace the ones of an earlier, complete run
+            if self.crop_store and completed:
+                self.crop_store.finish(self.source_id)
+            logger.info("Finished %s. Total detections: %d", self.source_id, processed_count)
+
+    def sampled_frames(self, frame_step: int = 1) -> Generator[Tuple[int, np.ndarray], None, None]:
+        """
+        Reads every `frame_step`-th frame without analyzing it, for callers that
+        run the detector themselves (e.g. batching frames of several videos).
+
+        Yields:
+            Tuple[int, np.ndarray]: The frame index and the frame.
+        """
+        if not self._open():
             return
 
+        self.frame_step = max(1, frame_step)
+        try:
+            yield from self._sampled_frames()
+        finally:
+            self.source.release()
+
+    def set_frame_step(self, step: int):
+        """Changes the sampling step of a running fixed-interval scan (e.g. to meet a real-time target)."""
+        self.frame_step = max(1, step)
+
+    @property
+    def stopped(self) -> bool:
+        """True if the scan was ended by the stop event before the end of the stream."""
+        return self._stop_event.is_set()
+
+    def _open(self) -> bool:
+        self.frames_read = 0
+        self.opened = False
+        if not self.source.open():
+            logger.error("Could not open source: %s", self.source_id)
+            return False
+
         fps = self.source.get_fps()
         if fps <= 0:
-            logger.error(f"Invalid FPS ({fps}) for source: {self.source_id}")
+            logger.error("Invalid FPS (%s) for source: %s", fps, self.source_id)
             self.source.release()
-            return
+            return False
+
+        self.fps = fps
+        self.opened = True
+        return True
+
+    def _process_fixed(self, fps: float) -> Generator[OutputData, None, int]:
+        """Analyzes every `step`-th frame of the stream, following later set_frame_step calls."""
+        processed_count = 0
+        frame_count = self.source.get_frame_count()
+        started = time.perf_counter()
+
+        for current_frame_idx, frame_data in self._sampled_frames():
+            result = self._analyze(frame_data, current_frame_idx)
+
+            # Results are yielded one by one for efficiency
+            if result:
+                self.stamp(result, current_frame_idx / fps)
+                yield result
+                processed_count += 1
+
+                if processed_count % 10 == 0:
+                    logger.info(
+                        "Processed %d frames...%s",
+                        processed_count, self._progress(current_frame_idx, frame_count, started),
+                    )
+
+        return processed_count
 
-        step = max(1, frame_step)
+    def _sampled_frames(self) -> Generator[Tuple[int, np.ndarray], None, None]:
+        """
+        Reads every `frame_step`-th frame of the opened stream.
+
+        Sources that can seek jump straight to the next sample and decide themselves
+        whether seeking or decoding forward is cheaper; the others are read frame by frame.
+        """
         current_frame_idx = 0
+        next_sample_idx = 0
+        can_seek = True
+
+        while not self._stop_event.is_set():
+            if can_seek and current_frame_idx < next_sample_idx:
+                with tracer.span("decode.seek", video=self.source_id, frame=next_sample_idx):
+                    can_seek = self.source.seek(next_sample_idx)
+                if can_seek:
+                    current_frame_idx = next_sample_idx
+
+            with tracer.span("decode", video=self.source_id, frame=current_frame_idx):
+                frame_data = self.source.read()
+            if frame_data is None:
+                break  # End of stream
+            self.frames_read = current_frame_idx + 1
+
+            if current_frame_idx >= next_sample_idx:
+                yield current_frame_idx, frame_data
+
+                # Read after the yield, so a step changed by the consumer applies right away
+                next_sample_idx = current_frame_idx + self.frame_step
+
+            current_frame_idx += 1
+
+    def _process_adaptive(
+        self, fps: float, step: int, sampling: AdaptiveSampling
+    ) -> Generator[OutputData, None, int]:
+        """
+        Scans every `step`-th frame and refines the gaps where the emotion changes.
+
+        Frames between two coarse samples are kept in memory, so a gap can be
+        revisited by bisection without seeking the source. Coarse samples are
+        always analyzed; `max_refinements` only limits the refinement.
+        """
+        budget = sampling.max_refinements
+        inferences = 0
+        refinements = 0
         processed_count = 0
 
-        logger.info(f"Starting processing: {self.source_id} (FPS: {fps:.2f}) Step: every {step} frames)")
-        try:
-            while True:
+        previous: Optional[Sample] = None
+        pending: List[Tuple[int, np.ndarray]] = []  # frames since the previous coarse sample
+        buffering = True  # False once a gap no longer fits into the memory budget
+        last_frame: Optional[Tuple[int, np.ndarray]] = None  # kept while not buffering, closes the tail
+        skipped_gaps = 0
+        current_frame_idx = 0
+
+        while not self._stop_event.is_set():
+            with tracer.span("decode", video=self.source_id, frame=current_frame_idx):
                 frame_data = self.source.read()
-                if frame_data is None:
-                    break  # End of stream
-
-                if current_frame_idx % step == 0:
-                    # Inject detector into Frame
-                    frame_obj = Frame(
-                        image_data=frame_data,
-                        source_id=self.source_id,
-                        emotion_detector=self.detector,
-                    )
+            if frame_data is None:
+                break  # End of stream
+            self.frames_read = current_frame_idx + 1
+
+            if current_frame_idx % step == 0:
+                current = (current_frame_idx, self._analyze(frame_data, current_frame_idx))
+                inferences += 1
 
-                    result: OutputData = frame_obj.analyze()
+                remaining = None if budget is None else max(0, budget - refinements)
+                refined = self._refine(previous, current, pending, sampling.change_threshold, remaining)
+                refinements += len(refined)
+                inferences += len(refined)
 
-                    # Results are yielded one by one for efficiency
+                for frame_idx, result in refined + [current]:
                     if result:
-                        result.timestamp = self._frame_to_time(current_frame_idx, fps)
+                        self.stamp(result, frame_idx / fps)
                         yield result
                         processed_count += 1
 
-                    if processed_count % 10 == 0 and processed_count > 0:
-                        logger.info(f"Processed {processed_count} frames...")
+                previous = current
+                pending = []
+                self._release_pending()
+                buffering = True
+                last_frame = None
+            elif previous is not None:
+                if buffering and self._hold_pending(frame_data.nbytes):
+                    pending.append((current_frame_idx, frame_data))
+                else:
+                    if buffering:
+                        # Without all frames of the gap it cannot be bisected, so it stays coarse
+                        pending = []
+                        self._release_pending()
+                        buffering = False
+                        skipped_gaps += 1
+                    last_frame = (current_frame_idx, frame_data)
+
+            current_frame_idx += 1
+
+        if last_frame is not None:
+            pending = [last_frame]
+
+        # Close the tail of the video so changes after the last coarse sample are found
+        if previous is not None and pending and not self._stop_event.is_set():
+            last_idx, last_frame = pending.pop()
+            closing = (last_idx, self._analyze(last_frame, last_idx))
+            inferences += 1
+
+            remaining = None if budget is None else max(0, budget - refinements)
+            refined = self._refine(previous, closing, pending, sampling.change_threshold, remaining)
+            refinements += len(refined)
+            inferences += len(refined)
+
+            for frame_idx, result in refined + [closing]:
+                if result:
+                    self.stamp(result, frame_idx / fps)
+                    yield result
+                    processed_count += 1
+
+        self._release_pending()
+        if skipped_gaps:
+            logger.warning("Memory budget: %d gaps of %s were not refined", skipped_gaps, self.source_id)
+        logger.info(
+            "Adaptive sampling used %d inferences (%d refinements) for %d frames",
+            inferences, refinements, current_frame_idx,
+        )
+        return processed_count
+
+    def _refine(
+        self,
+        left: Optional[Sample],
+        right: Sample,
+        pending: List[Tuple[int, np.ndarray]],
+        threshold: float,
+        budget: Optional[int],
+    ) -> List[Sample]:
+        """
+        Bisects the gap between two samples while their emotions differ.
+
+        Args:
+            left: The earlier sample (None for the first coarse sample).
+            right: The later sample.
+            pending: Buffered frames strictly between left and right.
+            threshold: Score change (percentage points) that triggers refinement.
+            budget: Max number of extra inferences, None = unlimited.
+
+        Returns:
+            List[Sample]: The refined samples ordered by frame index.
+        """
+        if left is None or not pending:
+            return []
+
+        first_idx = pending[0][0]
+        refined: List[Sample] = []
+        stack = [(left, right)]
+
+        while stack and (budget is None or len(refined) < budget):
+            low, high = stack.pop()
+            if high[0] - low[0] <= 1 or not self._has_changed(low[1], high[1], threshold):
+                continue
+
+            mid_idx = (low[0] + high[0]) // 2
+            middle = (mid_idx, self._analyze(pending[mid_idx - first_idx][1], mid_idx))
+            refined.append(middle)
+
+            # Push the later half first so the earlier half is refined first
+            stack.append((middle, high))
+            stack.append((low, middle))
+
+        return sorted(refined, key=lambda sample: sample[0])
+
+    def _has_changed(self, a: Optional[OutputData], b: Optional[OutputData], threshold: float) -> bool:
+        """Checks whether two results differ in dominant emotion or score vector."""
+        if a is None or b is None:
+            return (a is None) != (b is None)
+
+        if a.dominant_emotion != b.dominant_emotion:
+            return True
+
+        emotions = set(a.emotion) | set(b.emotion)
+        return any(abs(a.emotion.get(e, 0.0) - b.emotion.get(e, 0.0)) > threshold for e in emotions)
 
-                current_frame_idx += 1
+    def _analyze(self, frame_data: np.ndarray, frame_idx: int) -> Optional[OutputData]:
+        if self.memory_budget:
+            self.memory_budget.reserve(frame_data.nbytes)
+        try:
+            with tracer.frame(self.source_id, frame_idx):
+                # Inject detector into Frame
+                frame_obj = Frame(
+                    image_data=frame_data,
+                    source_id=self.source_id,
+                    emotion_detector=self.detector,
+                )
+                with tracer.span("detect"):
+                    result = frame_obj.analyze()
+
+                if self.cropper and result and result.face_box:
+                    with tracer.span("preprocess.crop"):
+                        self._keep_crop(frame_data, frame_idx, result.face_box)
+                return result
         finally:
-            self.source.release()
-            logger.info(
-                f"Finished {self.source_id}. Total detections: {processed_count}"
-            )
-
-    def _frame_to_time(self, frame_idx: int, fps: float) -> str:
-        seconds = int(frame_idx / fps)
-        m, s = divmod(seconds, 60)
-        return f"{m:02d}:{s:02d}"
+            self._release(frame_data.nbytes)
+
+    def _hold_pending(self, nbytes: int) -> bool:
+        """Reserves a buffered frame if it stays below the high-water mark of the budget."""
+        if not self.memory_budget:
+            return True
+        if not self.memory_budget.fits(nbytes):
+            return False
+        self.memory_budget.reserve(nbytes)
+        self._pending_bytes += nbytes
+        return True
+
+    def _release_pending(self):
+        self._release(self._pending_bytes)
+        self._pending_bytes = 0
+
+    def _release(self, nbytes: int):
+        if self.memory_budget and nbytes:
+            self.memory_budget.release(nbytes)
+
+    def _keep_crop(self, frame_data: np.ndarray, frame_idx: int, box: Tuple[int, int, int, int]):
+        """Keeps the face the detector classified, so a re-score sees the same face."""
+        self._crops.append(FaceCrop(
+            file_name=self.source_id,
+            frame_idx=frame_idx,
+            seconds=frame_idx / self.fps,
+            box=box,
+            image=self.cropper.crop_region(frame_data, box),
+        ))
+        if len(self._crops) >= 256 or (self.memory_budget and self.memory_budget.under_pressure):
+            self._flush_crops()
+
+    def _flush_crops(self):
+        if self._crops:
+            self.crop_store.write(self._crops)
+            self._crops = []
+
+    @staticmethod
+    def stamp(result: OutputData, seconds: float):
+        """Sets the position of a result in its video: the exact seconds and the "MM:SS" timestamp."""
+        result.seconds = seconds
+        m, s = divmod(int(seconds), 60)
+        result.timestamp = f"{m:02d}:{s:02d}"
+
+    def _progress(self, frame_idx: int, frame_count: int, started: float) -> str:
+        """Formats the position and the ETA when the frame count is known."""
+        if frame_count <= 0 or frame_idx <= 0:
+            return ""
+        done = min(1.0, (frame_idx + 1) / frame_count)
+        remaining = (time.perf_counter() - started) * (1 - done) / done
+        m, s = divmod(int(remaining), 60)
+        return f" {done * 100:.0f}% (ETA {m:02d}:{s:02d})"
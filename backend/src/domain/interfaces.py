@@ -1,7 +1,7 @@
-from typing import Dict, Any, Optional, List
+from typing import Callable, Dict, Any, Iterator, Optional, List, Tuple
 from abc import ABC, abstractmethod
 import numpy as np
-from backend.src.domain.models import OutputData, VideoStats
+from backend.src.domain.models import EmotionSegment, FaceCrop, OutputData, VideoAggregate, VideoMetadata, VideoStats
 
 
 class IStorage(ABC):
@@ -22,11 +22,71 @@ class IStorage(ABC):
         """Reads all raw results from storage."""
         pass
 
+    def iter_all(self) -> Iterator[Dict[str, Any]]:
+        """Streams all raw results; storages that can read lazily should override this."""
+        return iter(self.load_all())
+
+    def partitions(self) -> List[Callable[[], Iterator[Dict[str, Any]]]]:
+        """
+        Independent, picklable readers of disjoint parts of the raw results, so
+        they can be aggregated in worker processes. Empty = read with iter_all.
+        """
+        return []
+
+    def flush(self) -> None:
+        """Persists buffered results. Called at the end of every video and run."""
+        pass
+
     @abstractmethod
     def save_stats(self, stats: List[VideoStats]) -> None:
         """Saves the aggregated statistical report."""
         pass
 
+    def upsert_stats(self, stats: List[VideoStats]) -> None:
+        """
+        Inserts or replaces the summaries of single videos, keeping the others.
+        The default saves them as the report.
+        """
+        self.save_stats(stats)
+
+    @abstractmethod
+    def write_segments(self, segments: List[EmotionSegment]) -> None:
+        """Appends run-length encoded emotion segments."""
+        pass
+
+    @abstractmethod
+    def load_segments(self) -> List[EmotionSegment]:
+        """Reads all emotion segments from storage."""
+        pass
+
+    def iter_segments(self) -> Iterator[EmotionSegment]:
+        """Streams the emotion segments; storages that can read lazily should override this."""
+        return iter(self.load_segments())
+
+    @abstractmethod
+    def save_aggregates(self, aggregates: List[VideoAggregate]) -> None:
+        """Inserts or replaces per-video aggregates in the video index."""
+        pass
+
+    @abstractmethod
+    def load_aggregates(self) -> List[VideoAggregate]:
+        """Reads all per-video aggregates from the video index."""
+        pass
+
+
+class IStagedStorage(IStorage):
+    """Storage holding back writes until they are committed, so a unit of work is stored completely or not at all."""
+
+    @abstractmethod
+    def commit(self) -> None:
+        """Writes everything staged since the last commit or discard."""
+        pass
+
+    @abstractmethod
+    def discard(self) -> None:
+        """Drops everything staged since the last commit or discard."""
+        pass
+
 
 class IEmotionDetector(ABC):
     """Abstract interface for emotion detection strategies."""
@@ -39,6 +99,28 @@ class IEmotionDetector(ABC):
         """
         pass
 
+    def detect_batch(self, frames: List[Any]) -> List[Optional[Dict[str, Any]]]:
+        """
+        Detects emotion in several images at once, one result (or None) per image.
+        Detectors that can run batched inference should override this.
+        """
+        return [self.detect(frame) for frame in frames]
+
+    def classify_faces(self, faces: List[np.ndarray]) -> List[Optional[Dict[str, Any]]]:
+        """
+        Classifies already cropped faces, skipping face detection where the detector allows it.
+        Used to re-score stored face crops; the default runs the full detection on the crops.
+        """
+        return self.detect_batch(faces)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Returns runtime counters of the detector (empty if it keeps none)."""
+        return {}
+
+    def close(self) -> None:
+        """Releases resources and persists state. Called once the detector is no longer used."""
+        pass
+
 class IVideoSource(ABC):
     """
     Abstract interface for reading frames from a video source.
@@ -58,13 +140,123 @@ class IVideoSource(ABC):
         """Reads the next frame. Returns None if end of stream."""
         pass
 
+    def get_frame_count(self) -> int:
+        """Returns the number of frames of the opened source, 0 if unknown."""
+        return 0
+
+    def get_duration(self) -> float:
+        """Returns the duration of the opened source in seconds, 0 if unknown."""
+        fps = self.get_fps()
+        return self.get_frame_count() / fps if fps > 0 else 0.0
+
+    def seek(self, frame_idx: int) -> bool:
+        """
+        Moves to a frame so the next read returns it.
+        Returns False if the source cannot seek; it then has to be read sequentially.
+        """
+        return False
+
     @abstractmethod
     def release(self) -> None:
         """Releases resources."""
         pass
 
+class IFaceCropper(ABC):
+    """Abstract interface for extracting a normalized face crop from a frame."""
+
+    @abstractmethod
+    def crop_region(self, frame: np.ndarray, box: Tuple[int, int, int, int]) -> np.ndarray:
+        """Returns the normalized crop of the face at the (x, y, width, height) box."""
+        pass
+
+class IFaceCropStore(ABC):
+    """Abstract interface for persisting face crops per video."""
+
+    @abstractmethod
+    def write(self, crops: List[FaceCrop]) -> None:
+        """Appends crops; they replace the crops of an earlier run once the video is finished."""
+        pass
+
+    def finish(self, file_name: str) -> None:
+        """Marks the crops of a completely analyzed video as final (default: written crops are final)."""
+        pass
+
+    @abstractmethod
+    def flush(self) -> None:
+        """Persists buffered crops."""
+        pass
+
+    @abstractmethod
+    def videos(self) -> List[str]:
+        """Returns the videos with stored crops."""
+        pass
+
+    @abstractmethod
+    def load(self, file_name: str) -> Iterator[FaceCrop]:
+        """Streams the crops of a video in the order they were written."""
+        pass
+
+class IAsyncVideoSource(ABC):
+    """
+    Abstract interface for reading frames from a video source without blocking the event loop.
+    """
+    @abstractmethod
+    async def open(self) -> bool:
+        """Prepares the video source for reading."""
+        pass
+
+    @abstractmethod
+    def get_fps(self) -> float:
+        """Returns the frames per second of the opened source."""
+        pass
+
+    @abstractmethod
+    async def read(self) -> Optional[np.ndarray]:
+        """Reads the next frame, waiting for live sources. Returns None if end of stream."""
+        pass
+
+    @abstractmethod
+    async def release(self) -> None:
+        """Releases resources."""
+        pass
+
+class IAsyncStorage(ABC):
+    """Abstract interface for writing results from asyncio code."""
+
+    @abstractmethod
+    async def write_batch(self, rows: List[OutputData]) -> None:
+        """Writes a batch of results."""
+        pass
+
+    @abstractmethod
+    async def write_segments(self, segments: List[EmotionSegment]) -> None:
+        """Appends run-length encoded emotion segments."""
+        pass
+
+    @abstractmethod
+    async def save_aggregates(self, aggregates: List[VideoAggregate]) -> None:
+        """Inserts or replaces per-video aggregates in the video index."""
+        pass
+
+    @abstractmethod
+    async def flush(self) -> None:
+        """Persists buffered results."""
+        pass
+
+class IImageReader(ABC):
+    """Abstract interface for decoding still images from files."""
+
+    @abstractmethod
+    def read(self, file_path: str) -> Optional[np.ndarray]:
+        """Decodes an image file. Returns None if it cannot be read."""
+        pass
+
 class IVideoFactory(ABC):
     """Factory interface to create video sources from paths."""
     @abstractmethod
     def create(self, file_path: str) -> IVideoSource:
-        pass
\ No newline at end of file
+        pass
+
+    def probe(self, file_path: str) -> Optional[VideoMetadata]:
+        """Reads the metadata of a video without starting to decode it (None = unknown, open a source instead)."""
+        return None
@@ -1,5 +1,71 @@
-from dataclasses import dataclass
-from typing import Dict, Optional
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+@dataclass
+class AdaptiveSampling:
+    """
+    Data class model for the adaptive temporal sampler settings.
+
+    The video is scanned every `interval` frames and the gap between two samples
+    is refined whenever the detected emotion changes by more than `change_threshold`.
+    The coarse samples are always analyzed, `max_refinements` only bounds the extra ones.
+    """
+
+    change_threshold: float = 20.0  # max score difference (in percentage points)
+    max_refinements: Optional[int] = None  # per-video budget of refinement inferences, None = unlimited
+
+
+@dataclass
+class SummarySampling:
+    """
+    Data class model for the summary-only sampling mode.
+
+    Frames are visited in a randomized, stratified order and sampling stops once
+    the confidence interval of every emotion share is narrower than `tolerance`.
+    """
+
+    tolerance: float = 2.0  # max confidence interval half-width (in percentage points)
+    confidence: float = 0.95  # confidence level of the intervals
+    strata: int = 16  # equal parts of the video, every round samples each part once
+    min_samples: int = 30  # frames visited before the stopping rule is checked
+    seed: Optional[int] = None  # random seed, None = different order on every run
+
+
+@dataclass
+class RealTimeTarget:
+    """
+    Data class model for the real-time-factor target mode.
+
+    The real-time factor (RTF) is processing time divided by video duration,
+    e.g. 0.5 = a one hour recording is analyzed in 30 minutes. A deadline is
+    turned into the RTF needed for the videos that are still left.
+    """
+
+    factor: Optional[float] = None  # target RTF
+    deadline: Optional[float] = None  # unix time the run must be finished by
+    max_workers: int = 1  # upper bound for videos analyzed in parallel
+    window: int = 20  # samples measured before every adjustment
+
+
+@dataclass
+class ThreadBudget:
+    """
+    Data class model for splitting a total core budget between our own thread
+    pools and the internal thread pools of OpenCV and the inference runtime.
+    """
+
+    total_cores: int
+    workers: int = 1  # videos analyzed in parallel
+    decode_threads: int = 1  # OpenCV / image decoding threads (0 = on the calling thread)
+    inference_threads: int = 1  # inference runtime threads per worker
+
+    @property
+    def inference_pool(self) -> int:
+        """Threads of the inference runtime pool shared by all workers."""
+        return self.workers * self.inference_threads
 
 
 @dataclass
@@ -12,6 +78,14 @@ class InputData:
     video_path: Optional[str] = None
     output_path: str = "./data/output"
     interval: float = 1.0 # Process one frame seconsds
+    adaptive: Optional[AdaptiveSampling] = None  # None = fixed interval sampling
+    batch_size: int = 16  # images per detector call in image directory mode
+    decode_threads: int = 4  # threads decoding images in image directory mode
+    timeline: str = "frames"  # "frames", "segments" or "both"
+    thread_budget: Optional[ThreadBudget] = None  # None = library defaults, one video at a time
+    realtime: Optional[RealTimeTarget] = None  # None = fixed interval and worker count
+    summary: Optional[SummarySampling] = None  # None = analyze every sampled frame
+    cross_batch: int = 1  # videos of a folder interleaved into shared detector batches
 
 
 @dataclass
@@ -24,6 +98,54 @@ class OutputData:
     dominant_emotion: str
     emotion: Dict[str, float]
     timestamp: str = "00:00"  # timestamp field to handle video timeline
+    seconds: float = 0.0  # exact sample time in seconds, used for durations
+    face_box: Optional[Tuple[int, int, int, int]] = None  # (x, y, width, height) of the classified face
+
+
+@dataclass
+class EmotionSegment:
+    """
+    Data class model for a run of consecutive samples with the same dominant emotion.
+    """
+
+    file_name: str
+    start: float  # seconds
+    end: float  # seconds
+    dominant_emotion: str
+    emotion: Dict[str, float]  # averaged scores over the samples of the segment
+    sample_count: int
+
+    @property
+    def duration(self) -> float:
+        return max(0.0, self.end - self.start)
+
+@dataclass
+class VideoMetadata:
+    """
+    Data class model for the container metadata of a video, cached in the sidecar index.
+    """
+    file_name: str
+    frame_count: int
+    fps: float
+    duration: float  # seconds
+    width: int
+    height: int
+    codec: str
+    keyframes: List[int] = field(default_factory=list)  # frame indices, empty = unknown
+
+
+@dataclass
+class FaceCrop:
+    """
+    Data class model for a normalized face crop of a sampled video frame,
+    kept so archives can be re-scored by another classifier without decoding.
+    """
+    file_name: str
+    frame_idx: int
+    seconds: float
+    box: Tuple[int, int, int, int]  # (x, y, width, height) in the original frame
+    image: np.ndarray  # square BGR crop, uint8
+
 
 @dataclass
 class VideoStats:
@@ -34,3 +156,33 @@ class VideoStats:
     total_frames: int
     most_frequent_emotion: str
     emotion_distribution: Dict[str, float] # e.g., {'happy': 40.0, 'sad': 10.0}
+    # Set by summary-only sampling: achieved half-width of the intervals (percentage points)
+    error_bound: Optional[float] = None
+    confidence: Optional[float] = None
+
+
+@dataclass
+class VideoAggregate:
+    """
+    Data class for the precomputed per-video aggregate, indexed by the
+    Guest_Host_Topic parts of the file name.
+    """
+    file_name: str
+    guest: str
+    host: str
+    topic: str
+    total_frames: int
+    emotion_counts: Dict[str, int]  # e.g., {'happy': 40, 'sad': 10}
+
+
+@dataclass
+class DimensionStats:
+    """
+    Data class for the emotion summary of one guest, host or topic across videos.
+    """
+    dimension: str  # 'guest', 'host' or 'topic'
+    value: str
+    videos: int
+    total_frames: int
+    most_frequent_emotion: str
+    emotion_distribution: Dict[str, float]
@@ -0,0 +1,103 @@
+import asyncio
+import time
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import List, Optional
+
+import numpy as np
+
+from backend.src.domain.interfaces import IAsyncStorage, IAsyncVideoSource, IStorage, IVideoSource
+from backend.src.domain.models import EmotionSegment, OutputData, VideoAggregate
+
+
+class ExecutorVideoSource(IAsyncVideoSource):
+    """Async view of a blocking IVideoSource; decoding runs in an executor.
+
+    Each source gets its own single-thread executor by default, so a stream's
+    frames stay in order and a slow decoder never blocks the event loop.
+    """
+
+    def __init__(self, source: IVideoSource, executor: Optional[Executor] = None):
+        self.source = source
+        self._owns_executor = executor is None
+        self.executor = executor or ThreadPoolExecutor(max_workers=1, thread_name_prefix="async-decode")
+
+    async def open(self) -> bool:
+        return await self._run(self.source.open)
+
+    def get_fps(self) -> float:
+        return self.source.get_fps()
+
+    async def read(self) -> Optional[np.ndarray]:
+        return await self._run(self.source.read)
+
+    async def release(self) -> None:
+        await self._run(self.source.release)
+        if self._owns_executor:
+            self.executor.shutdown(wait=False)
+
+    async def _run(self, func):
+        return await asyncio.get_running_loop().run_in_executor(self.executor, func)
+
+
+class PacedFileVideoSource(ExecutorVideoSource):
+    """File-backed source that simulates live input.
+
+    Frame `n` is not returned before `n / fps` seconds after opening, so a
+    recording behaves like a camera or broadcast feed delivering frames at its
+    frame rate.
+
+    Attributes:
+        speed (float): Playback speed; 2.0 delivers the frames twice as fast.
+    """
+
+    def __init__(self, source: IVideoSource, speed: float = 1.0, executor: Optional[Executor] = None,
+                 clock=time.monotonic):
+        super().__init__(source, executor)
+        self.speed = speed if speed > 0 else 1.0
+        self._clock = clock
+        self._started_at = 0.0
+        self._frame_idx = 0
+
+    async def open(self) -> bool:
+        opened = await super().open()
+        self._started_at = self._clock()
+        self._frame_idx = 0
+        return opened
+
+    async def read(self) -> Optional[np.ndarray]:
+        fps = self.get_fps()
+        if fps > 0:
+            due_at = self._started_at + self._frame_idx / (fps * self.speed)
+            delay = due_at - self._clock()
+            if delay > 0:
+                await asyncio.sleep(delay)
+        self._frame_idx += 1
+        return await super().read()
+
+
+class AsyncStorageWriter(IAsyncStorage):
+    """Async writer around a blocking IStorage.
+
+    All calls go through one writer thread, so rows of concurrent streams are
+    appended one batch at a time and the file handling of the wrapped storage
+    never runs on the event loop.
+    """
+
+    def __init__(self, storage: IStorage):
+        self.storage = storage
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="async-storage")
+
+    async def write_batch(self, rows: List[OutputData]) -> None:
+        await self._run(self.storage.write_batch, rows)
+
+    async def write_segments(self, segments: List[EmotionSegment]) -> None:
+        await self._run(self.storage.write_segments, segments)
+
+    async def save_aggregates(self, aggregates: List[VideoAggregate]) -> None:
+        await self._run(self.storage.save_aggregates, aggregates)
+
+    async def flush(self) -> None:
+        await self._run(self.storage.flush)
+
+    async def _run(self, func, *args):
+        return await asyncio.get_running_loop().run_in_executor(self.executor, func, *args)
@@ -0,0 +1,240 @@
+import csv
+import gzip
+import io
+import json
+import os
+import queue
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterator, List, Optional
+
+from backend.src.infrastructure.logger import setup_logger
+from backend.src.infrastructure.memory_budget import RESULT_BYTES, MemoryBudget
+from backend.src.infrastructure.storage import CSVStorage
+
+try:
+    import zstandard
+except ImportError:  # optional, gzip is always available
+    zstandard = None
+
+logger = setup_logger("CompressedCSVStorage")
+
+CODEC_EXTENSIONS = {"gzip": ".csv.gz", "zstd": ".csv.zst"}
+
+READ_BLOCK_ROWS = 1000  # rows a reader hands over at once
+READ_AHEAD_BLOCKS = 4  # blocks a reader decompresses ahead of the consumer
+
+
+class CompressedCSVStorage(CSVStorage):
+    """CSVStorage whose per-frame results go to a compressed, rotating log.
+
+    Rows are buffered and appended as one compressed member (gzip) or frame
+    (zstd) per flush, so the log sees a few large writes instead of many small
+    appends. A segment file is closed once it exceeds `max_segment_bytes` and
+    `results_index.json` records the segments and the rows per video in each.
+    Segments are decompressed as streams, several in parallel, each only a few
+    row blocks ahead of the consumer. The summary, segment and
+    video index files stay plain CSV. With a memory budget, the buffered rows are
+    accounted and written early when the budget runs short.
+
+    Attributes:
+        results_dir (str): Folder of the segment files and their index.
+        codec (str): "gzip" or "zstd" (zstd needs the zstandard package).
+    """
+
+    def __init__(
+        self,
+        output_path: str,
+        codec: str = "gzip",
+        max_segment_bytes: int = 64 * 1024 * 1024,
+        buffer_rows: int = 2000,
+        read_workers: int = 4,
+        memory_budget: Optional[MemoryBudget] = None,
+    ):
+        super().__init__(output_path)
+        if codec not in CODEC_EXTENSIONS:
+            raise ValueError(f"Unsupported codec: {codec} (use {', '.join(CODEC_EXTENSIONS)})")
+        if codec == "zstd" and zstandard is None:
+            logger.warning("zstandard is not installed, writing gzip segments instead")
+            codec = "gzip"
+
+        self.codec = codec
+        self.max_segment_bytes = max_segment_bytes
+        self.buffer_rows = max(1, buffer_rows)
+        self.read_workers = max(1, read_workers)
+        self.memory_budget = memory_budget
+        self.results_dir = os.path.join(self.output_path, "results")
+        self.results_index_path = os.path.join(self.results_dir, "results_index.json")
+        os.makedirs(self.results_dir, exist_ok=True)
+
+        # structure: [{'name': 'results-00000.csv.gz', 'rows': 12000, 'bytes': 81920, 'videos': {'a.mp4': 300}}, ...]
+        self._segments: List[Dict[str, Any]] = self._load_index()
+        self._buffer: List[dict] = []
+
+    def load_all(self) -> List[Dict[str, Any]]:
+        """Reads all segments back into memory."""
+        return list(self.iter_all())
+
+    def iter_all(self) -> Iterator[Dict[str, Any]]:
+        """Streams the rows of all segments in write order, decompressing ahead in parallel."""
+        self.flush()
+        with self._lock:
+            names = [segment["name"] for segment in self._segments]
+        if not names:
+            logger.warning("No analysis results found to load.")
+        return self._iter_segments(names)
+
+    def iter_video(self, file_name: str) -> Iterator[Dict[str, Any]]:
+        """Streams the rows of one video, reading only the segments that contain it."""
+        self.flush()
+        return (row for row in self._iter_segments(self.segments_for(file_name)) if row["file_name"] == file_name)
+
+    def segments_for(self, file_name: str) -> List[str]:
+        """Returns the segment files holding rows of a video."""
+        with self._lock:
+            return [segment["name"] for segment in self._segments if file_name in segment["videos"]]
+
+    def flush(self):
+        """Compresses and appends the buffered rows."""
+        with self._lock:
+            self._flush_buffer()
+
+    def _write_to_file(self, rows: List[dict]):
+        with self._lock:
+            self._buffer.extend(rows)
+            if self.memory_budget:
+                self.memory_budget.reserve(len(rows) * RESULT_BYTES)
+            if len(self._buffer) >= self.buffer_rows or (self.memory_budget and self.memory_budget.under_pressure):
+                self._flush_buffer()
+
+    def _flush_buffer(self):
+        if not self._buffer:
+            return
+
+        segment = self._current_segment()
+        path = os.path.join(self.results_dir, segment["name"])
+        text = io.StringIO()
+        writer = csv.DictWriter(text, fieldnames=self.fieldnames)
+        # The file, not the index, tells: a crash before _save_index leaves rows the index does not count
+        if not os.path.exists(path) or os.path.getsize(path) == 0:
+            writer.writeheader()
+        writer.writerows(self._buffer)
+
+        try:
+            with open(path, mode="ab") as segment_file:
+                segment_file.write(self._compress(text.getvalue().encode("utf-8")))
+        except Exception as e:
+            logger.error(f"Error writing results segment {segment['name']}: {e}")
+            return
+
+        segment["rows"] += len(self._buffer)
+        for row in self._buffer:
+            segment["videos"][row["file_name"]] = segment["videos"].get(row["file_name"], 0) + 1
+        segment["bytes"] = os.path.getsize(path)
+        if self.memory_budget:
+            self.memory_budget.release(len(self._buffer) * RESULT_BYTES)
+        self._buffer = []
+        self._save_index()
+
+    def _current_segment(self) -> Dict[str, Any]:
+        extension = CODEC_EXTENSIONS[self.codec]
+        if (
+            not self._segments
+            or self._segments[-1]["bytes"] >= self.max_segment_bytes
+            or not self._segments[-1]["name"].endswith(extension)
+        ):
+            self._segments.append({
+                "name": f"results-{len(self._segments):05d}{extension}",
+                "rows": 0,
+                "bytes": 0,
+                "videos": {},
+            })
+        return self._segments[-1]
+
+    def _compress(self, data: bytes) -> bytes:
+        if self.codec == "zstd":
+            return zstandard.ZstdCompressor(level=3).compress(data)
+        return gzip.compress(data, compresslevel=6)
+
+    def _iter_segments(self, names: List[str]) -> Iterator[Dict[str, Any]]:
+        # At most `read_workers` segments are read at once, each at most READ_AHEAD_BLOCKS blocks ahead
+        stop = threading.Event()
+        with ThreadPoolExecutor(max_workers=self.read_workers) as pool:
+            try:
+                pending = deque()
+                for name in names:
+                    blocks: queue.Queue = queue.Queue(maxsize=READ_AHEAD_BLOCKS)
+                    pool.submit(self._read_segment, name, blocks, stop)
+                    pending.append(blocks)
+                    if len(pending) >= self.read_workers:
+                        yield from self._drain(pending.popleft())
+                while pending:
+                    yield from self._drain(pending.popleft())
+            finally:
+                # Releases readers blocked on a full queue when the consumer stops early
+                stop.set()
+
+    @staticmethod
+    def _drain(blocks: queue.Queue) -> Iterator[Dict[str, Any]]:
+        while True:
+            block = blocks.get()
+            if block is None:
+                return
+            yield from block
+
+    def _read_segment(self, name: str, blocks: queue.Queue, stop: threading.Event):
+        """Decompresses a segment incrementally and hands its rows over in blocks, then None."""
+        try:
+            with self._open_segment(name) as text:
+                block = []
+                for row in csv.DictReader(text):
+                    block.append(row)
+                    if len(block) >= READ_BLOCK_ROWS:
+                        if not self._put(blocks, block, stop):
+                            return
+                        block = []
+                if block:
+                    self._put(blocks, block, stop)
+        except Exception as e:
+            logger.error(f"Error reading results segment {name}: {e}")
+        finally:
+            self._put(blocks, None, stop)
+
+    def _open_segment(self, name: str) -> io.TextIOBase:
+        path = os.path.join(self.results_dir, name)
+        if name.endswith(CODEC_EXTENSIONS["zstd"]):
+            if zstandard is None:
+                raise RuntimeError("zstandard is needed to read zstd segments")
+            reader = zstandard.ZstdDecompressor().stream_reader(open(path, mode="rb"), read_across_frames=True)
+            return io.TextIOWrapper(reader, encoding="utf-8", newline="")
+        return gzip.open(path, mode="rt", encoding="utf-8", newline="")
+
+    @staticmethod
+    def _put(blocks: queue.Queue, item: Optional[list], stop: threading.Event) -> bool:
+        while not stop.is_set():
+            try:
+                blocks.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _load_index(self) -> List[Dict[str, Any]]:
+        if not os.path.exists(self.results_index_path):
+            return []
+        try:
+            with open(self.results_index_path, mode="r", encoding="utf-8") as index_file:
+                return json.load(index_file)["segments"]
+        except Exception as e:
+            logger.error(f"Error reading results index: {e}")
+            return []
+
+    def _save_index(self):
+        try:
+            tmp_path = self.results_index_path + ".tmp"
+            with open(tmp_path, mode="w", encoding="utf-8") as index_file:
+                json.dump({"codec": self.codec, "segments": self._segments}, index_file, indent=1)
+            os.replace(tmp_path, self.results_index_path)
+        except Exception as e:
+            logger.error(f"Error saving results index: {e}")
@@ -0,0 +1,148 @@
+import json
+import os
+import re
+import threading
+import uuid
+from typing import Any, Dict, Iterator, List
+
+import numpy as np
+
+from backend.src.domain.interfaces import IFaceCropStore
+from backend.src.domain.models import FaceCrop
+from backend.src.infrastructure.logger import setup_logger
+
+logger = setup_logger("core.crop_store.py")
+
+
+class NpzFaceCropStore(IFaceCropStore):
+    """Face crop store made of compressed numpy chunks.
+
+    Every chunk holds up to `chunk_size` crops of one video as four arrays
+    (frame indices, timestamps, boxes and the stacked uint8 crops). `index.json`
+    lists the chunks of every video in write order.
+
+    Crops of a new run are written to chunks of their own and only replace the
+    chunks of an earlier run when the video is finished (see finish()), so an
+    interrupted run keeps the previous crops. Chunks no index entry refers to,
+    left by an interrupted run, are removed on the next start.
+
+    Attributes:
+        directory (str): Folder of the chunks and the index.
+        chunk_size (int): Crops per chunk file.
+    """
+
+    def __init__(self, directory: str, chunk_size: int = 1024):
+        self.directory = directory
+        self.chunk_size = max(1, chunk_size)
+        self.index_path = os.path.join(directory, "index.json")
+        os.makedirs(directory, exist_ok=True)
+
+        # structure: {'file_name': {'chunks': ['<file_name>-<run>-00000.npz', ...], 'count': 1200}}
+        self._index: Dict[str, Dict[str, Any]] = self._load_index()
+        # structure: same as the index, for the chunks of unfinished videos of this run
+        self._staged: Dict[str, Dict[str, Any]] = {}
+        self._pending: Dict[str, List[FaceCrop]] = {}
+        self._run_id = uuid.uuid4().hex[:8]  # keeps the chunk names of this run apart from earlier ones
+        self._lock = threading.Lock()
+        self._remove_orphans()
+
+    def write(self, crops: List[FaceCrop]) -> None:
+        """Buffers crops and writes every full chunk."""
+        with self._lock:
+            for crop in crops:
+                pending = self._pending.setdefault(crop.file_name, [])
+                pending.append(crop)
+                if len(pending) >= self.chunk_size:
+                    self._write_chunk(crop.file_name, pending)
+                    self._pending[crop.file_name] = []
+
+    def flush(self) -> None:
+        """Writes the partially filled chunks."""
+        with self._lock:
+            for file_name, pending in self._pending.items():
+                if pending:
+                    self._write_chunk(file_name, pending)
+            self._pending = {}
+
+    def finish(self, file_name: str) -> None:
+        """Replaces the crops of an earlier run of the video with the ones of this run."""
+        with self._lock:
+            pending = self._pending.pop(file_name, None)
+            if pending:
+                self._write_chunk(file_name, pending)
+
+            previous = self._index.pop(file_name, None)
+            staged = self._staged.pop(file_name, None)
+            if staged:
+                self._index[file_name] = staged
+            self._save_index()
+
+            for chunk in (previous or {}).get("chunks", []):
+                self._remove_chunk(chunk)
+
+    def videos(self) -> List[str]:
+        with self._lock:
+            return sorted(self._index)
+
+    def load(self, file_name: str) -> Iterator[FaceCrop]:
+        """Streams the crops of a video chunk by chunk, in write order."""
+        with self._lock:
+            chunks = list(self._index.get(file_name, {}).get("chunks", []))
+
+        for chunk in chunks:
+            with np.load(os.path.join(self.directory, chunk)) as data:
+                frame_indices, seconds = data["frame_idx"], data["seconds"]
+                boxes, images = data["boxes"], data["images"]
+            for i in range(len(frame_indices)):
+                yield FaceCrop(
+                    file_name=file_name,
+                    frame_idx=int(frame_indices[i]),
+                    seconds=float(seconds[i]),
+                    box=tuple(int(v) for v in boxes[i]),
+                    image=images[i],
+                )
+
+    def _write_chunk(self, file_name: str, crops: List[FaceCrop]):
+        entry = self._staged.setdefault(file_name, {"chunks": [], "count": 0})
+        safe_name = re.sub(r"[^\w.-]", "_", file_name)
+        chunk = f"{safe_name}-{self._run_id}-{len(entry['chunks']):05d}.npz"
+
+        np.savez_compressed(
+            os.path.join(self.directory, chunk),
+            frame_idx=np.array([crop.frame_idx for crop in crops], dtype=np.int64),
+            seconds=np.array([crop.seconds for crop in crops], dtype=np.float64),
+            boxes=np.array([crop.box for crop in crops], dtype=np.int32).reshape(-1, 4),
+            images=np.stack([crop.image for crop in crops]).astype(np.uint8),
+        )
+        entry["chunks"].append(chunk)
+        entry["count"] += len(crops)
+
+    def _remove_orphans(self):
+        referenced = {chunk for entry in self._index.values() for chunk in entry["chunks"]}
+        for name in os.listdir(self.directory):
+            if name.endswith(".npz") and name not in referenced:
+                self._remove_chunk(name)
+
+    def _remove_chunk(self, chunk: str):
+        path = os.path.join(self.directory, chunk)
+        if os.path.exists(path):
+            os.remove(path)
+
+    def _load_index(self) -> Dict[str, Dict[str, Any]]:
+        if not os.path.exists(self.index_path):
+            return {}
+        try:
+            with open(self.index_path, mode="r", encoding="utf-8") as index_file:
+                return json.load(index_file)
+        except Exception as e:
+            logger.error(f"Error reading face crop index, starting empty: {e}")
+            return {}
+
+    def _save_index(self):
+        try:
+            tmp_path = self.index_path + ".tmp"
+            with open(tmp_path, mode="w", encoding="utf-8") as index_file:
+                json.dump(self._index, index_file, indent=1)
+            os.replace(tmp_path, self.index_path)
+        except Exception as e:
+            logger.error(f"Error saving face crop index: {e}")
@@ -1,15 +1,30 @@
-from typing import Any, Dict
+from typing import Any, Dict, List, Optional
+import numpy as np
+import deepface
 from deepface import DeepFace
 
 from backend.src.domain.interfaces import IEmotionDetector
-from backend.src.infrastructure.logger import setup_logger
+from backend.src.infrastructure.logger import RateLimitedLogger, setup_logger
 
 logger = setup_logger("core.detectors.py")
+frame_logger = RateLimitedLogger(logger)
 
 
 class DeepFaceEmotionDetector(IEmotionDetector):
     """Emotion detector implementation using the DeepFace library."""
 
+    def __init__(self, detector_backend: str = "opencv"):
+        """
+        Args:
+            detector_backend (str): DeepFace face detector ("opencv" is the fast one for video processing).
+        """
+        self.detector_backend = detector_backend
+
+    @property
+    def model_id(self) -> str:
+        """Identifies the DeepFace release and face detector behind the results, e.g. for result caches."""
+        return f"deepface-{deepface.__version__}:{self.detector_backend}"
+
     def detect(self, frame: Any) -> Dict[str, Any]:
         """Analyzes a single frame using DeepFace.
 
@@ -26,7 +41,7 @@ class DeepFaceEmotionDetector(IEmotionDetector):
                 img_path=frame,
                 actions=["emotion"],
                 enforce_detection=True,
-                detector_backend="opencv",  # fast backend for video processing
+                detector_backend=self.detector_backend,
             )
 
             if not results:
@@ -41,5 +56,29 @@ class DeepFaceEmotionDetector(IEmotionDetector):
             # Expected error when no face is found
             return None
         except Exception as e:
-            logger.error(f"Error analyzing frame using deepface: {e}")
+            frame_logger.error("Error analyzing frame using deepface: %s", e)
             return None
+
+    def classify_faces(self, faces: List[np.ndarray]) -> List[Optional[Dict[str, Any]]]:
+        """Classifies face crops with the emotion model only (face detection is skipped).
+
+        Args:
+            faces (List[np.ndarray]): BGR face crops.
+
+        Returns:
+            List[Optional[Dict[str, Any]]]: One result (or None if failed) per crop.
+        """
+        results = []
+        for face in faces:
+            try:
+                analysis = DeepFace.analyze(
+                    img_path=face,
+                    actions=["emotion"],
+                    enforce_detection=False,
+                    detector_backend="skip",  # the crop already is the face
+                )
+                results.append(analysis[0] if analysis else None)
+            except Exception as e:
+                frame_logger.error("Error classifying face crop using deepface: %s", e)
+                results.append(None)
+        return results
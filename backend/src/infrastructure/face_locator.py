@@ -0,0 +1,131 @@
+import threading
+from typing import List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from backend.src.domain.interfaces import IFaceCropper
+from backend.src.infrastructure.logger import setup_logger
+
+logger = setup_logger("core.face_locator.py")
+
+# (x, y, width, height) in pixels of the original image
+Box = Tuple[int, int, int, int]
+
+
+class HaarFaceLocator:
+    """Locates frontal faces with the OpenCV Haar cascade on a downscaled frame.
+
+    This is the same cascade DeepFace uses for its "opencv" detector backend, but
+    run on a small grayscale copy of the frame, so it is cheap enough to be used
+    as a face-presence check on every sampled frame.
+
+    Attributes:
+        max_width (int): Frames wider than this are downscaled before detection.
+        min_face_size (int): Smallest face (in downscaled pixels) to report.
+        min_neighbors (int): Cascade strictness, lower values favour recall.
+    """
+
+    def __init__(
+        self,
+        max_width: int = 320,
+        min_face_size: int = 16,
+        min_neighbors: int = 3,
+        cascade_file: str = "haarcascade_frontalface_default.xml",
+    ):
+        self.max_width = max_width
+        self.min_face_size = min_face_size
+        self.min_neighbors = min_neighbors
+        self.cascade_path = cv2.data.haarcascades + cascade_file
+
+        # CascadeClassifier is not safe to share between threads
+        self._local = threading.local()
+
+    def locate(self, image: np.ndarray) -> List[Box]:
+        """Finds faces in a BGR or grayscale image.
+
+        Args:
+            image (np.ndarray): The full resolution frame.
+
+        Returns:
+            List[Box]: Face boxes scaled back to the original resolution, largest first.
+        """
+        gray = image if image.ndim == 2 else cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+
+        scale = 1.0
+        if gray.shape[1] > self.max_width:
+            scale = self.max_width / gray.shape[1]
+            gray = cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+
+        faces = self._cascade().detectMultiScale(
+            gray,
+            scaleFactor=1.2,
+            minNeighbors=self.min_neighbors,
+            minSize=(self.min_face_size, self.min_face_size),
+        )
+
+        boxes = [
+            (int(x / scale), int(y / scale), int(w / scale), int(h / scale))
+            for (x, y, w, h) in faces
+        ]
+        return sorted(boxes, key=lambda box: box[2] * box[3], reverse=True)
+
+    def has_face(self, image: np.ndarray) -> bool:
+        """Returns True if at least one face is likely present."""
+        return len(self.locate(image)) > 0
+
+    def _cascade(self) -> cv2.CascadeClassifier:
+        cascade = getattr(self._local, "cascade", None)
+        if cascade is None:
+            cascade = cv2.CascadeClassifier(self.cascade_path)
+            if cascade.empty():
+                raise RuntimeError(f"Could not load Haar cascade: {self.cascade_path}")
+            self._local.cascade = cascade
+        return cascade
+
+
+class HaarFaceCropper(IFaceCropper):
+    """Cuts a face out of a frame as a square crop of fixed size.
+
+    The analysis crops the region the emotion detector classified (crop_region);
+    crop() locates the largest face itself, for frames without a detector result.
+
+    The face box is made square around its centre and widened by `margin` on
+    every side (0 = the box DeepFace and the ONNX detector classify). Parts
+    outside the frame are filled by repeating the border, so faces at the edge
+    are not distorted.
+
+    Attributes:
+        locator (HaarFaceLocator): The face detector.
+        size (int): Side length of the stored crop in pixels.
+        margin (float): Extra context around the face, relative to the box size.
+    """
+
+    def __init__(self, locator: Optional[HaarFaceLocator] = None, size: int = 96, margin: float = 0.0):
+        self.locator = locator or HaarFaceLocator(max_width=640, min_neighbors=5)
+        self.size = size
+        self.margin = margin
+
+    def crop(self, frame: np.ndarray) -> Optional[Tuple[Box, np.ndarray]]:
+        """Returns the box and the crop of the largest face, or None without a face."""
+        boxes = self.locator.locate(frame)
+        if not boxes:
+            return None
+        return boxes[0], self.crop_region(frame, boxes[0])
+
+    def crop_region(self, frame: np.ndarray, box: Box) -> np.ndarray:
+        """Returns the square crop around the (x, y, width, height) box."""
+        x, y, w, h = box
+        side = max(1, int(round(max(w, h) * (1 + 2 * self.margin))))
+        left = int(round(x + w / 2 - side / 2))
+        top = int(round(y + h / 2 - side / 2))
+
+        height, width = frame.shape[:2]
+        region = frame[max(0, top):min(height, top + side), max(0, left):min(width, left + side)]
+        region = cv2.copyMakeBorder(
+            region,
+            max(0, -top), max(0, top + side - height),
+            max(0, -left), max(0, left + side - width),
+            cv2.BORDER_REPLICATE,
+        )
+        return cv2.resize(region, (self.size, self.size), interpolation=cv2.INTER_AREA)
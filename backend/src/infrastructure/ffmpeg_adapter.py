@@ -0,0 +1,240 @@
+import logging
+import math
+import os
+import re
+import shutil
+import subprocess
+import tempfile
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from backend.src.domain.interfaces import IVideoFactory, IVideoSource
+from backend.src.domain.models import VideoMetadata
+from backend.src.infrastructure.opencv_adapter import OpenCVVideoFactory
+from backend.src.infrastructure.video_metadata import VideoMetadataIndex, probe_opencv
+
+logger = logging.getLogger("FFmpegAdapter")
+
+
+def ffmpeg_version(ffmpeg: str) -> Optional[Tuple[int, int]]:
+    """Major and minor version of an ffmpeg executable (None for git builds or when it cannot run)."""
+    try:
+        banner = subprocess.run([ffmpeg, "-version"], capture_output=True, text=True, timeout=10).stdout
+    except (OSError, subprocess.SubprocessError):
+        return None
+    match = re.match(r"ffmpeg version n?(\d+)\.(\d+)", banner)
+    return (int(match.group(1)), int(match.group(2))) if match else None
+
+
+def output_size(width: int, height: int, max_width: Optional[int]) -> Tuple[int, int]:
+    """Frame size after downscaling to `max_width` (aspect kept, even sides as the encoders expect)."""
+    if not max_width or width <= max_width:
+        return width, height
+    scaled_height = max(2, int(round(height * max_width / width / 2)) * 2)
+    return max_width - max_width % 2, scaled_height
+
+
+class FFmpegVideoSource(IVideoSource):
+    """
+    Video source decoding with a local ffmpeg process.
+
+    Frame selection and scaling run inside the decoder (select and scale filters,
+    multi-threaded decoding), so only the frames that will be analyzed cross the
+    pipe, already at the working resolution. Raw BGR frames are read into a
+    small ring of preallocated numpy buffers.
+
+    The source delivers every `frame_step`-th frame; its FPS is the rate of the
+    delivered frames, so timestamps computed from it stay correct. Seeking is not
+    supported. ffmpeg 5.1 and newer take the frame passthrough as -fps_mode, older
+    releases as -vsync (see FFmpegVideoFactory).
+    """
+
+    def __init__(
+        self,
+        file_path: str,
+        metadata: Optional[VideoMetadata] = None,
+        frame_step: int = 1,
+        max_width: Optional[int] = None,
+        threads: int = 0,
+        buffers: int = 2,
+        ffmpeg: str = "ffmpeg",
+        sync_option: str = "-fps_mode",
+    ):
+        """
+        Args:
+            file_path: The video to decode.
+            metadata: Cached metadata; probed with OpenCV when missing.
+            frame_step: Deliver every n-th frame of the video.
+            max_width: Downscale wider videos to this width (None = original size).
+            threads: Decoder threads (0 = ffmpeg decides).
+            buffers: Frame buffers reused in turn; a returned frame stays valid for
+                     `buffers - 1` further reads. 0 = a new array per frame.
+            ffmpeg: The ffmpeg executable.
+            sync_option: "-fps_mode" (ffmpeg 5.1+) or "-vsync" (older releases).
+        """
+        self.file_path = file_path
+        self.metadata = metadata
+        self.frame_step = max(1, frame_step)
+        self.max_width = max_width
+        self.threads = threads
+        self.ffmpeg = ffmpeg
+        self.sync_option = sync_option
+        self.width = 0
+        self.height = 0
+        self._fps = 0.0
+        self._buffers: List[np.ndarray] = [None] * max(0, buffers)
+        self._next_buffer = 0
+        self._process: Optional[subprocess.Popen] = None
+        self._stderr = None
+        self._ended = False
+
+    def open(self) -> bool:
+        if not os.path.exists(self.file_path):
+            logger.error(f"File not found: {self.file_path}")
+            return False
+
+        metadata = self.metadata or probe_opencv(self.file_path)
+        if metadata is None or metadata.fps <= 0 or not metadata.width or not metadata.height:
+            logger.error(f"Failed to read the stream parameters of: {self.file_path}")
+            return False
+        self.metadata = metadata
+
+        self.width, self.height = output_size(metadata.width, metadata.height, self.max_width)
+        self._fps = metadata.fps / self.frame_step
+        frame_shape = (self.height, self.width, 3)
+        self._buffers = [np.empty(frame_shape, dtype=np.uint8) for _ in self._buffers]
+        self._next_buffer = 0
+        self._ended = False
+
+        self._stderr = tempfile.TemporaryFile()
+        try:
+            self._process = subprocess.Popen(
+                self.build_command(), stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=self._stderr,
+                bufsize=self.width * self.height * 3,
+            )
+        except OSError as e:
+            logger.error(f"Failed to start ffmpeg for {self.file_path}: {e}")
+            self._stderr.close()
+            return False
+        return True
+
+    def build_command(self) -> List[str]:
+        filters = []
+        if self.frame_step > 1:
+            # Keeps frames 0, n, 2n, ... of the decoded stream
+            filters.append(f"select='not(mod(n,{self.frame_step}))'")
+        if (self.width, self.height) != (self.metadata.width, self.metadata.height):
+            filters.append(f"scale={self.width}:{self.height}:flags=area")
+
+        command = [self.ffmpeg, "-nostdin", "-v", "error", "-threads", str(self.threads), "-i", self.file_path,
+                   "-an", "-sn", "-dn"]
+        if filters:
+            command += ["-vf", ",".join(filters)]
+        # Pass the selected frames through instead of duplicating them to a constant rate
+        command += [self.sync_option, "passthrough", "-f", "rawvideo", "-pix_fmt", "bgr24", "pipe:1"]
+        return command
+
+    def get_fps(self) -> float:
+        return self._fps
+
+    def get_frame_count(self) -> int:
+        if self.metadata and self.metadata.frame_count:
+            return math.ceil(self.metadata.frame_count / self.frame_step)
+        return 0
+
+    def get_duration(self) -> float:
+        if self.metadata and self.metadata.duration:
+            return self.metadata.duration
+        return super().get_duration()
+
+    def read(self) -> Optional[np.ndarray]:
+        if self._process is None:
+            return None
+
+        if self._buffers:
+            frame = self._buffers[self._next_buffer]
+            self._next_buffer = (self._next_buffer + 1) % len(self._buffers)
+        else:
+            frame = np.empty((self.height, self.width, 3), dtype=np.uint8)
+
+        view = memoryview(frame).cast("B")
+        filled = 0
+        while filled < len(view):
+            count = self._process.stdout.readinto(view[filled:])
+            if not count:
+                self._ended = True
+                return None  # End of stream (a partial last frame is dropped)
+            filled += count
+        return frame
+
+    def release(self) -> None:
+        if self._process is None:
+            return
+        process, self._process = self._process, None
+        process.stdout.close()
+        if process.poll() is None:
+            process.terminate()
+        return_code = process.wait()
+
+        # A stream closed early makes ffmpeg fail on the broken pipe, only a full read is checked
+        if self._ended and return_code != 0:
+            self._stderr.seek(0)
+            message = self._stderr.read().decode("utf-8", errors="replace").strip()
+            logger.error(f"ffmpeg failed for {self.file_path} ({return_code}): {message[-500:]}")
+        self._stderr.close()
+
+
+class FFmpegVideoFactory(IVideoFactory):
+    """
+    Factory to create FFmpegVideoSource instances.
+    Falls back to the OpenCV sources when ffmpeg is not installed; check
+    `available` before relying on decoder-side frame selection.
+    """
+
+    def __init__(
+        self,
+        metadata_index: Optional[VideoMetadataIndex] = None,
+        frame_step: int = 1,
+        max_width: Optional[int] = None,
+        threads: int = 0,
+        reuse_buffers: bool = True,
+        ffmpeg: str = "ffmpeg",
+    ):
+        self.metadata_index = metadata_index
+        self.frame_step = frame_step
+        self.max_width = max_width
+        self.threads = threads
+        # Callers that keep frames across reads (adaptive sampling) need their own arrays
+        self.buffers = 2 if reuse_buffers else 0
+        self.ffmpeg = shutil.which(ffmpeg)
+        self.fallback = OpenCVVideoFactory(metadata_index)
+        self.sync_option = "-fps_mode"
+        if not self.ffmpeg:
+            logger.warning(f"{ffmpeg} was not found, decoding with OpenCV instead")
+            return
+
+        # Releases before 5.1 reject -fps_mode and the video would yield no frame at all
+        version = ffmpeg_version(self.ffmpeg)
+        if version is not None and version < (5, 1):
+            logger.info(f"ffmpeg {version[0]}.{version[1]} found, using -vsync instead of -fps_mode")
+            self.sync_option = "-vsync"
+
+    @property
+    def available(self) -> bool:
+        return self.ffmpeg is not None
+
+    def create(self, file_path: str) -> IVideoSource:
+        if not self.available:
+            return self.fallback.create(file_path)
+        metadata = self.metadata_index.get(file_path) if self.metadata_index else None
+        return FFmpegVideoSource(
+            file_path, metadata=metadata, frame_step=self.frame_step, max_width=self.max_width,
+            threads=self.threads, buffers=self.buffers, ffmpeg=self.ffmpeg, sync_option=self.sync_option,
+        )
+
+    def probe(self, file_path: str) -> Optional[VideoMetadata]:
+        """Reads the metadata from the index or the container header; no ffmpeg process is started."""
+        if self.metadata_index:
+            return self.metadata_index.get(file_path)
+        return probe_opencv(file_path)
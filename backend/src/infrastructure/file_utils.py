@@ -22,8 +22,8 @@ class FileUtils:
     @staticmethod
     def get_video_files(directory: str) -> List[str]:
         """
-        Scans a directory and returns a list of video file paths.
-        Supports common video extensions.
+        Scans a directory and returns the video file paths sorted by file name,
+        the key results are stored under. Supports common video extensions.
         """
         video_extensions = {'.mp4', '.avi', '.mov', '.mkv', '.wmv'}
         video_files = []
@@ -41,5 +41,26 @@ class FileUtils:
 
         logger.debug(f"video files {video_files}")
 
-        return video_files
-        
+        return sorted(video_files, key=lambda path: (os.path.basename(path), path))
+
+    @staticmethod
+    def get_image_files(directory: str) -> List[str]:
+        """
+        Scans a directory and returns a sorted list of image file paths.
+        Supports common image extensions.
+        """
+        image_extensions = {'.jpg', '.jpeg', '.png', '.bmp', '.webp'}
+        image_files = []
+
+        if not os.path.exists(directory):
+            raise FileNotFoundError(f"Input directory not found: {directory}")
+
+        for root, _, files in os.walk(directory):
+            for file in files:
+                ext = os.path.splitext(file)[1].lower()
+                if ext in image_extensions:
+                    image_files.append(os.path.join(root, file))
+
+        logger.debug(f"image files {len(image_files)}")
+
+        return sorted(image_files)
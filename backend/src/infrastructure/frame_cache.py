@@ -0,0 +1,243 @@
+import copy
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+import cv2
+import numpy as np
+
+from backend.src.domain.interfaces import IEmotionDetector
+from backend.src.infrastructure.face_locator import HaarFaceLocator
+from backend.src.infrastructure.logger import setup_logger
+from backend.src.infrastructure.serialization import to_builtin
+
+logger = setup_logger("core.frame_cache.py")
+
+
+def perceptual_hash(image: np.ndarray, hash_size: int = 8) -> str:
+    """Computes the difference hash (dHash) of an image.
+
+    The frame is reduced to a (hash_size + 1) x hash_size grayscale thumbnail and
+    every bit tells whether a pixel is brighter than its right neighbour. Re-encoded
+    or slightly noisy copies of a frame map to the same hash.
+
+    Returns:
+        str: The hash as a hex string.
+    """
+    gray = image if image.ndim == 2 else cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    thumbnail = cv2.resize(gray, (hash_size + 1, hash_size), interpolation=cv2.INTER_AREA)
+    bits = thumbnail[:, 1:] > thumbnail[:, :-1]
+    return np.packbits(bits.flatten()).tobytes().hex()
+
+
+def frame_key(image: np.ndarray, locator: HaarFaceLocator, hash_size: int = 16, max_faces: int = 4) -> str:
+    """Cache key of a frame: the dHash of every face region plus a coarse hash of the scene.
+
+    A full-frame thumbnail barely changes when only a facial expression does, so
+    the faces are hashed at their own resolution. Frames without a located face
+    are keyed by a detailed hash of the whole frame.
+
+    Args:
+        image (np.ndarray): The frame.
+        locator (HaarFaceLocator): Finds the face regions.
+        hash_size (int): Side of the dHash grid of each face (hash_size^2 bits).
+        max_faces (int): Largest faces included in the key.
+
+    Returns:
+        str: The key.
+    """
+    boxes = locator.locate(image)[:max_faces]
+    if not boxes:
+        return "scene:" + perceptual_hash(image, hash_size)
+
+    faces = [perceptual_hash(image[y:y + h, x:x + w], hash_size) for x, y, w, h in boxes]
+    return "faces:" + perceptual_hash(image) + ":" + ":".join(faces)
+
+
+class CachedEmotionDetector(IEmotionDetector):
+    """Persistent LRU cache in front of an emotion detector.
+
+    Results (including "no face") are keyed by the perceptual hashes of the face
+    regions (see frame_key), so intros, outros and reruns shared across episodes
+    skip inference while a changed expression is analyzed again. Locating the
+    faces costs a Haar cascade run per lookup, far less than the emotion model.
+    The cache file records the id of the model that produced it and is discarded
+    when it changes.
+
+    With `verify_every`, every n-th hit is analyzed anyway and compared with the
+    cached result, which measures the hit accuracy on the actual footage.
+
+    Attributes:
+        detector (IEmotionDetector): The detector used on cache misses.
+        cache_path (str): JSON file the cache is loaded from and persisted to.
+        max_entries (int): LRU size limit.
+        model_id (str): Identifies the model (and settings) behind the cached results.
+        locator (HaarFaceLocator): Finds the face regions of the keys.
+    """
+
+    KEY_VERSION = 2  # face-region keys; caches of other key versions are discarded
+
+    def __init__(
+        self,
+        detector: IEmotionDetector,
+        cache_path: str,
+        model_id: str,
+        max_entries: int = 100_000,
+        hash_size: int = 16,
+        locator: Optional[HaarFaceLocator] = None,
+        verify_every: int = 0,
+    ):
+        self.detector = detector
+        self.cache_path = cache_path
+        self.model_id = model_id
+        self.max_entries = max(1, max_entries)
+        self.hash_size = hash_size
+        self.locator = locator or HaarFaceLocator(max_width=640, min_neighbors=5)
+        self.verify_every = max(0, verify_every)
+
+        self.hits = 0
+        self.misses = 0
+        self.verified = 0  # hits analyzed again
+        self.agreed = 0  # verified hits with the same dominant emotion
+        self._entries: "OrderedDict[str, Optional[Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._load()
+
+    def detect(self, frame: Any) -> Optional[Dict[str, Any]]:
+        """Returns the cached result of a near-identical frame or runs the detector.
+
+        Args:
+            frame (Any): File path (str) or image array (numpy.ndarray).
+
+        Returns:
+            Optional[Dict[str, Any]]: Detection results or None if no face is found.
+        """
+        return self.detect_batch([frame])[0]
+
+    def detect_batch(self, frames: List[Any]) -> List[Optional[Dict[str, Any]]]:
+        """Looks up every frame and sends only the misses to the detector in one batch."""
+        results: List[Optional[Dict[str, Any]]] = [None] * len(frames)
+        keys: List[Optional[str]] = []
+        missing: List[int] = []
+        # structure: {'frame position': cached result}, hits analyzed again to measure the accuracy
+        checked: Dict[int, Optional[Dict[str, Any]]] = {}
+
+        for i, frame in enumerate(frames):
+            image = frame if isinstance(frame, np.ndarray) else cv2.imread(frame)
+            key = frame_key(image, self.locator, self.hash_size) if image is not None else None
+            keys.append(key)
+
+            with self._lock:
+                if key is not None and key in self._entries:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    if not self.verify_every or self.hits % self.verify_every:
+                        # Callers may modify the result, the cached entry must stay as it is
+                        results[i] = copy.deepcopy(self._entries[key])
+                        continue
+                    checked[i] = self._entries[key]
+                else:
+                    self.misses += 1
+            missing.append(i)
+
+        if missing:
+            detected = self.detector.detect_batch([frames[i] for i in missing])
+            with self._lock:
+                for i, result in zip(missing, detected):
+                    results[i] = result
+                    if i in checked:
+                        self._verify(checked[i], result)
+                    if keys[i] is not None:
+                        self._put(keys[i], copy.deepcopy(result))
+
+        return results
+
+    def classify_faces(self, faces: List[np.ndarray]) -> List[Optional[Dict[str, Any]]]:
+        """Re-scoring bypasses the cache, its entries are keyed by full frames."""
+        return self.detector.classify_faces(faces)
+
+    def invalidate(self) -> None:
+        """Drops all cached results, e.g. after the emotion model has changed."""
+        with self._lock:
+            self._entries.clear()
+        if os.path.exists(self.cache_path):
+            os.remove(self.cache_path)
+        logger.info(f"Frame cache invalidated: {self.cache_path}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Returns the cache counters merged with the wrapped detector's."""
+        lookups = self.hits + self.misses
+        stats = dict(self.detector.get_stats())
+        stats["cache_hits"] = self.hits
+        stats["cache_misses"] = self.misses
+        stats["cache_hit_rate"] = round(self.hits / lookups, 4) if lookups else 0.0
+        stats["cache_size"] = len(self._entries)
+        if self.verified:
+            stats["cache_verified"] = self.verified
+            stats["cache_hit_accuracy"] = round(self.agreed / self.verified, 4)
+        return stats
+
+    def close(self) -> None:
+        """Persists the cache and closes the wrapped detector."""
+        self.save()
+        self.detector.close()
+
+    def save(self) -> None:
+        """Writes the cache in LRU order (least recently used first)."""
+        with self._lock:
+            payload = {
+                "model_id": self.model_id,
+                "hash_size": self.hash_size,
+                "key_version": self.KEY_VERSION,
+                "entries": [[key, to_builtin(result)] for key, result in self._entries.items()],
+            }
+
+        try:
+            directory = os.path.dirname(self.cache_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            tmp_path = self.cache_path + ".tmp"
+            with open(tmp_path, mode="w", encoding="utf-8") as cache_file:
+                json.dump(payload, cache_file)
+            os.replace(tmp_path, self.cache_path)
+            logger.info(f"Frame cache saved: {len(payload['entries'])} entries")
+        except Exception as e:
+            logger.error(f"Error saving frame cache: {e}")
+
+    def _verify(self, cached: Optional[Dict[str, Any]], result: Optional[Dict[str, Any]]) -> None:
+        self.verified += 1
+        cached_emotion = cached.get("dominant_emotion") if cached else None
+        if cached_emotion == (result.get("dominant_emotion") if result else None):
+            self.agreed += 1
+
+    def _put(self, key: str, result: Optional[Dict[str, Any]]) -> None:
+        self._entries[key] = result
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _load(self) -> None:
+        if not os.path.exists(self.cache_path):
+            return
+
+        try:
+            with open(self.cache_path, mode="r", encoding="utf-8") as cache_file:
+                payload = json.load(cache_file)
+        except Exception as e:
+            logger.error(f"Error reading frame cache, starting empty: {e}")
+            return
+
+        if (
+            payload.get("model_id") != self.model_id
+            or payload.get("hash_size") != self.hash_size
+            or payload.get("key_version") != self.KEY_VERSION
+        ):
+            logger.info(f"Frame cache was built by '{payload.get('model_id')}', invalidating it")
+            self.invalidate()
+            return
+
+        for key, result in payload.get("entries", []):
+            self._put(key, result)
+        logger.info(f"Frame cache loaded: {len(self._entries)} entries")
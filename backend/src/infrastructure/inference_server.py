@@ -0,0 +1,325 @@
+import ipaddress
+import json
+import os
+import queue
+import signal
+import socket
+import socketserver
+import struct
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import cv2
+import numpy as np
+
+from backend.src.domain.interfaces import IEmotionDetector
+from backend.src.infrastructure.logger import setup_logger
+from backend.src.infrastructure.serialization import to_builtin
+
+logger = setup_logger("core.inference_server.py")
+
+# Wire format, both directions: 4-byte big-endian header length, JSON header,
+# then `payload_size` raw bytes (the frame pixels for requests, nothing for replies).
+_LENGTH = struct.Struct("!I")
+
+
+def _send_message(sock: socket.socket, header: Dict[str, Any], payload: bytes = b"") -> None:
+    header = dict(header, payload_size=len(payload))
+    encoded = json.dumps(header).encode("utf-8")
+    sock.sendall(_LENGTH.pack(len(encoded)) + encoded + payload)
+
+
+def _recv_exact(sock: socket.socket, size: int) -> Optional[bytes]:
+    buffer = bytearray(size)
+    view = memoryview(buffer)
+    received = 0
+    while received < size:
+        count = sock.recv_into(view[received:], size - received)
+        if count == 0:
+            return None  # connection closed
+        received += count
+    return bytes(buffer)
+
+
+def _recv_message(sock: socket.socket) -> Optional[Tuple[Dict[str, Any], bytes]]:
+    prefix = _recv_exact(sock, _LENGTH.size)
+    if prefix is None:
+        return None
+    header_bytes = _recv_exact(sock, _LENGTH.unpack(prefix)[0])
+    if header_bytes is None:
+        return None
+    header = json.loads(header_bytes.decode("utf-8"))
+    payload = _recv_exact(sock, header["payload_size"]) if header["payload_size"] else b""
+    if payload is None:
+        return None
+    return header, payload
+
+
+def parse_address(address: str) -> Tuple[int, Any]:
+    """Parses 'unix:/path/to.sock' or 'host:port' into a socket family and address."""
+    if address.startswith("unix:"):
+        return socket.AF_UNIX, address[len("unix:"):]
+    host, _, port = address.rpartition(":")
+    return socket.AF_INET, (host or "127.0.0.1", int(port))
+
+
+def _is_loopback(host: str) -> bool:
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+class _DynamicBatcher:
+    """
+    Coalesces concurrent detect requests into detector batches.
+
+    The worker takes the first waiting request, then keeps collecting until the
+    batch is full or the oldest request has waited `max_latency` seconds.
+    """
+
+    def __init__(self, detector: IEmotionDetector, max_batch_size: int, max_latency: float):
+        self.detector = detector
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_latency = max_latency
+        self.batches = 0
+        self.frames = 0
+
+        self._requests: "queue.Queue[Optional[Tuple[Any, Future]]]" = queue.Queue()
+        self._worker = threading.Thread(target=self._run, name="inference-batcher", daemon=True)
+        self._worker.start()
+
+    def submit(self, frame: Any) -> Future:
+        future: Future = Future()
+        self._requests.put((frame, future))
+        return future
+
+    def stop(self):
+        self._requests.put(None)
+        self._worker.join()
+
+    def _run(self):
+        while True:
+            first = self._requests.get()
+            if first is None:
+                return
+
+            batch = [first]
+            deadline = time.monotonic() + self.max_latency
+            stopping = False
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    item = self._requests.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            self._run_batch(batch)
+            if stopping:
+                return
+
+    def _run_batch(self, batch: List[Tuple[Any, Future]]):
+        try:
+            results = self.detector.detect_batch([frame for frame, _ in batch])
+        except Exception as e:
+            for _, future in batch:
+                future.set_exception(e)
+            return
+
+        self.batches += 1
+        self.frames += len(batch)
+        for (_, future), result in zip(batch, results):
+            future.set_result(to_builtin(result))
+
+
+class _TCPServer(socketserver.ThreadingTCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+
+
+class _UnixServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+
+class InferenceServer:
+    """
+    Local inference service hosting one set of loaded models for many clients.
+
+    Listens on a Unix socket ('unix:/path') or a loopback TCP port ('host:port').
+    The protocol has no authentication, so other TCP interfaces are refused.
+    Every connection may send any number of frames; concurrent requests of all
+    connections are batched together by a single inference worker.
+    """
+
+    def __init__(
+        self,
+        detector: IEmotionDetector,
+        address: str,
+        max_batch_size: int = 16,
+        max_latency_ms: float = 10.0,
+    ):
+        family, bind_address = parse_address(address)
+        if family == socket.AF_INET and not _is_loopback(bind_address[0]):
+            raise ValueError(
+                f"Refusing to serve on {bind_address[0]}: only loopback addresses and Unix sockets are allowed"
+            )
+
+        self.detector = detector
+        self.batcher = _DynamicBatcher(detector, max_batch_size, max_latency_ms / 1000.0)
+
+        if family == socket.AF_UNIX:
+            # A socket file left by a previous run would make bind() fail
+            if os.path.exists(bind_address):
+                os.remove(bind_address)
+            self._server: socketserver.BaseServer = _UnixServer(bind_address, self._make_handler())
+        else:
+            self._server = _TCPServer(bind_address, self._make_handler())
+
+    @property
+    def address(self) -> str:
+        """The bound address in the format accepted by RemoteEmotionDetector."""
+        bound = self._server.server_address
+        return f"unix:{bound}" if isinstance(bound, str) else f"{bound[0]}:{bound[1]}"
+
+    def serve_forever(self):
+        """Serves until SIGTERM/SIGINT (handled when called from the main thread)."""
+        previous_handlers = {}
+        if threading.current_thread() is threading.main_thread():
+            for signum in (signal.SIGTERM, signal.SIGINT):
+                previous_handlers[signum] = signal.signal(signum, self._handle_signal)
+
+        logger.info(f"Inference server listening on {self.address}")
+        try:
+            self._server.serve_forever()
+        finally:
+            for signum, handler in previous_handlers.items():
+                signal.signal(signum, handler)
+
+    def start(self) -> threading.Thread:
+        """Serves in a background thread (used by tests and embedding tools)."""
+        thread = threading.Thread(target=self._server.serve_forever, name="inference-server", daemon=True)
+        thread.start()
+        return thread
+
+    def shutdown(self):
+        self._server.shutdown()
+        self._server.server_close()
+        if isinstance(self._server, _UnixServer) and os.path.exists(self._server.server_address):
+            os.remove(self._server.server_address)
+        self.batcher.stop()
+        logger.info(f"Inference server stopped after {self.batcher.frames} frames in {self.batcher.batches} batches")
+
+    def _handle_signal(self, signum, frame):
+        logger.info(f"Received signal {signum}, shutting down the inference server...")
+        # shutdown() waits for the serve loop, which runs in the thread handling the signal
+        threading.Thread(target=self._server.shutdown, daemon=True).start()
+
+    def _make_handler(self):
+        batcher = self.batcher
+
+        class Handler(socketserver.BaseRequestHandler):
+            def handle(self):
+                while True:
+                    message = _recv_message(self.request)
+                    if message is None:
+                        return
+                    header, payload = message
+
+                    try:
+                        # Only pixels are accepted, a client must not make the server open its files
+                        if "path" in header:
+                            raise ValueError("File paths are not accepted, send the decoded frame")
+                        frame = np.frombuffer(payload, dtype=header["dtype"]).reshape(header["shape"])
+                        reply = {"result": batcher.submit(frame).result()}
+                    except Exception as e:
+                        reply = {"error": str(e)}
+
+                    _send_message(self.request, reply)
+
+        return Handler
+
+
+class RemoteEmotionDetector(IEmotionDetector):
+    """
+    IEmotionDetector client of an InferenceServer, so EmotionAnalyzer can use a
+    shared, already loaded model transparently.
+    """
+
+    def __init__(self, address: str, timeout: float = 60.0):
+        self.address = address
+        self.timeout = timeout
+        self._local = threading.local()  # one connection per calling thread
+        self._sockets: Set[socket.socket] = set()  # the connections of all threads, closed by close()
+        self._lock = threading.Lock()
+
+    def detect(self, frame: Any) -> Optional[Dict[str, Any]]:
+        """Sends one frame to the server and returns its result dict; paths are decoded here."""
+        if not isinstance(frame, np.ndarray):
+            path = str(frame)
+            frame = cv2.imread(path)
+            if frame is None:
+                logger.error(f"Could not read image: {path}")
+                return None
+        frame = np.ascontiguousarray(frame)
+
+        try:
+            sock = self._connection()
+            _send_message(sock, {"shape": list(frame.shape), "dtype": frame.dtype.str}, frame.tobytes())
+            message = _recv_message(sock)
+        except OSError as e:
+            self._reset()
+            logger.error(f"Inference server {self.address} unreachable: {e}")
+            return None
+
+        if message is None:
+            self._reset()
+            logger.error(f"Inference server {self.address} closed the connection")
+            return None
+
+        reply = message[0]
+        if "error" in reply:
+            logger.error(f"Inference server error: {reply['error']}")
+            return None
+        return reply["result"]
+
+    def close(self) -> None:
+        """Closes the connections opened by every calling thread."""
+        with self._lock:
+            sockets, self._sockets = self._sockets, set()
+        for sock in sockets:
+            sock.close()
+        self._local = threading.local()
+
+    def _connection(self) -> socket.socket:
+        sock = getattr(self._local, "sock", None)
+        if sock is None:
+            family, address = parse_address(self.address)
+            sock = socket.socket(family, socket.SOCK_STREAM)
+            try:
+                sock.settimeout(self.timeout)
+                sock.connect(address)
+            except OSError:
+                sock.close()
+                raise
+            with self._lock:
+                self._sockets.add(sock)
+            self._local.sock = sock
+        return sock
+
+    def _reset(self):
+        sock = getattr(self._local, "sock", None)
+        if sock is not None:
+            with self._lock:
+                self._sockets.discard(sock)
+            sock.close()
+            self._local.sock = None
@@ -1,37 +1,207 @@
 import os
+import copy
+import queue
+import atexit
 import logging
+import threading
+import time
+from contextlib import contextmanager
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+
+# One background listener per log file, shared by every logger writing to it
+_listeners: Dict[str, Tuple[QueueHandler, QueueListener]] = {}
+_listeners_lock = threading.Lock()
+# Set in worker processes (see forward_logging): every logger sends its records to the parent
+_forward_handler: Optional[QueueHandler] = None
+
+
+class _DeferredQueueHandler(QueueHandler):
+    """
+    Queue handler that leaves formatting to the listener thread.
+    The message arguments are merged on the listener thread as well, so the
+    caller pays for a record copy and a queue put, never for formatting or I/O.
+    The queue stays in-process, so the arguments are not pickled; they must not
+    be mutated after the logging call.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        if record.exc_info:
+            # Tracebacks cannot be pickled/queued safely, render them now
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def _get_queue_handler(log_file) -> QueueHandler:
+    """Returns the queue handler of a log file, starting its listener on first use."""
+    key = log_file or ""
+    with _listeners_lock:
+        if _forward_handler is not None:
+            return _forward_handler
+        if key in _listeners:
+            return _listeners[key][0]
+
+        # 1. Create formatter
+        formatter = logging.Formatter(
+            "%(asctime)s - [%(name)s] - %(levelname)s - %(message)s"
+        )
+
+        # 2. Console Handler (StreamHandler defaults to stderr, which is safer)
+        console_handler = logging.StreamHandler()
+        console_handler.setFormatter(formatter)
+        handlers = [console_handler]
+
+        # 3. File Handler (Optional)
+        if log_file:
+            # Ensure directory exists
+            os.makedirs(os.path.dirname(log_file), exist_ok=True)
+
+            file_handler = logging.FileHandler(log_file, mode='a', encoding='utf-8')
+            file_handler.setFormatter(formatter)
+            handlers.append(file_handler)
+
+        # 4. The handlers run on the listener thread, loggers only enqueue records
+        log_queue: queue.SimpleQueue = queue.SimpleQueue()
+        listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+        listener.start()
+
+        queue_handler = _DeferredQueueHandler(log_queue)
+        _listeners[key] = (queue_handler, listener)
+        return queue_handler
+
+
+def shutdown_logging():
+    """
+    Flushes pending records and stops the background listeners.
+    Called automatically at interpreter exit. Loggers set up afterwards get a
+    new listener.
+    """
+    with _listeners_lock:
+        listeners = list(_listeners.values())
+        _listeners.clear()
+
+    for queue_handler, listener in listeners:
+        listener.stop()
+        for handler in listener.handlers:
+            handler.close()
+        for logger in logging.Logger.manager.loggerDict.values():
+            if isinstance(logger, logging.Logger) and queue_handler in logger.handlers:
+                logger.removeHandler(queue_handler)
+
+
+atexit.register(shutdown_logging)
+
+
+class _ForwardedRecordHandler(logging.Handler):
+    """Hands a record of a worker process to the logger of the same name in this process."""
+
+    def emit(self, record: logging.LogRecord):
+        logging.getLogger(record.name).handle(record)
+
+
+@contextmanager
+def forwarded_logs(context) -> Iterator[Any]:
+    """
+    Collects the log records of worker processes while open.
+    Yields the queue to pass to forward_logging, the initializer of the workers.
+
+    Args:
+        context: The multiprocessing context the workers are started with.
+    """
+    log_queue = context.Queue()
+    listener = QueueListener(log_queue, _ForwardedRecordHandler())
+    listener.start()
+    try:
+        yield log_queue
+    finally:
+        listener.stop()
+
+
+def forward_logging(log_queue) -> None:
+    """
+    Initializer of worker processes: sends the records of every logger to the
+    parent (see forwarded_logs) instead of writing the log file from several processes.
+    """
+    global _forward_handler
+    # The standard QueueHandler merges the arguments into the message, so records pickle
+    forward_handler = QueueHandler(log_queue)
+    with _listeners_lock:
+        _forward_handler = forward_handler
+        local_handlers = [queue_handler for queue_handler, _ in _listeners.values()]
+
+    # Loggers of modules imported before the initializer ran (e.g. the spawned main module)
+    for logger in list(logging.Logger.manager.loggerDict.values()):
+        if isinstance(logger, logging.Logger) and any(handler in logger.handlers for handler in local_handlers):
+            logger.addHandler(forward_handler)
+    shutdown_logging()
 
 
 def setup_logger(name="EmotionTool", log_file="./log/app.log", level=logging.INFO):
     """
-    Sets up a standard logger to output to console.
+    Sets up a standard logger to output to console and the log file.
+    Records are handed to a background QueueListener, so logging never blocks on I/O.
+    Use lazy %-style arguments on hot paths: logger.debug("Frame %d", idx).
     """
     logger = logging.getLogger(name)
     logger.setLevel(level)
 
-    
-     # Prevent adding duplicate handlers if logger is already set up
+    # Prevent adding duplicate handlers if logger is already set up
     if logger.handlers:
         return logger
 
-    # 1. Create formatter
-    formatter = logging.Formatter(
-        "%(asctime)s - [%(name)s] - %(levelname)s - %(message)s"
-    )
-
-    # 2. Console Handler (StreamHandler defaults to stderr, which is safer)
-    console_handler = logging.StreamHandler()
-    console_handler.setFormatter(formatter)
-    logger.addHandler(console_handler)
-    
-    # 3. File Handler (Optional)
-    if log_file:
-        # Ensure directory exists
-        os.makedirs(os.path.dirname(log_file), exist_ok=True)
-        
-        file_handler = logging.FileHandler(log_file, mode='a', encoding='utf-8')
-        file_handler.setFormatter(formatter)
-        logger.addHandler(file_handler)
-        
+    logger.addHandler(_get_queue_handler(log_file))
 
     return logger
+
+
+class RateLimitedLogger:
+    """
+    Wraps a logger for per-frame events (e.g. "No face detected").
+    Each distinct message template is emitted at most once per `interval` seconds;
+    the next emitted record reports how many similar ones were suppressed.
+    Disabled levels cost a single isEnabledFor check.
+    """
+
+    def __init__(self, logger: logging.Logger, interval: float = 5.0, clock: Callable[[], float] = time.monotonic):
+        self.logger = logger
+        self.interval = interval
+        self.clock = clock
+        self._last_emit: Dict[str, float] = {}
+        self._suppressed: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def log(self, level: int, msg: str, *args):
+        self._log(level, msg, args)
+
+    def debug(self, msg: str, *args):
+        self._log(logging.DEBUG, msg, args)
+
+    def info(self, msg: str, *args):
+        self._log(logging.INFO, msg, args)
+
+    def warning(self, msg: str, *args):
+        self._log(logging.WARNING, msg, args)
+
+    def error(self, msg: str, *args):
+        self._log(logging.ERROR, msg, args)
+
+    def _log(self, level: int, msg: str, args: tuple):
+        if not self.logger.isEnabledFor(level):
+            return
+
+        now = self.clock()
+        with self._lock:
+            last = self._last_emit.get(msg)
+            if last is not None and now - last < self.interval:
+                self._suppressed[msg] = self._suppressed.get(msg, 0) + 1
+                return
+            self._last_emit[msg] = now
+            suppressed = self._suppressed.pop(msg, 0)
+
+        # stacklevel=3 attributes the record to the caller of the public method
+        if suppressed:
+            self.logger.log(level, msg + " (%d similar messages suppressed)", *args, suppressed, stacklevel=3)
+        else:
+            self.logger.log(level, msg, *args, stacklevel=3)
@@ -0,0 +1,89 @@
+import sys
+import threading
+from typing import Any, Dict
+
+try:
+    import resource
+except ImportError:  # not available on Windows, the peak RSS is then not reported
+    resource = None
+
+from backend.src.infrastructure.logger import setup_logger
+
+logger = setup_logger("core.memory_budget.py")
+
+# Rough in-memory size of one result (dataclass, score dict and strings) or CSV row
+RESULT_BYTES = 1024
+
+MB = 1024 * 1024
+
+
+class MemoryBudget:
+    """Accounts the bytes of frames in flight and buffered results against a limit.
+
+    Components reserve what they hold (decoded frames, result and row buffers)
+    and release it when the data is handed on. Nothing is allocated or refused
+    here; the owners ask `under_pressure`, `fits` or `scaled` and shrink their
+    batches, queues and buffers themselves. The budget is shared by all worker
+    threads.
+
+    Bounded: image batches and their prefetch, adaptive refinement buffers,
+    per-video result buffers, face crop buffers and compressed storage buffers.
+    Not bounded: the number of parallel video workers (every worker holds at
+    least its current frame, even beyond the budget), the decoders' own buffers,
+    the model runtimes and the frame buffers of cross-video batching (which the
+    CLI does not combine with --max-memory).
+
+    Attributes:
+        max_bytes (int): The budget.
+        high_water (float): Fraction of the budget from which buffers are shrunk.
+    """
+
+    def __init__(self, max_bytes: int, high_water: float = 0.8):
+        self.max_bytes = max(1, int(max_bytes))
+        self.high_water = high_water
+        self.in_use = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def reserve(self, nbytes: int):
+        """Records bytes that are now held, even beyond the budget."""
+        with self._lock:
+            self.in_use += nbytes
+            self.peak = max(self.peak, self.in_use)
+
+    def release(self, nbytes: int):
+        with self._lock:
+            self.in_use = max(0, self.in_use - nbytes)
+
+    def fits(self, nbytes: int) -> bool:
+        """Whether `nbytes` more would stay below the high-water mark."""
+        return self.in_use + nbytes <= self.max_bytes * self.high_water
+
+    @property
+    def under_pressure(self) -> bool:
+        return self.in_use >= self.max_bytes * self.high_water
+
+    def scaled(self, size: int) -> int:
+        """Shrinks a batch or queue size linearly once the high-water mark is passed."""
+        usage = self.in_use / self.max_bytes
+        if usage < self.high_water:
+            return size
+        headroom = max(0.0, 1.0 - usage) / (1.0 - self.high_water)
+        return max(1, int(size * headroom))
+
+    def report(self) -> Dict[str, Any]:
+        """Peak tracked bytes and the peak resident set size of the process."""
+        return {
+            "max_bytes": self.max_bytes,
+            "peak_bytes": self.peak,
+            "peak_rss_bytes": peak_rss(),
+        }
+
+
+def peak_rss() -> int:
+    """Peak resident set size of the process in bytes (0 if unknown)."""
+    if resource is None:
+        return 0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak if sys.platform == "darwin" else peak * 1024
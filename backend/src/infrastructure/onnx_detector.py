@@ -0,0 +1,228 @@
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from backend.src.domain.interfaces import IEmotionDetector
+from backend.src.infrastructure.face_locator import HaarFaceLocator
+from backend.src.infrastructure.logger import RateLimitedLogger, setup_logger
+from backend.src.infrastructure.tracing import tracer
+
+logger = setup_logger("core.onnx_detector.py")
+frame_logger = RateLimitedLogger(logger)
+
+# Output order of the DeepFace facial expression model
+EMOTION_LABELS = ["angry", "disgust", "fear", "happy", "sad", "surprise", "neutral"]
+
+
+
+def export_deepface_model(output_path: str, opset: int = 13) -> str:
+    """Converts the DeepFace facial expression Keras model to ONNX with tf2onnx.
+
+    Needs TensorFlow and tf2onnx; DeepFace downloads its Keras weights on first use.
+    The exported model takes (N, 48, 48, 1) grayscale faces scaled to [0, 1].
+
+    Args:
+        output_path (str): Target ONNX file.
+        opset (int): ONNX opset of the export.
+
+    Returns:
+        str: Path of the exported model.
+    """
+    import tensorflow as tf
+    import tf2onnx
+    from deepface import DeepFace
+
+    keras_model = DeepFace.build_model(model_name="Emotion", task="facial_attribute").model
+    if not isinstance(keras_model, tf.keras.Model):
+        raise RuntimeError("DeepFace did not build the TensorFlow emotion model, run it on the TensorFlow backend")
+
+    directory = os.path.dirname(output_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    logger.info(f"Exporting the DeepFace emotion model to {output_path} (opset {opset})")
+    signature = [tf.TensorSpec((None, 48, 48, 1), tf.float32, name="input")]
+    tf2onnx.convert.from_keras(keras_model, input_signature=signature, opset=opset, output_path=output_path)
+    return output_path
+
+
+def quantize_model(model_path: str, output_path: Optional[str] = None) -> str:
+    """Creates an int8 (dynamic quantization) copy of an ONNX model.
+
+    Args:
+        model_path (str): The fp32 ONNX model.
+        output_path (str, optional): Target file, defaults to "<model>.int8.onnx".
+
+    Returns:
+        str: Path of the quantized model.
+    """
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    if output_path is None:
+        output_path = os.path.splitext(model_path)[0] + ".int8.onnx"
+
+    logger.info(f"Quantizing {model_path} to int8: {output_path}")
+    quantize_dynamic(model_path, output_path, weight_type=QuantType.QInt8)
+    return output_path
+
+
+class OnnxEmotionDetector(IEmotionDetector):
+    """Emotion detector running an exported ONNX emotion model on CPU.
+
+    Mirrors the DeepFace pipeline (OpenCV face detection, 48x48 grayscale crop,
+    facial expression CNN) without loading TensorFlow. The model is created once
+    with export_deepface_model (--export-onnx).
+
+    Attributes:
+        model_path (str): Path of the ONNX model that is actually loaded.
+        locator (HaarFaceLocator): Face detector used to crop the input.
+    """
+
+    def __init__(
+        self,
+        model_path: str,
+        quantized: bool = False,
+        intra_op_threads: int = 1,
+        locator: Optional[HaarFaceLocator] = None,
+    ):
+        """Loads the model into an onnxruntime CPU session.
+
+        Args:
+            model_path (str): The fp32 ONNX emotion model.
+            quantized (bool): Use the int8 variant, created next to the model if missing.
+            intra_op_threads (int): Threads onnxruntime may use inside one operator.
+            locator (HaarFaceLocator, optional): Face detector for cropping.
+        """
+        # Imported here, so the other backends do not need onnxruntime
+        import onnxruntime as ort
+
+        if not os.path.exists(model_path):
+            raise FileNotFoundError(f"ONNX model not found: {model_path} (create it with --export-onnx)")
+
+        if quantized:
+            int8_path = os.path.splitext(model_path)[0] + ".int8.onnx"
+            model_path = int8_path if os.path.exists(int8_path) else quantize_model(model_path, int8_path)
+
+        self.model_path = model_path
+        self.locator = locator or HaarFaceLocator(max_width=640, min_neighbors=5)
+
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = max(1, intra_op_threads)
+        options.inter_op_num_threads = 1
+        options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+
+        self.session = ort.InferenceSession(model_path, sess_options=options, providers=["CPUExecutionProvider"])
+        self.input_name = self.session.get_inputs()[0].name
+        logger.info(f"Loaded ONNX emotion model {model_path} ({options.intra_op_num_threads} threads)")
+
+    def detect(self, frame: Any) -> Optional[Dict[str, Any]]:
+        """Analyzes a single frame.
+
+        Args:
+            frame (Any): File path (str) or image array (numpy.ndarray).
+
+        Returns:
+            Optional[Dict[str, Any]]: Detection results or None if no face is found.
+        """
+        return self.detect_batch([frame])[0]
+
+    def detect_batch(self, frames: List[Any]) -> List[Optional[Dict[str, Any]]]:
+        """Analyzes several frames with a single model call for all found faces.
+
+        Args:
+            frames (List[Any]): File paths (str) or image arrays (numpy.ndarray).
+
+        Returns:
+            List[Optional[Dict[str, Any]]]: One result (or None) per frame.
+        """
+        results: List[Optional[Dict[str, Any]]] = [None] * len(frames)
+        faces, owners, regions = [], [], []
+
+        for i, frame in enumerate(frames):
+            try:
+                with tracer.span("preprocess.locate_face"):
+                    located = self._locate_face(frame)
+            except Exception as e:
+                frame_logger.error("Error detecting face for onnxruntime: %s", e)
+                continue
+
+            if located is not None:
+                faces.append(located[0])
+                regions.append(located[1])
+                owners.append(i)
+
+        if not faces:
+            return results
+
+        try:
+            probabilities = self._classify(faces)
+        except Exception as e:
+            frame_logger.error("Error analyzing frames using onnxruntime: %s", e)
+            return results
+
+        for i, region, scores in zip(owners, regions, probabilities):
+            result = self._to_result(scores)
+            result["region"] = region
+            results[i] = result
+
+        return results
+
+    def classify_faces(self, faces: List[np.ndarray]) -> List[Optional[Dict[str, Any]]]:
+        """Runs only the emotion model on face crops (no face detection).
+
+        Args:
+            faces (List[np.ndarray]): BGR or grayscale face crops of any size.
+
+        Returns:
+            List[Optional[Dict[str, Any]]]: One result per crop.
+        """
+        if not faces:
+            return []
+        try:
+            probabilities = self._classify([self._preprocess(face) for face in faces])
+        except Exception as e:
+            frame_logger.error("Error classifying face crops using onnxruntime: %s", e)
+            return [None] * len(faces)
+        return [self._to_result(scores) for scores in probabilities]
+
+    def _locate_face(self, frame: Any) -> Optional[Tuple[np.ndarray, Dict[str, int]]]:
+        """Finds the largest face and returns its model input and region."""
+        image = frame if isinstance(frame, np.ndarray) else cv2.imread(frame)
+        if image is None:
+            frame_logger.error("Could not read image: %s", frame)
+            return None
+
+        boxes = self.locator.locate(image)
+        if not boxes:
+            return None
+
+        # Take the largest face found
+        x, y, w, h = boxes[0]
+        face = self._preprocess(image[y:y + h, x:x + w])
+        return face, {"x": x, "y": y, "w": w, "h": h}
+
+    def _preprocess(self, face: np.ndarray) -> np.ndarray:
+        """Converts a BGR face crop to the 48x48 grayscale model input."""
+        gray = face if face.ndim == 2 else cv2.cvtColor(face, cv2.COLOR_BGR2GRAY)
+        gray = cv2.resize(gray, (48, 48), interpolation=cv2.INTER_AREA)
+        return gray.astype(np.float32)[:, :, np.newaxis] / 255.0
+
+    def _classify(self, faces: List[np.ndarray]) -> np.ndarray:
+        """Runs the model on preprocessed faces, returning one probability row per face."""
+        batch = np.stack(faces).astype(np.float32)
+        with tracer.span("detect.inference", faces=len(faces)):
+            return self.session.run(None, {self.input_name: batch})[0]
+
+    def _to_result(self, probabilities: np.ndarray) -> Dict[str, Any]:
+        """Builds the DeepFace-style result dict (scores in percent)."""
+        total = float(np.sum(probabilities)) or 1.0
+        emotion = {
+            label: float(prob) * 100 / total
+            for label, prob in zip(EMOTION_LABELS, probabilities)
+        }
+        return {
+            "dominant_emotion": max(emotion, key=emotion.get),
+            "emotion": emotion,
+        }
@@ -1,19 +1,29 @@
+import bisect
 import cv2
 import os
 import logging
 from typing import Optional
 import numpy as np
-from backend.src.domain.interfaces import IVideoSource, IVideoFactory
+from backend.src.domain.interfaces import IImageReader, IVideoSource, IVideoFactory
+from backend.src.domain.models import VideoMetadata
+from backend.src.infrastructure.video_metadata import VideoMetadataIndex
 
 logger = logging.getLogger("OpenCVAdapter")
 
 class OpenCVVideoSource(IVideoSource):
     """
     Concrete implementation of IVideoSource using OpenCV.
+
+    With known keyframe positions, a seek only jumps when a keyframe lies before
+    the target, otherwise decoding forward is cheaper. Without them, gaps longer
+    than `max_grab` frames are jumped.
     """
-    def __init__(self, file_path: str):
+    def __init__(self, file_path: str, metadata: Optional[VideoMetadata] = None, max_grab: int = 250):
         self.file_path = file_path
+        self.metadata = metadata
+        self.max_grab = max_grab
         self.cap = None
+        self._position = 0  # index of the frame the next read returns
 
     def open(self) -> bool:
         if not os.path.exists(self.file_path):
@@ -24,6 +34,7 @@ class OpenCVVideoSource(IVideoSource):
         if not self.cap.isOpened():
             logger.error(f"Failed to open video: {self.file_path}")
             return False
+        self._position = 0
         return True
 
     def get_fps(self) -> float:
@@ -31,6 +42,40 @@ class OpenCVVideoSource(IVideoSource):
             return self.cap.get(cv2.CAP_PROP_FPS)
         return 0.0
 
+    def get_frame_count(self) -> int:
+        if self.metadata and self.metadata.frame_count:
+            return self.metadata.frame_count
+        if self.cap and self.cap.isOpened():
+            # Read from the container header, may be an estimate for some formats
+            return max(0, int(self.cap.get(cv2.CAP_PROP_FRAME_COUNT)))
+        return 0
+
+    def get_duration(self) -> float:
+        if self.metadata and self.metadata.duration:
+            return self.metadata.duration
+        return super().get_duration()
+
+    def seek(self, frame_idx: int) -> bool:
+        if not self.cap or not self.cap.isOpened():
+            return False
+
+        if frame_idx < self._position or self._should_jump(frame_idx):
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, frame_idx)
+        else:
+            # grab() decodes without converting the frame, the cheap way to skip
+            while self._position < frame_idx and self.cap.grab():
+                self._position += 1
+        self._position = frame_idx
+        return True
+
+    def _should_jump(self, frame_idx: int) -> bool:
+        keyframes = self.metadata.keyframes if self.metadata else None
+        if keyframes:
+            # Decoding restarts at the last keyframe before the target
+            next_keyframe = bisect.bisect_right(keyframes, self._position)
+            return next_keyframe < len(keyframes) and keyframes[next_keyframe] <= frame_idx
+        return frame_idx - self._position > self.max_grab
+
     def read(self) -> Optional[np.ndarray]:
         if not self.cap or not self.cap.isOpened():
             return None
@@ -38,6 +83,7 @@ class OpenCVVideoSource(IVideoSource):
         ret, frame = self.cap.read()
         if not ret:
             return None
+        self._position += 1
         return frame
 
     def release(self) -> None:
@@ -47,6 +93,45 @@ class OpenCVVideoSource(IVideoSource):
 class OpenCVVideoFactory(IVideoFactory):
     """
     Factory to create OpenCVVideoSource instances.
+    The sources get the cached metadata of their video when an index is given.
     """
+    def __init__(self, metadata_index: Optional[VideoMetadataIndex] = None):
+        self.metadata_index = metadata_index
+
     def create(self, file_path: str) -> IVideoSource:
-        return OpenCVVideoSource(file_path)
\ No newline at end of file
+        metadata = self.metadata_index.get(file_path) if self.metadata_index else None
+        return OpenCVVideoSource(file_path, metadata=metadata)
+
+    def probe(self, file_path: str) -> Optional[VideoMetadata]:
+        """Returns the cached metadata (probed on first use), None without an index."""
+        return self.metadata_index.get(file_path) if self.metadata_index else None
+
+
+class OpenCVImageReader(IImageReader):
+    """
+    Decodes still images with OpenCV.
+    JPEG files can be decoded directly at 1/2, 1/4 or 1/8 resolution, which skips
+    most of the IDCT work and is much faster than decoding and resizing.
+    """
+    REDUCED_FLAGS = {
+        2: cv2.IMREAD_REDUCED_COLOR_2,
+        4: cv2.IMREAD_REDUCED_COLOR_4,
+        8: cv2.IMREAD_REDUCED_COLOR_8,
+    }
+    JPEG_EXTENSIONS = {'.jpg', '.jpeg'}
+
+    def __init__(self, reduce_factor: int = 1):
+        if reduce_factor != 1 and reduce_factor not in self.REDUCED_FLAGS:
+            raise ValueError(f"Unsupported reduce factor: {reduce_factor} (use 1, 2, 4 or 8)")
+        self.reduce_factor = reduce_factor
+
+    def read(self, file_path: str) -> Optional[np.ndarray]:
+        flag = cv2.IMREAD_COLOR
+        ext = os.path.splitext(file_path)[1].lower()
+        if self.reduce_factor > 1 and ext in self.JPEG_EXTENSIONS:
+            flag = self.REDUCED_FLAGS[self.reduce_factor]
+
+        image = cv2.imread(file_path, flag)
+        if image is None:
+            logger.error(f"Failed to read image: {file_path}")
+        return image
@@ -0,0 +1,93 @@
+import threading
+from typing import Any, Dict, List, Optional
+
+import cv2
+import numpy as np
+
+from backend.src.domain.interfaces import IEmotionDetector
+from backend.src.infrastructure.face_locator import HaarFaceLocator
+from backend.src.infrastructure.logger import setup_logger
+
+logger = setup_logger("core.prefilter.py")
+
+
+class FacePrefilterDetector(IEmotionDetector):
+    """Emotion detector cascade with a cheap face-presence check in front.
+
+    Frames without a likely face (audience shots, graphics, B-roll) are rejected
+    on a downscaled copy and never reach the wrapped detector, so they avoid the
+    full pipeline and its "no face" exception path.
+
+    Attributes:
+        detector (IEmotionDetector): The full emotion detector.
+        locator (HaarFaceLocator): The cheap face-presence check.
+    """
+
+    def __init__(self, detector: IEmotionDetector, locator: Optional[HaarFaceLocator] = None):
+        self.detector = detector
+        self.locator = locator or HaarFaceLocator()
+
+        self.rejected_frames = 0
+        self.passed_frames = 0
+        self._lock = threading.Lock()
+
+    def detect(self, frame: Any) -> Optional[Dict[str, Any]]:
+        """Runs the face-presence check and the full detector only when it passes.
+
+        Args:
+            frame (Any): File path (str) or image array (numpy.ndarray).
+
+        Returns:
+            Optional[Dict[str, Any]]: Detection results or None if no face is found.
+        """
+        image = frame if isinstance(frame, np.ndarray) else cv2.imread(frame)
+
+        # Let the full detector deal with unreadable inputs
+        if image is not None and not self.locator.has_face(image):
+            with self._lock:
+                self.rejected_frames += 1
+            return None
+
+        with self._lock:
+            self.passed_frames += 1
+        return self.detector.detect(frame)
+
+    def detect_batch(self, frames: List[Any]) -> List[Optional[Dict[str, Any]]]:
+        """Runs the face-presence check per frame and one batched call for the rest.
+
+        Args:
+            frames (List[Any]): File paths (str) or image arrays (numpy.ndarray).
+
+        Returns:
+            List[Optional[Dict[str, Any]]]: One result (or None) per frame.
+        """
+        results: List[Optional[Dict[str, Any]]] = [None] * len(frames)
+        passed = []
+
+        for i, frame in enumerate(frames):
+            image = frame if isinstance(frame, np.ndarray) else cv2.imread(frame)
+            if image is None or self.locator.has_face(image):
+                passed.append(i)
+
+        with self._lock:
+            self.rejected_frames += len(frames) - len(passed)
+            self.passed_frames += len(passed)
+
+        if passed:
+            for i, result in zip(passed, self.detector.detect_batch([frames[i] for i in passed])):
+                results[i] = result
+        return results
+
+    def classify_faces(self, faces: List[np.ndarray]) -> List[Optional[Dict[str, Any]]]:
+        """Crops are faces already, so they go straight to the wrapped detector."""
+        return self.detector.classify_faces(faces)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Returns the prefilter counters merged with the wrapped detector's."""
+        stats = dict(self.detector.get_stats())
+        stats["prefilter_rejected"] = self.rejected_frames
+        stats["prefilter_passed"] = self.passed_frames
+        return stats
+
+    def close(self) -> None:
+        self.detector.close()
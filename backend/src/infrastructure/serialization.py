@@ -0,0 +1,19 @@
+from typing import Any
+
+import numpy as np
+
+
+def to_builtin(value: Any) -> Any:
+    """
+    Recursively converts detector results (which may hold numpy scalars and
+    arrays) into plain Python types that can be written as JSON.
+    """
+    if isinstance(value, dict):
+        return {str(key): to_builtin(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [to_builtin(item) for item in value]
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
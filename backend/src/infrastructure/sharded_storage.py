@@ -0,0 +1,186 @@
+import csv
+import glob
+import heapq
+import os
+import re
+import threading
+from functools import partial
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from backend.src.domain.models import OutputData
+from backend.src.infrastructure.logger import setup_logger
+from backend.src.infrastructure.storage import CSVStorage
+
+logger = setup_logger("ShardedCSVStorage")
+
+SHARD_PATTERN = re.compile(r"shard-(\d+)\.csv$")
+MAX_MERGE_FANIN = 32  # shards merged (and held open) at once
+
+
+def timestamp_seconds(timestamp: str) -> int:
+    """Converts an "MM:SS" timestamp (minutes may exceed 59) to seconds."""
+    minutes, _, seconds = timestamp.partition(":")
+    try:
+        return int(minutes) * 60 + int(seconds or 0)
+    except ValueError:
+        return 0
+
+
+def merge_key(row: Dict[str, Any]) -> Tuple[str, float]:
+    """Sort key of the merged results: video, then the exact sample time."""
+    try:
+        seconds = float(row["seconds"])
+    except (KeyError, TypeError, ValueError):
+        # Shards written before the seconds column only have the whole-second timestamp
+        seconds = timestamp_seconds(row.get("timestamp") or "")
+    return row.get("file_name") or "", seconds
+
+
+def read_shard(path: str) -> Iterator[Dict[str, Any]]:
+    """Streams the rows of one shard file (module level, so it can run in a worker process).
+
+    Read errors propagate: a report built from a subset of the shards would be silently wrong.
+    """
+    with open(path, mode="r", encoding="utf-8") as csvfile:
+        yield from csv.DictReader(csvfile)
+
+
+class ShardedCSVStorage(CSVStorage):
+    """CSVStorage writing the per-frame results of every worker thread to its own shard.
+
+    Parallel video workers append without contending on one file. Each shard is
+    kept a sorted run by (video, timestamp): a worker that writes a row ordered
+    before its previous one (e.g. a later run or an unsorted folder) starts a
+    new shard. Reading merges the runs with a streaming k-way merge, so the
+    results come back ordered by video and time without being loaded at once.
+    Shard rows carry the exact sample time in a `seconds` column, so samples
+    within the same second merge in order. The summary, segment and video index
+    files stay single CSV files.
+
+    Every out-of-order write adds a shard, so finished shards are compacted:
+    once there are more than `fan_in` of them, the oldest are merged into one
+    sorted shard, at most `fan_in` at a time. This keeps the number of files
+    open during a merge bounded. Shards still owned by a live writer thread are
+    left alone.
+
+    Attributes:
+        shards_dir (str): Folder of the shard files.
+    """
+
+    def __init__(self, output_path: str, fan_in: int = MAX_MERGE_FANIN):
+        super().__init__(output_path)
+        self.fan_in = max(2, fan_in)
+        self.fieldnames = self.fieldnames[:2] + ["seconds"] + self.fieldnames[2:]
+        self.shards_dir = os.path.join(self.output_path, "results_shards")
+        os.makedirs(self.shards_dir, exist_ok=True)
+
+        self._next_shard = 1 + max(
+            (int(SHARD_PATTERN.search(path).group(1)) for path in self.shard_paths()), default=-1
+        )
+        self._local = threading.local()  # structure: shard = {'path': str, 'last_key': (file_name, seconds)}
+        self._owners: Dict[str, threading.Thread] = {}  # structure: {shard_path: writer thread}
+        self._compact_lock = threading.Lock()
+
+    def shard_paths(self) -> List[str]:
+        """Returns the shard files in creation order."""
+        paths = glob.glob(os.path.join(self.shards_dir, "shard-*.csv"))
+        return sorted(path for path in paths if SHARD_PATTERN.search(path))
+
+    def load_all(self) -> List[Dict[str, Any]]:
+        """Reads all shards, merged by video and timestamp."""
+        return list(self.iter_all())
+
+    def iter_all(self) -> Iterator[Dict[str, Any]]:
+        """Streams all shards merged by video and timestamp; one row per shard is held at a time."""
+        self.compact()
+        files = []
+        try:
+            # Opened under the compaction lock, so no shard disappears between listing and opening
+            with self._compact_lock:
+                paths = self.shard_paths()
+                for path in paths:
+                    files.append(open(path, mode="r", encoding="utf-8"))
+            if not paths:
+                logger.warning("No analysis results found to load.")
+            yield from heapq.merge(*(csv.DictReader(f) for f in files), key=merge_key)
+        finally:
+            for f in files:
+                f.close()
+
+    def partitions(self) -> List[Callable[[], Iterator[Dict[str, Any]]]]:
+        """One picklable reader per shard, for aggregating the shards in parallel."""
+        self.compact()
+        return [partial(read_shard, path) for path in self.shard_paths()]
+
+    def flush(self) -> None:
+        """Compacts the finished shards once there are more than fan_in of them."""
+        self.compact()
+
+    def compact(self):
+        """Merges the oldest finished shards, fan_in at a time, until at most fan_in shards are left."""
+        with self._compact_lock:
+            while True:
+                paths = self.shard_paths()
+                finished = [path for path in paths if not self._is_owned(path)]
+                if len(paths) <= self.fan_in or len(finished) < 2:
+                    return
+                self._merge_shards(finished[:self.fan_in])
+
+    def _is_owned(self, path: str) -> bool:
+        with self._lock:
+            owner = self._owners.get(path)
+        return owner is not None and owner.is_alive()
+
+    def _merge_shards(self, paths: List[str]):
+        target = self._new_shard(owned=False)["path"]
+        tmp_path = target + ".tmp"
+        with open(tmp_path, mode="w", newline="", encoding="utf-8") as csvfile:
+            writer = csv.DictWriter(csvfile, fieldnames=self.fieldnames, extrasaction="ignore")
+            writer.writeheader()
+            writer.writerows(heapq.merge(*(read_shard(path) for path in paths), key=merge_key))
+        os.replace(tmp_path, target)
+        for path in paths:
+            os.remove(path)
+        logger.info(f"Compacted {len(paths)} result shards into {os.path.basename(target)}")
+
+    def _map_model_to_row(self, data: OutputData) -> dict:
+        row = super()._map_model_to_row(data)
+        row["seconds"] = data.seconds
+        return row
+
+    def _write_to_file(self, rows: List[dict]):
+        """Appends the rows to the shard of the calling thread, starting a new shard where the order breaks."""
+        shard = getattr(self._local, "shard", None)
+        run: List[dict] = []
+        for row in rows:
+            key = merge_key(row)
+            if shard is None or key < shard["last_key"]:
+                self._append(shard, run)
+                shard = self._local.shard = self._new_shard(shard)
+                run = []
+            run.append(row)
+            shard["last_key"] = key
+        self._append(shard, run)
+
+    def _append(self, shard, rows: List[dict]):
+        if not rows:
+            return
+        try:
+            with open(shard["path"], mode="a", newline="", encoding="utf-8") as csvfile:
+                writer = csv.DictWriter(csvfile, fieldnames=self.fieldnames)
+                if csvfile.tell() == 0:
+                    writer.writeheader()
+                writer.writerows(rows)
+        except Exception as e:
+            logger.error(f"Error writing to shard {shard['path']}: {e}")
+
+    def _new_shard(self, previous: Optional[Dict[str, Any]] = None, owned: bool = True) -> Dict[str, Any]:
+        with self._lock:
+            number = self._next_shard
+            self._next_shard += 1
+            path = os.path.join(self.shards_dir, f"shard-{number:05d}.csv")
+            if previous is not None:
+                self._owners.pop(previous["path"], None)
+            if owned:
+                self._owners[path] = threading.current_thread()
+        return {"path": path, "last_key": ("", 0.0)}
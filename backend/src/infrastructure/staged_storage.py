@@ -0,0 +1,130 @@
+import pickle
+import tempfile
+import threading
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from backend.src.domain.interfaces import IStagedStorage, IStorage
+from backend.src.domain.models import EmotionSegment, OutputData, VideoAggregate, VideoStats
+from backend.src.infrastructure.logger import setup_logger
+
+logger = setup_logger("StagedStorage")
+
+
+class StagedStorage(IStagedStorage):
+    """Storage wrapper holding back all writes until commit().
+
+    Result rows and segments are spilled to an anonymous temporary file, so a
+    long video does not keep its rows in memory; aggregates and summaries are
+    kept as they are small. commit() replays everything into the wrapped storage
+    in write order, discard() drops it. Summaries are staged as upserts. Reads go to the wrapped storage and only
+    see committed results.
+
+    Attributes:
+        storage (IStorage): The storage receiving the committed writes.
+    """
+
+    def __init__(self, storage: IStorage, spill_dir: Optional[str] = None):
+        """
+        Args:
+            storage: The storage receiving the committed writes.
+            spill_dir: Folder of the temporary spill file (None = system default).
+        """
+        self.storage = storage
+        self.spill_dir = spill_dir
+        self._spill = None
+        self._aggregates: List[VideoAggregate] = []
+        self._stats: List[VideoStats] = []
+        self._upserted_stats: List[VideoStats] = []
+        self._lock = threading.Lock()
+
+    def save(self, data: OutputData) -> None:
+        self.write_batch([data])
+
+    def write_batch(self, rows: List[OutputData]) -> None:
+        if rows:
+            self._stage("rows", list(rows))
+
+    def write_segments(self, segments: List[EmotionSegment]) -> None:
+        if segments:
+            self._stage("segments", list(segments))
+
+    def save_aggregates(self, aggregates: List[VideoAggregate]) -> None:
+        with self._lock:
+            self._aggregates.extend(aggregates)
+
+    def save_stats(self, stats: List[VideoStats]) -> None:
+        with self._lock:
+            self._stats.extend(stats)
+
+    def upsert_stats(self, stats: List[VideoStats]) -> None:
+        with self._lock:
+            self._upserted_stats.extend(stats)
+
+    def flush(self) -> None:
+        """Staged writes reach the wrapped storage only with commit()."""
+        pass
+
+    def commit(self) -> None:
+        """Writes the staged results to the wrapped storage and flushes it."""
+        with self._lock:
+            spill, self._spill = self._spill, None
+            aggregates, self._aggregates = self._aggregates, []
+            stats, self._stats = self._stats, []
+            upserted_stats, self._upserted_stats = self._upserted_stats, []
+
+        if spill is not None:
+            try:
+                spill.seek(0)
+                while True:
+                    try:
+                        kind, items = pickle.load(spill)
+                    except EOFError:
+                        break
+                    if kind == "rows":
+                        self.storage.write_batch(items)
+                    else:
+                        self.storage.write_segments(items)
+            finally:
+                spill.close()
+
+        self.storage.flush()
+        if aggregates:
+            self.storage.save_aggregates(aggregates)
+        if stats:
+            self.storage.save_stats(stats)
+        if upserted_stats:
+            self.storage.upsert_stats(upserted_stats)
+
+    def discard(self) -> None:
+        """Drops the staged results."""
+        with self._lock:
+            spill, self._spill = self._spill, None
+            self._aggregates = []
+            self._stats = []
+            self._upserted_stats = []
+        if spill is not None:
+            spill.close()
+
+    def load_all(self) -> List[Dict[str, Any]]:
+        return self.storage.load_all()
+
+    def iter_all(self) -> Iterator[Dict[str, Any]]:
+        return self.storage.iter_all()
+
+    def partitions(self) -> List[Callable[[], Iterator[Dict[str, Any]]]]:
+        return self.storage.partitions()
+
+    def load_segments(self) -> List[EmotionSegment]:
+        return self.storage.load_segments()
+
+    def iter_segments(self) -> Iterator[EmotionSegment]:
+        return self.storage.iter_segments()
+
+    def load_aggregates(self) -> List[VideoAggregate]:
+        return self.storage.load_aggregates()
+
+    def _stage(self, kind: str, items: list):
+        with self._lock:
+            if self._spill is None:
+                self._spill = tempfile.TemporaryFile(dir=self.spill_dir)
+            pickle.dump((kind, items), self._spill, protocol=pickle.HIGHEST_PROTOCOL)
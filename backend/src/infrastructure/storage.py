@@ -1,9 +1,10 @@
-from typing import Any, Dict, List
+from typing import Any, Dict, Iterator, List, Optional, Set
 import csv
 import os
+import threading
 
 from backend.src.infrastructure.logger import setup_logger
-from backend.src.domain.models import OutputData, VideoStats
+from backend.src.domain.models import EmotionSegment, OutputData, VideoAggregate, VideoStats
 from backend.src.domain.interfaces import IStorage
 
 logger = setup_logger("CSVStorage")
@@ -22,6 +23,8 @@ class CSVStorage(IStorage):
             
         self.raw_csv_path = os.path.join(self.output_path, "analysis_results.csv")
         self.stats_csv_path = os.path.join(self.output_path, "summary_report.csv")
+        self.segments_csv_path = os.path.join(self.output_path, "emotion_segments.csv")
+        self.index_csv_path = os.path.join(self.output_path, "video_index.csv")
 
         self.fieldnames = [
             'file_name', 'timestamp', 'dominant_emotion', 
@@ -33,22 +36,20 @@ class CSVStorage(IStorage):
             "pct_happy", "pct_sad", "pct_angry", "pct_neutral", "pct_fear", "pct_surprise", "pct_disgust"
         ]
 
+        self.emotions = ['angry', 'disgust', 'fear', 'happy', 'sad', 'surprise', 'neutral']
+        self.segment_fieldnames = ['file_name', 'start', 'end', 'dominant_emotion', 'sample_count'] + self.emotions
+        self.index_fieldnames = ['file_name', 'guest', 'host', 'topic', 'total_frames'] + [
+            f"count_{emotion}" for emotion in self.emotions
+        ]
+
+        # Parallel video workers share one storage instance
+        self._lock = threading.Lock()
+        self._index_videos: Optional[Set[str]] = None  # videos in video_index.csv (None = not read yet)
+        self._index_rows = 0  # rows in video_index.csv, more than videos once some were re-analyzed
+
     def save(self, data: OutputData):
         """Appends a single analysis result to the CSV."""
-        csv_row = {
-            "file_name": data.file_name,
-            "timestamp": data.timestamp,
-            "dominant_emotion": data.dominant_emotion,
-            "angry": data.emotion.get("angry", 0),
-            "disgust": data.emotion.get("disgust", 0),
-            "fear": data.emotion.get("fear", 0),
-            "happy": data.emotion.get("happy", 0),
-            "sad": data.emotion.get("sad", 0),
-            "surprise": data.emotion.get("surprise", 0),
-            "neutral": data.emotion.get("neutral", 0),
-        }
-
-        self._write_to_file(csv_row)
+        self._write_to_file([self._map_model_to_row(data)])
 
     def load_all(self) -> List[Dict[str, Any]]:
         """Reads the raw CSV file back into memory."""
@@ -66,31 +67,211 @@ class CSVStorage(IStorage):
             logger.error(f"Error reading CSV: {e}")
         return data
 
+    def iter_all(self) -> Iterator[Dict[str, Any]]:
+        """Streams the raw CSV file row by row."""
+        if not os.path.exists(self.raw_csv_path):
+            logger.warning("No analysis results found to load.")
+            return
+
+        try:
+            with open(self.raw_csv_path, mode="r", encoding="utf-8") as csvfile:
+                yield from csv.DictReader(csvfile)
+        except Exception as e:
+            logger.error(f"Error reading CSV: {e}")
+
     def save_stats(self, stats_list: List[VideoStats]):
         """Writes the summary report."""
+        with self._lock:
+            self._write_stats([self._map_stats_to_row(stat) for stat in stats_list])
+
+    def upsert_stats(self, stats_list: List[VideoStats]):
+        """Inserts or replaces the summaries of the given videos in the summary report (one row per video)."""
+        if not stats_list:
+            return
+
+        with self._lock:
+            rows = {}
+            if os.path.exists(self.stats_csv_path):
+                try:
+                    with open(self.stats_csv_path, mode="r", encoding="utf-8") as csvfile:
+                        rows = {row["file_name"]: row for row in csv.DictReader(csvfile)}
+                except Exception as e:
+                    logger.error(f"Error reading summary report: {e}")
+            for stat in stats_list:
+                rows[stat.file_name] = self._map_stats_to_row(stat)
+            self._write_stats(sorted(rows.values(), key=lambda row: row["file_name"]))
+
+    def _map_stats_to_row(self, stat: VideoStats) -> dict:
+        # Flatten the dictionary for CSV
+        row = {
+            "file_name": stat.file_name,
+            "total_frames": stat.total_frames,
+            "most_frequent_emotion": stat.most_frequent_emotion,
+            "pct_happy": stat.emotion_distribution.get("happy", 0),
+            "pct_sad": stat.emotion_distribution.get("sad", 0),
+            "pct_angry": stat.emotion_distribution.get("angry", 0),
+            "pct_neutral": stat.emotion_distribution.get("neutral", 0),
+            "pct_fear": stat.emotion_distribution.get("fear", 0),
+            "pct_surprise": stat.emotion_distribution.get("surprise", 0),
+            "pct_disgust": stat.emotion_distribution.get("disgust", 0),
+        }
+        if stat.error_bound is not None:
+            row["error_bound"] = stat.error_bound
+            row["confidence"] = stat.confidence
+        return row
+
+    def _write_stats(self, rows: List[dict]):
+        # Sampled summaries carry their error bounds, full scans keep the plain layout
+        sampled = any(row.get("error_bound") not in (None, "") for row in rows)
+        fieldnames = self.stats_fieldnames + (["error_bound", "confidence"] if sampled else [])
         try:
-            with open(self.stats_csv_path, mode="w", newline="", encoding="utf-8") as csvfile:
-                writer = csv.DictWriter(csvfile, fieldnames=self.stats_fieldnames)
+            # The report is small (one row per video), so it is rewritten atomically
+            tmp_path = self.stats_csv_path + ".tmp"
+            with open(tmp_path, mode="w", newline="", encoding="utf-8") as csvfile:
+                writer = csv.DictWriter(csvfile, fieldnames=fieldnames, extrasaction="ignore")
                 writer.writeheader()
-                
-                for stat in stats_list:
-                    # Flatten the dictionary for CSV
+                writer.writerows(rows)
+            os.replace(tmp_path, self.stats_csv_path)
+            logger.info(f"Statistics report saved to {self.stats_csv_path}")
+        except Exception as e:
+            logger.error(f"Error saving stats: {e}")
+
+    def write_segments(self, segments: List[EmotionSegment]):
+        """Appends emotion segments to the segment timeline CSV."""
+        if not segments:
+            return
+
+        try:
+            with self._lock, open(self.segments_csv_path, mode="a", newline="", encoding="utf-8") as csvfile:
+                writer = csv.DictWriter(csvfile, fieldnames=self.segment_fieldnames)
+                if csvfile.tell() == 0:  # new file, checked under the lock
+                    writer.writeheader()
+                for segment in segments:
                     row = {
-                        "file_name": stat.file_name,
-                        "total_frames": stat.total_frames,
-                        "most_frequent_emotion": stat.most_frequent_emotion,
-                        "pct_happy": stat.emotion_distribution.get("happy", 0),
-                        "pct_sad": stat.emotion_distribution.get("sad", 0),
-                        "pct_angry": stat.emotion_distribution.get("angry", 0),
-                        "pct_neutral": stat.emotion_distribution.get("neutral", 0),
-                        "pct_fear": stat.emotion_distribution.get("fear", 0),
-                        "pct_surprise": stat.emotion_distribution.get("surprise", 0),
-                        "pct_disgust": stat.emotion_distribution.get("disgust", 0),
+                        "file_name": segment.file_name,
+                        "start": round(segment.start, 3),
+                        "end": round(segment.end, 3),
+                        "dominant_emotion": segment.dominant_emotion,
+                        "sample_count": segment.sample_count,
                     }
+                    row.update({emotion: segment.emotion.get(emotion, 0) for emotion in self.emotions})
                     writer.writerow(row)
-            logger.info(f"Statistics report saved to {self.stats_csv_path}")
         except Exception as e:
-            logger.error(f"Error saving stats: {e}")
+            logger.error(f"Error writing segments: {e}")
+
+    def load_segments(self) -> List[EmotionSegment]:
+        """Reads the segment timeline CSV."""
+        return list(self.iter_segments())
+
+    def iter_segments(self) -> Iterator[EmotionSegment]:
+        """Streams the segment timeline CSV row by row."""
+        if not os.path.exists(self.segments_csv_path):
+            logger.warning("No emotion segments found to load.")
+            return
+
+        try:
+            with open(self.segments_csv_path, mode="r", encoding="utf-8") as csvfile:
+                for row in csv.DictReader(csvfile):
+                    yield EmotionSegment(
+                        file_name=row["file_name"],
+                        start=float(row["start"]),
+                        end=float(row["end"]),
+                        dominant_emotion=row["dominant_emotion"],
+                        emotion={emotion: float(row[emotion]) for emotion in self.emotions},
+                        sample_count=int(row["sample_count"]),
+                    )
+        except Exception as e:
+            logger.error(f"Error reading segments: {e}")
+
+    def save_aggregates(self, aggregates: List[VideoAggregate]):
+        """Upserts per-video aggregates into the video index.
+
+        Upserts are appended, a later row of a video replaces its earlier ones, so
+        finishing a video costs one row however large the index is. Once re-analyzed
+        videos make up half of the rows, the index is rewritten with one row per video.
+        """
+        if not aggregates:
+            return
+
+        with self._lock:
+            self._save_aggregates(aggregates)
+
+    def _save_aggregates(self, aggregates: List[VideoAggregate]):
+        try:
+            if self._index_videos is None:
+                names = [row["file_name"] for row in self._read_index_rows()]
+                self._index_videos, self._index_rows = set(names), len(names)
+            new_videos = {aggregate.file_name for aggregate in aggregates} - self._index_videos
+            rows = self._index_rows + len(aggregates)
+            videos = len(self._index_videos) + len(new_videos)
+
+            if rows > 2 * videos:
+                self._rewrite_index(aggregates)
+            else:
+                with open(self.index_csv_path, mode="a", newline="", encoding="utf-8") as csvfile:
+                    writer = csv.DictWriter(csvfile, fieldnames=self.index_fieldnames)
+                    if csvfile.tell() == 0:
+                        writer.writeheader()
+                    writer.writerows(self._map_aggregate_to_row(aggregate) for aggregate in aggregates)
+                self._index_videos |= new_videos
+                self._index_rows = rows
+        except Exception as e:
+            self._index_videos = None
+            logger.error(f"Error saving video index: {e}")
+
+    def _rewrite_index(self, aggregates: List[VideoAggregate]):
+        """Compacts the index to one row per video, sorted by file name, replacing it atomically."""
+        index = {aggregate.file_name: aggregate for aggregate in self.load_aggregates()}
+        for aggregate in aggregates:
+            index[aggregate.file_name] = aggregate
+
+        tmp_path = self.index_csv_path + ".tmp"
+        with open(tmp_path, mode="w", newline="", encoding="utf-8") as csvfile:
+            writer = csv.DictWriter(csvfile, fieldnames=self.index_fieldnames)
+            writer.writeheader()
+            for file_name in sorted(index):
+                writer.writerow(self._map_aggregate_to_row(index[file_name]))
+        os.replace(tmp_path, self.index_csv_path)
+        self._index_videos, self._index_rows = set(index), len(index)
+
+    def _map_aggregate_to_row(self, aggregate: VideoAggregate) -> dict:
+        row = {
+            "file_name": aggregate.file_name,
+            "guest": aggregate.guest,
+            "host": aggregate.host,
+            "topic": aggregate.topic,
+            "total_frames": aggregate.total_frames,
+        }
+        row.update({f"count_{emotion}": aggregate.emotion_counts.get(emotion, 0) for emotion in self.emotions})
+        return row
+
+    def _read_index_rows(self) -> List[Dict[str, str]]:
+        if not os.path.exists(self.index_csv_path):
+            return []
+        with open(self.index_csv_path, mode="r", encoding="utf-8") as csvfile:
+            return list(csv.DictReader(csvfile))
+
+    def load_aggregates(self) -> List[VideoAggregate]:
+        """Reads the video index, one aggregate per video sorted by file name (the last upsert wins)."""
+        if not os.path.exists(self.index_csv_path):
+            return []
+
+        aggregates: Dict[str, VideoAggregate] = {}
+        try:
+            with open(self.index_csv_path, mode="r", encoding="utf-8") as csvfile:
+                for row in csv.DictReader(csvfile):
+                    counts = {emotion: int(row[f"count_{emotion}"]) for emotion in self.emotions}
+                    aggregates[row["file_name"]] = VideoAggregate(
+                        file_name=row["file_name"],
+                        guest=row["guest"],
+                        host=row["host"],
+                        topic=row["topic"],
+                        total_frames=int(row["total_frames"]),
+                        emotion_counts={emotion: count for emotion, count in counts.items() if count},
+                    )
+        except Exception as e:
+            logger.error(f"Error reading video index: {e}")
+        return [aggregates[file_name] for file_name in sorted(aggregates)]
 
     def _map_model_to_row(self, data: OutputData) -> dict:
         return {
@@ -106,19 +287,18 @@ class CSVStorage(IStorage):
             "neutral": data.emotion.get("neutral", 0),
         }
         
-    def _write_to_file(self, row: dict):
-        """Writes a dictionary row to the CSV file."""
-        file_exists = os.path.isfile(self.raw_csv_path)
+    def _write_to_file(self, rows: List[dict]):
+        """Writes dictionary rows to the CSV file with a single open/append."""
         try:
-            with open(self.raw_csv_path, mode="a", newline="", encoding="utf-8") as csvfile:
+            with self._lock, open(self.raw_csv_path, mode="a", newline="", encoding="utf-8") as csvfile:
                 writer = csv.DictWriter(csvfile, fieldnames=self.fieldnames)
-                if not file_exists:
+                if csvfile.tell() == 0:  # new file, checked under the lock
                     writer.writeheader()
-                writer.writerow(row)
+                writer.writerows(rows)
         except Exception as e:
             logger.error(f"Error writing to CSV: {e}")
 
-    def write_batch(self, rows: List[Dict]):
-        """Writes a list of rows to the CSV."""
-        for row in rows:
-            self.save(row)
+    def write_batch(self, rows: List[OutputData]):
+        """Writes a list of results to the CSV in one append."""
+        if rows:
+            self._write_to_file([self._map_model_to_row(row) for row in rows])
@@ -0,0 +1,58 @@
+import os
+import sys
+
+import cv2
+
+from backend.src.domain.models import ThreadBudget
+from backend.src.infrastructure.logger import setup_logger
+
+logger = setup_logger("core.thread_config.py")
+
+# Read by the BLAS/OpenMP runtimes and TensorFlow when they create their pools
+_INFERENCE_ENV_VARS = ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS")
+
+
+def apply_thread_budget(budget: ThreadBudget) -> None:
+    """Applies a thread budget to OpenCV, TensorFlow and the BLAS/OpenMP runtimes.
+
+    Environment variables only affect runtimes that have not created their pools
+    yet (numpy's BLAS pool exists as soon as numpy is imported), so this should be
+    called before the detector is created. TensorFlow's pools are fixed once its
+    context exists; later calls keep them and log a warning. ONNX Runtime sessions
+    take their thread count at construction (see OnnxEmotionDetector).
+
+    Args:
+        budget (ThreadBudget): The split of the core budget.
+    """
+    for name in _INFERENCE_ENV_VARS:
+        os.environ[name] = str(budget.inference_threads)
+    os.environ["TF_NUM_INTRAOP_THREADS"] = str(budget.inference_pool)
+    os.environ["TF_NUM_INTEROP_THREADS"] = str(budget.workers)
+
+    cv2.setNumThreads(budget.decode_threads)
+
+    # Only configure TensorFlow if it is in use, importing it costs seconds
+    if "tensorflow" in sys.modules:
+        _configure_tensorflow(budget)
+
+    logger.info(
+        f"Thread budget: {budget.total_cores} cores = {budget.workers} workers x "
+        f"{budget.inference_threads} inference threads + {budget.decode_threads} decode threads"
+    )
+
+
+def _configure_tensorflow(budget: ThreadBudget) -> None:
+    import tensorflow as tf
+
+    threading_config = tf.config.threading
+    if (
+        threading_config.get_intra_op_parallelism_threads() == budget.inference_pool
+        and threading_config.get_inter_op_parallelism_threads() == budget.workers
+    ):
+        return
+
+    try:
+        threading_config.set_intra_op_parallelism_threads(budget.inference_pool)
+        threading_config.set_inter_op_parallelism_threads(budget.workers)
+    except RuntimeError:
+        logger.warning("TensorFlow is already initialized, its thread pools keep their current size.")
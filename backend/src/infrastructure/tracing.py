@@ -0,0 +1,133 @@
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager, nullcontext
+from typing import Any, Deque, Dict, Optional, Tuple
+
+from backend.src.infrastructure.logger import setup_logger
+
+logger = setup_logger("core.tracing.py")
+
+# (name, start ns, duration ns, thread id, args)
+Span = Tuple[str, int, int, int, Optional[Dict[str, Any]]]
+
+_NO_SPAN = nullcontext()
+
+
+class _ActiveSpan:
+    __slots__ = ("tracer", "name", "args", "start")
+
+    def __init__(self, tracer: "Tracer", name: str, args: Optional[Dict[str, Any]]):
+        self.tracer = tracer
+        self.name = name
+        self.args = args
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.tracer._record(self.name, self.start, time.perf_counter_ns() - self.start, self.args)
+        return False
+
+
+class Tracer:
+    """Records pipeline spans into a ring buffer and exports them as Chrome trace JSON.
+
+    Disabled by default; `span` then returns a shared no-op context manager, so
+    the instrumented code costs a method call per span. When enabled, a span is
+    one tuple appended to a bounded deque (thread safe without a lock); the
+    oldest spans are dropped once `capacity` is reached. The exported file opens
+    in chrome://tracing or https://ui.perfetto.dev with one track per thread.
+
+    Spans inherit the video and frame set with `frame` on their thread, so a
+    detector span can be matched to its frame without passing ids through the
+    detector interface.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self._spans: Deque[Span] = deque(maxlen=1)
+        self._threads: Dict[int, str] = {}
+        self._context = threading.local()
+        self._recorded = 0  # approximate under threads, only used for the overflow warning
+
+    def start(self, capacity: int = 200_000):
+        """Enables tracing with a ring buffer of `capacity` spans."""
+        self._spans = deque(maxlen=max(1, capacity))
+        self._threads = {}
+        self._recorded = 0
+        self.enabled = True
+
+    def stop(self):
+        self.enabled = False
+
+    def span(self, name: str, **args):
+        """Context manager timing a pipeline stage, e.g. `with tracer.span("decode", frame=12):`."""
+        if not self.enabled:
+            return _NO_SPAN
+        context = getattr(self._context, "args", None)
+        if context:
+            args = {**context, **args}
+        return _ActiveSpan(self, name, args or None)
+
+    @contextmanager
+    def frame(self, video: str, frame_idx: int):
+        """Tags the spans of this thread with a video and frame index."""
+        if not self.enabled:
+            yield
+            return
+        previous = getattr(self._context, "args", None)
+        self._context.args = {"video": video, "frame": frame_idx}
+        try:
+            yield
+        finally:
+            self._context.args = previous
+
+    def export(self, path: str) -> int:
+        """Writes the buffered spans as Chrome trace JSON and returns their number."""
+        spans = list(self._spans)
+        pid = os.getpid()
+        events = [
+            {"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": name}}
+            for tid, name in list(self._threads.items())
+        ]
+        for name, start, duration, tid, args in spans:
+            event = {
+                "name": name,
+                "cat": name.split(".", 1)[0],
+                "ph": "X",
+                "ts": start / 1000,
+                "dur": duration / 1000,
+                "pid": pid,
+                "tid": tid,
+            }
+            if args:
+                event["args"] = args
+            events.append(event)
+
+        if self._recorded > len(spans):
+            logger.warning(f"Trace ring buffer kept the last {len(spans)} of {self._recorded} spans")
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, mode="w", encoding="utf-8") as trace_file:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, trace_file)
+        os.replace(tmp_path, path)
+        logger.info(f"Wrote {len(spans)} trace spans to {path}")
+        return len(spans)
+
+    def _record(self, name: str, start: int, duration: int, args: Optional[Dict[str, Any]]):
+        tid = threading.get_ident()
+        if tid not in self._threads:
+            self._threads[tid] = threading.current_thread().name
+        self._spans.append((name, start, duration, tid, args))
+        self._recorded += 1
+
+
+# Process wide tracer, enabled by the --trace option
+tracer = Tracer()
@@ -0,0 +1,173 @@
+import json
+import os
+import shutil
+import subprocess
+import threading
+from dataclasses import asdict
+from typing import Any, Dict, List, Optional
+
+import cv2
+
+from backend.src.domain.models import VideoMetadata
+from backend.src.infrastructure.logger import setup_logger
+
+logger = setup_logger("core.video_metadata.py")
+
+PROBE_TIMEOUT = 120.0  # seconds for one ffprobe call
+
+
+def probe_ffprobe(video_path: str, ffprobe: str = "ffprobe", timeout: float = PROBE_TIMEOUT) -> Optional[VideoMetadata]:
+    """Reads the stream metadata and the keyframe positions with ffprobe.
+
+    No frame is decoded, but the keyframe scan demuxes every packet, so the
+    whole file is read once: its cost grows with the file size and is bounded
+    by the disk speed (seconds for a multi-gigabyte recording). The index runs
+    it once per video and caches the result.
+
+    Args:
+        video_path: The video file.
+        ffprobe: The ffprobe executable.
+        timeout: Seconds after which a hanging ffprobe call is killed.
+
+    Returns:
+        Optional[VideoMetadata]: The metadata or None if ffprobe fails or times out.
+    """
+    try:
+        stream_info = json.loads(subprocess.run(
+            [ffprobe, "-v", "error", "-select_streams", "v:0",
+             "-show_entries", "stream=codec_name,width,height,avg_frame_rate:format=duration",
+             "-of", "json", video_path],
+            capture_output=True, check=True, text=True, timeout=timeout,
+        ).stdout)
+        packets = subprocess.run(
+            [ffprobe, "-v", "error", "-select_streams", "v:0",
+             "-show_entries", "packet=pts_time,flags", "-of", "csv=print_section=0", video_path],
+            capture_output=True, check=True, text=True, timeout=timeout,
+        ).stdout.splitlines()
+    except (OSError, subprocess.SubprocessError, ValueError) as e:
+        logger.warning(f"ffprobe failed for {video_path}: {e}")
+        return None
+
+    streams = stream_info.get("streams") or [{}]
+    stream = streams[0]
+    numerator, _, denominator = stream.get("avg_frame_rate", "0/1").partition("/")
+    denominator = float(denominator or 1)
+    fps = float(numerator) / denominator if denominator else 0.0
+
+    # Packets are in decoding order, frame indices follow the presentation order
+    pts_times: List[float] = []
+    keyframe_times: List[float] = []
+    for line in packets:
+        pts_time, _, flags = line.partition(",")
+        if not pts_time or pts_time == "N/A":
+            continue
+        pts_times.append(float(pts_time))
+        if "K" in flags:
+            keyframe_times.append(float(pts_time))
+    pts_times.sort()
+    first_pts = pts_times[0] if pts_times else 0.0
+    keyframes = sorted({round((t - first_pts) * fps) for t in keyframe_times}) if fps else []
+
+    duration = float(stream_info.get("format", {}).get("duration") or 0.0)
+    return VideoMetadata(
+        file_name=os.path.basename(video_path),
+        frame_count=len(pts_times),
+        fps=fps,
+        duration=duration or (len(pts_times) / fps if fps else 0.0),
+        width=int(stream.get("width", 0)),
+        height=int(stream.get("height", 0)),
+        codec=stream.get("codec_name", ""),
+        keyframes=keyframes,
+    )
+
+
+def probe_opencv(video_path: str) -> Optional[VideoMetadata]:
+    """Reads the container header with OpenCV; keyframe positions stay unknown.
+
+    Returns:
+        Optional[VideoMetadata]: The metadata or None if the video cannot be opened.
+    """
+    cap = cv2.VideoCapture(video_path)
+    try:
+        if not cap.isOpened():
+            return None
+        fps = cap.get(cv2.CAP_PROP_FPS)
+        frame_count = max(0, int(cap.get(cv2.CAP_PROP_FRAME_COUNT)))
+        fourcc = int(cap.get(cv2.CAP_PROP_FOURCC))
+        return VideoMetadata(
+            file_name=os.path.basename(video_path),
+            frame_count=frame_count,
+            fps=fps,
+            duration=frame_count / fps if fps > 0 else 0.0,
+            width=int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+            height=int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+            codec="".join(chr((fourcc >> (8 * i)) & 0xFF) for i in range(4)).strip("\x00 "),
+        )
+    finally:
+        cap.release()
+
+
+class VideoMetadataIndex:
+    """Sidecar index caching the metadata and keyframe positions of every video.
+
+    Entries are keyed by absolute path and carry the size and modification time
+    of the file, so a replaced video is probed again. ffprobe is used when it is
+    installed (exact frame count and keyframes), OpenCV otherwise or when
+    ffprobe fails or times out. The first get() of a new video reads the whole
+    file with ffprobe, see probe_ffprobe.
+
+    Attributes:
+        index_path (str): JSON file holding the index.
+    """
+
+    def __init__(self, index_path: str, use_ffprobe: bool = True, probe_timeout: float = PROBE_TIMEOUT):
+        self.index_path = index_path
+        self.ffprobe = shutil.which("ffprobe") if use_ffprobe else None
+        self.probe_timeout = probe_timeout
+        self._entries: Dict[str, Dict[str, Any]] = self._load()
+        self._lock = threading.Lock()
+
+    def get(self, video_path: str) -> Optional[VideoMetadata]:
+        """Returns the cached metadata of a video, probing it on first use."""
+        key = os.path.abspath(video_path)
+        try:
+            stat = os.stat(key)
+        except OSError:
+            return None
+        signature = [stat.st_size, stat.st_mtime]
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry.get("signature") == signature:
+                return VideoMetadata(**entry["metadata"])
+
+        metadata = (probe_ffprobe(key, self.ffprobe, self.probe_timeout) if self.ffprobe else None) or probe_opencv(key)
+        if metadata is None:
+            return None
+
+        with self._lock:
+            self._entries[key] = {"signature": signature, "metadata": asdict(metadata)}
+            self._save()
+        return metadata
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        if not os.path.exists(self.index_path):
+            return {}
+        try:
+            with open(self.index_path, mode="r", encoding="utf-8") as index_file:
+                return json.load(index_file)
+        except Exception as e:
+            logger.error(f"Error reading video metadata index, starting empty: {e}")
+            return {}
+
+    def _save(self):
+        try:
+            directory = os.path.dirname(self.index_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            tmp_path = self.index_path + ".tmp"
+            with open(tmp_path, mode="w", encoding="utf-8") as index_file:
+                json.dump(self._entries, index_file)
+            os.replace(tmp_path, self.index_path)
+        except Exception as e:
+            logger.error(f"Error saving video metadata index: {e}")
@@ -1,23 +1,144 @@
 import argparse
+import datetime
+import os
+from typing import List, Optional
 
 from backend.src.application.analyzer import EmotionAnalyzer
+from backend.src.application.daemon import WatchFolderDaemon
+from backend.src.application.dimensions import DIMENSIONS, DimensionService
+from backend.src.application.rescore import CropRescorer
 from backend.src.application.stats import StatisticsService
+from backend.src.application.thread_budget import (
+    ThreadBudgetCalibrator, candidate_budgets, collect_sample_frames, plan_thread_budget
+)
 from backend.src.infrastructure.logger import setup_logger
-from backend.src.domain.models import InputData
+from backend.src.domain.interfaces import IEmotionDetector
+from backend.src.domain.models import AdaptiveSampling, InputData, RealTimeTarget, SummarySampling, ThreadBudget
+from backend.src.infrastructure.compressed_storage import CompressedCSVStorage
+from backend.src.infrastructure.crop_store import NpzFaceCropStore
 from backend.src.infrastructure.detectors import DeepFaceEmotionDetector
+from backend.src.infrastructure.face_locator import HaarFaceCropper, HaarFaceLocator
+from backend.src.infrastructure.file_utils import FileUtils
+from backend.src.infrastructure.ffmpeg_adapter import FFmpegVideoFactory
+from backend.src.infrastructure.frame_cache import CachedEmotionDetector
+from backend.src.infrastructure.memory_budget import MB, MemoryBudget
+from backend.src.infrastructure.inference_server import InferenceServer, RemoteEmotionDetector
+from backend.src.infrastructure.onnx_detector import OnnxEmotionDetector, export_deepface_model
+from backend.src.infrastructure.prefilter import FacePrefilterDetector
+from backend.src.infrastructure.sharded_storage import ShardedCSVStorage
+from backend.src.infrastructure.staged_storage import StagedStorage
 from backend.src.infrastructure.storage import CSVStorage
-from backend.src.infrastructure.opencv_adapter import OpenCVVideoFactory
+from backend.src.infrastructure.opencv_adapter import OpenCVImageReader, OpenCVVideoFactory
+from backend.src.infrastructure.thread_config import apply_thread_budget
+from backend.src.infrastructure.tracing import tracer
+from backend.src.infrastructure.video_metadata import VideoMetadataIndex
 
 # TODO: Change the hard-coded name to dynamic if possible
 logger = setup_logger("cli.py")
 
 def parse_arguments():
     parser = argparse.ArgumentParser(description="Emotion Recognition Tool for Talk Show Analysis")
-    parser.add_argument('-i', '--image', type=str, help="Path to a single image file")
+    parser.add_argument('-i', '--image', type=str, help="Path to a single image file or folder")
     parser.add_argument('-v', '--video', type=str, help="Path to a video file or folder")
     parser.add_argument('-o', '--output', type=str, default='./data/output', help="Path to save analysis results")
     parser.add_argument('--interval', type=int, default=1, help="Frame extraction interval (process every Nth frame)")
     parser.add_argument('--no-report', action='store_true', help="Skip generation of summary report")
+    parser.add_argument('--adaptive', action='store_true',
+                        help="Refine sampling around emotion changes (--interval becomes the coarse step)")
+    parser.add_argument('--change-threshold', type=float, default=20.0,
+                        help="Score change in percentage points that triggers refinement (adaptive mode)")
+    parser.add_argument('--max-refinements', type=int, default=None,
+                        help="Per-video budget of extra inferences refining emotion changes; "
+                             "coarse samples are not counted (adaptive mode)")
+    parser.add_argument('--timeline', choices=['frames', 'segments', 'both'], default='frames',
+                        help="Write per-frame rows, run-length encoded emotion segments, or both")
+    parser.add_argument('--frame-cache', type=str, default=None,
+                        help="Path of a persistent perceptual-hash cache of detection results")
+    parser.add_argument('--cache-size', type=int, default=100000, help="Max entries of the frame cache (LRU)")
+    parser.add_argument('--clear-cache', action='store_true', help="Invalidate the frame cache before the run")
+    parser.add_argument('--cache-verify', type=int, default=0, metavar='N',
+                        help="Analyze every N-th frame cache hit anyway and report the hit accuracy (0 = never)")
+    parser.add_argument('--watch', type=str, default=None,
+                        help="Daemon mode: keep the model loaded and analyze videos as they land in this folder")
+    parser.add_argument('--poll-interval', type=float, default=5.0, help="Seconds between folder scans (daemon mode)")
+    parser.add_argument('--report-by', choices=DIMENSIONS,
+                        help="Print the emotion distribution per guest, host or topic (works without input)")
+    parser.add_argument('--rebuild-index', action='store_true',
+                        help="Rebuild the guest/host/topic video index from the raw results first")
+    parser.add_argument('--batch-size', type=int, default=16, help="Images per detector call (image folder mode)")
+    parser.add_argument('--decode-threads', type=int, default=4, help="Image decoding threads (image folder mode)")
+    parser.add_argument('--decode-scale', type=int, choices=[1, 2, 4, 8], default=1,
+                        help="Decode JPEGs at 1/N resolution (image folder mode); faster, but small faces "
+                             "may be missed, so check the results before using it")
+    parser.add_argument('--backend', choices=['deepface', 'onnx', 'remote'], default='deepface',
+                        help="Emotion detector backend ('remote' uses a running --serve instance)")
+    parser.add_argument('--server', type=str, default='127.0.0.1:8765',
+                        help="Inference server address, 'host:port' or 'unix:/path.sock' (remote backend)")
+    parser.add_argument('--serve', type=str, default=None, metavar='ADDRESS',
+                        help="Service mode: host the loaded model for other tools "
+                             "at a loopback 'host:port' or 'unix:/path.sock'")
+    parser.add_argument('--max-batch', type=int, default=16, help="Max frames per coalesced batch (service mode)")
+    parser.add_argument('--max-latency-ms', type=float, default=10.0,
+                        help="Max time a request waits for its batch to fill (service mode)")
+    parser.add_argument('--onnx-model', type=str, default='./models/facial_expression_model_weights.onnx',
+                        help="Path to the ONNX emotion model (onnx backend)")
+    parser.add_argument('--export-onnx', action='store_true',
+                        help="Convert the DeepFace emotion model to --onnx-model and exit (needs tensorflow, tf2onnx)")
+    parser.add_argument('--int8', action='store_true', help="Use the int8-quantized ONNX model (onnx backend)")
+    parser.add_argument('--intra-op-threads', type=int, default=1,
+                        help="Threads used inside one model operator (onnx backend)")
+    parser.add_argument('--prefilter', action='store_true',
+                        help="Skip frames without a likely face before running the full emotion model")
+    parser.add_argument('--prefilter-width', type=int, default=320,
+                        help="Frame width used by the face-presence prefilter")
+    parser.add_argument('--cores', type=int, default=None,
+                        help="Total core budget split between decoding, inference and workers (0 = all cores); "
+                             "overrides --decode-threads and --intra-op-threads")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="Videos analyzed in parallel within the core budget (video folder mode)")
+    parser.add_argument('--thread-split', choices=['plan', 'auto'], default='plan',
+                        help="Split the core budget by a fixed rule or by a short calibration run on the input")
+    parser.add_argument('--target-rtf', type=float, default=None,
+                        help="Real-time factor to meet (processing time / video duration), tuning the sampling "
+                             "step and parallel videos; --interval becomes the densest step, --workers the maximum")
+    parser.add_argument('--deadline', type=str, default=None, metavar='HH:MM',
+                        help="Finish the run by this local time (next occurrence), tuned like --target-rtf")
+    parser.add_argument('--crop-store', type=str, default=None,
+                        help="Folder keeping the face crops of analyzed video frames for later re-scoring")
+    parser.add_argument('--crop-size', type=int, default=96, help="Side length of the stored face crops in pixels")
+    parser.add_argument('--rescore', action='store_true',
+                        help="Run only the emotion classifier over the --crop-store crops (no decoding); "
+                             "-o must be a folder without results of these videos")
+    layout = parser.add_mutually_exclusive_group()
+    layout.add_argument('--compress', choices=['none', 'gzip', 'zstd'], default='none',
+                        help="Write per-frame results to a compressed, rotating log instead of analysis_results.csv")
+    layout.add_argument('--sharded', action='store_true',
+                        help="Write per-frame results to one shard per worker instead of analysis_results.csv")
+    parser.add_argument('--segment-size', type=int, default=64,
+                        help="Size in MB after which the compressed results log starts a new segment")
+    parser.add_argument('--decoder', choices=['opencv', 'ffmpeg'], default='opencv',
+                        help="Video decoder; ffmpeg selects and scales frames in the decoder (falls back to opencv)")
+    parser.add_argument('--decode-width', type=int, default=None,
+                        help="ffmpeg decoder: downscale wider videos to this width before analysis")
+    parser.add_argument('--cross-batch', type=int, default=1, metavar='K',
+                        help="Video folders: fill --batch-size detector batches with frames of K videos at once "
+                             "(ONNX backend; not with --summary-only, --adaptive, --workers, --crop-store, "
+                             "--max-memory, --target-rtf, --deadline or --watch)")
+    parser.add_argument('--report-workers', type=int, default=None,
+                        help="Processes aggregating sharded results for the report (default: CPU count)")
+    parser.add_argument('--summary-only', action='store_true',
+                        help="Estimate each video's emotion distribution from randomly sampled frames (needs seeking)")
+    parser.add_argument('--tolerance', type=float, default=2.0,
+                        help="Summary-only: stop once every emotion share is known within +/- this many points")
+    parser.add_argument('--confidence', type=float, default=0.95, help="Summary-only: confidence level of the bounds")
+    parser.add_argument('--seed', type=int, default=None, help="Summary-only: random seed of the sampling order")
+    parser.add_argument('--max-memory', type=int, default=None, metavar='MB',
+                        help="Bound the frames and results held in memory; batches and buffers shrink near the limit "
+                             "(parallel --workers still hold one frame each, see MemoryBudget)")
+    parser.add_argument('--trace', type=str, default=None, metavar='PATH',
+                        help="Record per-frame decode/preprocess/detect/storage spans to a Chrome/Perfetto trace JSON")
+    parser.add_argument('--trace-buffer', type=int, default=200000,
+                        help="Spans kept by the trace ring buffer (the oldest are dropped)")
     return parser.parse_args()
 
 def confirm_file_naming_convention():
@@ -44,47 +165,331 @@ def confirm_file_naming_convention():
         exit(1)
         
 
+def parse_deadline(value: str, now: datetime.datetime = None) -> float:
+    """
+    Converts a 'HH:MM' wall-clock time into the unix time of its next occurrence.
+    """
+    now = now or datetime.datetime.now()
+    hour, minute = (int(part) for part in value.split(":"))
+    deadline = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+    if deadline <= now:
+        deadline += datetime.timedelta(days=1)
+    return deadline.timestamp()
+
+
+def print_dimension_report(service: DimensionService, dimension: str, rebuild_index: bool = False):
+    """
+    Prints the emotion distribution per guest, host or topic as a table.
+    """
+    if rebuild_index:
+        service.rebuild_index()
+
+    stats_list = service.distribution_by(dimension)
+    if not stats_list:
+        logger.warning("The video index is empty, analyze videos or use --rebuild-index first.")
+        return
+
+    emotions = ['happy', 'sad', 'angry', 'neutral', 'fear', 'surprise', 'disgust']
+    print(f"{dimension.capitalize():<25}{'Videos':>7}{'Frames':>8}  {'Most frequent':<14}"
+          + "".join(f"{e[:8]:>9}" for e in emotions))
+    for stats in stats_list:
+        print(f"{stats.value[:24]:<25}{stats.videos:>7}{stats.total_frames:>8}  {stats.most_frequent_emotion:<14}"
+              + "".join(f"{stats.emotion_distribution.get(e, 0):>8.1f}%" for e in emotions))
+
+
+def run_server(args, detector):
+    """
+    Hosts the detector as a local inference service until SIGTERM/SIGINT.
+    """
+    server = InferenceServer(
+        detector, args.serve, max_batch_size=args.max_batch, max_latency_ms=args.max_latency_ms
+    )
+    try:
+        server.serve_forever()
+    finally:
+        server.shutdown()
+        detector.close()
+
+
+def run_daemon(args, input_data, detector, storage, video_factory, image_reader, cropper=None, crop_store=None,
+               memory_budget=None):
+    """
+    Runs the watch-folder daemon until SIGTERM/SIGINT, then flushes everything.
+    The results of each video are staged and stored once the video is complete.
+    """
+    staging = StagedStorage(storage, spill_dir=args.output)
+    analyzer = EmotionAnalyzer(
+        input_data, detector=detector, storage=staging, video_factory=video_factory, image_reader=image_reader,
+        cropper=cropper, crop_store=crop_store, memory_budget=memory_budget,
+    )
+    daemon = WatchFolderDaemon(
+        analyzer,
+        directory=args.watch,
+        ledger_path=os.path.join(args.output, "processed_videos.json"),
+        list_videos=FileUtils.get_video_files,
+        staging=staging,
+        poll_interval=args.poll_interval,
+    )
+    try:
+        daemon.run()
+    finally:
+        detector_stats = detector.get_stats()
+        if detector_stats:
+            logger.info(f"Detector stats: {detector_stats}")
+        detector.close()
+
+
+def create_storage(args, memory_budget=None):
+    """
+    Creates the plain CSV storage, the sharded results or the compressed results log.
+    """
+    if args.sharded:
+        return ShardedCSVStorage(output_path=args.output)
+    if args.compress == 'none':
+        return CSVStorage(output_path=args.output)
+    return CompressedCSVStorage(
+        output_path=args.output, codec=args.compress, max_segment_bytes=args.segment_size * MB,
+        memory_budget=memory_budget,
+    )
+
+
+def create_video_factory(args, input_data):
+    """
+    Creates the OpenCV or the ffmpeg video factory. With ffmpeg, the fixed
+    sampling interval moves into the decoder.
+    """
+    metadata_index = VideoMetadataIndex(os.path.join(args.output, "video_metadata.json"))
+    if args.decoder == 'opencv':
+        return OpenCVVideoFactory(metadata_index=metadata_index)
+
+    # Adaptive and real-time sampling change or revisit the step, they need every frame
+    dynamic = input_data.adaptive or input_data.realtime or input_data.summary
+    decoder_step = 1 if dynamic else int(input_data.interval)
+    video_factory = FFmpegVideoFactory(
+        metadata_index,
+        frame_step=decoder_step,
+        max_width=args.decode_width,
+        # 0 would let ffmpeg use every core, a budget without decode threads decodes on one
+        threads=max(1, input_data.thread_budget.decode_threads) if input_data.thread_budget else 0,
+        # Adaptive sampling and cross-video batches keep frames across reads
+        reuse_buffers=not (input_data.adaptive or input_data.cross_batch > 1),
+    )
+    if video_factory.available and decoder_step > 1:
+        input_data.interval = 1  # the decoder delivers only the sampled frames
+    return video_factory
+
+
+class DetectorFactory:
+    """
+    Creates the detector of the selected backend for a thread budget.
+
+    ONNX sessions take their thread count at construction, so every budget gets
+    a new session. DeepFace (TensorFlow) and remote detectors cannot change their
+    pools, one instance is created and shared.
+    """
+
+    def __init__(self, args):
+        self.args = args
+        self.model_id = ""
+        self._shared = None
+
+    def __call__(self, budget: Optional[ThreadBudget] = None):
+        args = self.args
+        if args.backend == 'onnx':
+            intra_op_threads = budget.inference_pool if budget else args.intra_op_threads
+            detector = OnnxEmotionDetector(args.onnx_model, quantized=args.int8, intra_op_threads=intra_op_threads)
+            self.model_id = f"onnx:{os.path.basename(args.onnx_model)}:int8={args.int8}"
+        elif self._shared is not None:
+            return self._shared
+        elif args.backend == 'remote':
+            detector = RemoteEmotionDetector(args.server)
+            self.model_id = f"remote:{args.server}"
+        else:
+            detector = DeepFaceEmotionDetector()
+            self.model_id = detector.model_id
+
+        if args.prefilter:
+            detector = FacePrefilterDetector(detector, HaarFaceLocator(max_width=args.prefilter_width))
+        if args.backend != 'onnx':
+            self._shared = detector
+        return detector
+
+
+def cross_batch_conflicts(args) -> List[str]:
+    """Returns the flags that --cross-batch cannot honour: the batched path analyzes whole videos on its own."""
+    flags = {
+        '--summary-only': args.summary_only,
+        '--adaptive': args.adaptive,
+        '--workers': args.workers is not None,
+        '--crop-store': args.crop_store,
+        '--max-memory': args.max_memory,
+        '--target-rtf': args.target_rtf,
+        '--deadline': args.deadline,
+        '--watch': args.watch,
+    }
+    return [flag for flag, used in flags.items() if used]
+
+
+def runs_batched_inference(detector: IEmotionDetector) -> bool:
+    """Whether the detector (below its prefilter and cache wrappers) overrides the per-frame detect_batch."""
+    while hasattr(detector, 'detector'):
+        detector = detector.detector
+    return type(detector).detect_batch is not IEmotionDetector.detect_batch
+
+
 def main():
     args = parse_arguments()
+    if args.trace:
+        tracer.start(capacity=args.trace_buffer)
+    try:
+        run(args)
+    finally:
+        if args.trace:
+            tracer.stop()
+            tracer.export(args.trace)
+
+
+def run(args):
+    # Report-only runs answer from the video index and need neither models nor confirmation
+    if args.report_by and not args.image and not args.video:
+        print_dimension_report(DimensionService(create_storage(args)), args.report_by, args.rebuild_index)
+        return
+
+    if args.export_onnx:
+        export_deepface_model(args.onnx_model)
+        return
 
     # TODO: Ask for the user confirmation if the file are properly set
     # Also give an example how the video files should be named. E.g., showname_sXXeYY.mp4
 
     logger.info("Initializing Application...")
 
-    confirm_file_naming_convention()
+    if args.rescore and not args.crop_store:
+        logger.error("--rescore needs the --crop-store folder of an earlier run.")
+        return
 
-    # 1. Dependency Injection: Create Implementation instances (detector, storage, video factory)
-    detector = DeepFaceEmotionDetector()
-    storage = CSVStorage(output_path=args.output)
-    video_factory = OpenCVVideoFactory()
-    # Initialize Stats Service
-    stats_service = StatisticsService(storage)
+    if args.cross_batch > 1 and cross_batch_conflicts(args):
+        logger.error(f"--cross-batch cannot be combined with {', '.join(cross_batch_conflicts(args))}.")
+        return
+
+    # The daemon and the service run unattended, so they cannot ask for confirmation
+    if not args.watch and not args.serve and not args.rescore:
+        confirm_file_naming_convention()
 
-    # 2. Wrap arguments in InputData dataclass
+    # 1. Wrap arguments in InputData dataclass
     input_data = InputData(
         image_path=args.image,
         video_path=args.video,
         output_path=args.output,
         interval=args.interval,
+        adaptive=AdaptiveSampling(
+            change_threshold=args.change_threshold,
+            max_refinements=args.max_refinements,
+        ) if args.adaptive else None,
+        batch_size=args.batch_size,
+        decode_threads=args.decode_threads,
+        timeline=args.timeline,
+        cross_batch=args.cross_batch,
+        summary=SummarySampling(
+            tolerance=args.tolerance,
+            confidence=args.confidence,
+            seed=args.seed,
+        ) if args.summary_only else None,
     )
 
+    # 2. The thread budget is applied before the inference runtime creates its pools
+    use_budget = args.cores is not None or args.workers is not None or args.thread_split == 'auto'
+    if use_budget:
+        input_data.thread_budget = plan_thread_budget(args.cores, args.workers)
+        apply_thread_budget(input_data.thread_budget)
+
+    if args.target_rtf or args.deadline:
+        input_data.realtime = RealTimeTarget(
+            factor=args.target_rtf,
+            deadline=parse_deadline(args.deadline) if args.deadline else None,
+            max_workers=args.workers or plan_thread_budget(args.cores).inference_threads,
+        )
+
+    # 3. Dependency Injection: Create Implementation instances (detector, storage, video factory)
+    memory_budget = MemoryBudget(args.max_memory * MB) if args.max_memory else None
+    storage = create_storage(args, memory_budget)
+    video_factory = create_video_factory(args, input_data)
+    image_reader = OpenCVImageReader(reduce_factor=args.decode_scale)
+    create_detector = DetectorFactory(args)
+
+    # Every candidate is applied before its detector is created, so the runtime pools follow it.
+    # The calibration runs before the frame cache, whose hits would distort the measurement.
+    if args.thread_split == 'auto' and args.workers is None:
+        frames = collect_sample_frames(
+            input_data, video_factory, FileUtils.get_image_files, FileUtils.get_video_files, image_reader
+        )
+        calibrator = ThreadBudgetCalibrator(create_detector, frames, apply_budget=apply_thread_budget)
+        input_data.thread_budget = calibrator.calibrate(candidate_budgets(input_data.thread_budget.total_cores))
+        apply_thread_budget(input_data.thread_budget)
+
+    detector = create_detector(input_data.thread_budget)
+    model_id = create_detector.model_id
+    if input_data.cross_batch > 1 and not runs_batched_inference(detector):
+        logger.warning(
+            f"The {args.backend} backend analyzes batches frame by frame, --cross-batch will not speed it up."
+        )
+
+    if args.frame_cache:
+        # Cached results are only valid for the model and prefilter settings that produced them
+        model_id += f":prefilter={args.prefilter and args.prefilter_width}"
+        detector = CachedEmotionDetector(
+            detector, args.frame_cache, model_id=model_id, max_entries=args.cache_size,
+            verify_every=args.cache_verify,
+        )
+        if args.clear_cache:
+            detector.invalidate()
+    crop_store = NpzFaceCropStore(args.crop_store) if args.crop_store else None
+    cropper = HaarFaceCropper(size=args.crop_size) if crop_store else None
+    # Initialize Stats Service
+    stats_service = StatisticsService(storage, workers=args.report_workers)
+
+    if args.serve:
+        run_server(args, detector)
+        return
+
+    if args.watch:
+        run_daemon(args, input_data, detector, storage, video_factory, image_reader, cropper, crop_store, memory_budget)
+        return
+
+    if args.rescore:
+        CropRescorer(input_data, detector, storage, crop_store).run()
+        detector.close()
+        if not args.no_report:
+            stats_service.generate_report(from_segments=args.timeline == 'segments')
+        return
+
     if not input_data.image_path and not input_data.video_path:
-        logger.error("You must provide either --image or --video input.")
+        logger.error("You must provide either --image, --video or --watch input.")
         return
    
-    # 3. Start excution of the pipelines 
+    # 4. Start excution of the pipelines 
     #                      +------------------------------+
     #  Video/Image --->    | Pipeline-1: Emotion Analysis | ---> Analysis Results
     #                      +------------------------------+
-    analyzer = EmotionAnalyzer(input_data, detector=detector, storage=storage, video_factory=video_factory)
+    analyzer = EmotionAnalyzer(
+        input_data, detector=detector, storage=storage, video_factory=video_factory, image_reader=image_reader,
+        cropper=cropper, crop_store=crop_store, memory_budget=memory_budget,
+    )
     analyzer.run()
+    detector.close()
 
     #                       +-------------------------------+
     #  Analysis Result ---> | Pipeline-2: Report Generation | --->  Statistical Report
     #                       +-------------------------------+
-    if not args.no_report and args.video:
-        stats_service.generate_report() 
+    # Summary-only runs saved their sampled summaries (with error bounds) already
+    if not args.no_report and args.video and not args.summary_only:
+        stats_service.generate_report(from_segments=args.timeline == 'segments')
+
+    #                       +--------------------------------+
+    #  Video Index   --->   | Pipeline-3: Guest/Host Reports | --->  Per-Dimension Distribution
+    #                       +--------------------------------+
+    if args.report_by:
+        print_dimension_report(DimensionService(storage), args.report_by, args.rebuild_index)
 
 
 if __name__ == "__main__":
@@ -2,7 +2,7 @@ from typing import Optional, Dict, Any, List
 import pytest
 import numpy as np
 from backend.src.domain.interfaces import IVideoSource, IStorage, IEmotionDetector
-from backend.src.domain.models import OutputData, VideoStats
+from backend.src.domain.models import EmotionSegment, OutputData, VideoAggregate, VideoStats
 
 
 # -------------------------------------------
@@ -11,10 +11,12 @@ from backend.src.domain.models import OutputData, VideoStats
 class MockVideoSource(IVideoSource):
     """Simulates a video stream without using OpenCV."""
 
-    def __init__(self, num_frames=30, fps=30.0):
+    def __init__(self, num_frames=30, fps=30.0, seekable=False):
         self.num_frames = num_frames
         self._fps = fps
+        self.seekable = seekable
         self.current_idx = 0
+        self.frames_decoded = 0
         self.is_opened = True
 
     def open(self) -> bool:
@@ -23,10 +25,20 @@ class MockVideoSource(IVideoSource):
     def get_fps(self) -> float:
         return self._fps
 
+    def get_frame_count(self) -> int:
+        return self.num_frames
+
+    def seek(self, frame_idx: int) -> bool:
+        if not self.seekable:
+            return False
+        self.current_idx = frame_idx
+        return True
+
     def read(self) -> Optional[np.ndarray]:
         if self.current_idx >= self.num_frames:
             return None
         self.current_idx += 1
+        self.frames_decoded += 1
         # Return a fake black 100x100 image
         return np.zeros((100, 100, 3), dtype=np.uint8)
 
@@ -40,6 +52,8 @@ class MockStorage(IStorage):
     def __init__(self):
         self.saved_data: List[OutputData] = []
         self.saved_stats: List[VideoStats] = []
+        self.saved_segments: List[EmotionSegment] = []
+        self.aggregates: Dict[str, VideoAggregate] = {}
 
     def save(self, data: OutputData) -> None:
         self.saved_data.append(data)
@@ -61,6 +75,19 @@ class MockStorage(IStorage):
     def save_stats(self, stats: List[VideoStats]) -> None:
         self.saved_stats.extend(stats)
 
+    def write_segments(self, segments: List[EmotionSegment]) -> None:
+        self.saved_segments.extend(segments)
+
+    def load_segments(self) -> List[EmotionSegment]:
+        return list(self.saved_segments)
+
+    def save_aggregates(self, aggregates: List[VideoAggregate]) -> None:
+        for aggregate in aggregates:
+            self.aggregates[aggregate.file_name] = aggregate
+
+    def load_aggregates(self) -> List[VideoAggregate]:
+        return list(self.aggregates.values())
+
 
 class MockEmotionDetector(IEmotionDetector):
     """Returns a deterministic emotion."""
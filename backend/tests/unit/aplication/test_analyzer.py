@@ -0,0 +1,202 @@
+import numpy as np
+
+from backend.src.application.analyzer import EmotionAnalyzer
+from backend.src.domain.interfaces import IImageReader, IVideoFactory
+from backend.src.domain.models import InputData, ThreadBudget
+from backend.src.infrastructure.memory_budget import MemoryBudget
+from backend.tests.conftest import MockEmotionDetector, MockStorage, MockVideoSource
+
+
+class MockImageReader(IImageReader):
+    """Returns a blank image for every path except the unreadable ones."""
+
+    def read(self, file_path):
+        if "broken" in file_path:
+            return None
+        return np.zeros((10, 10, 3), dtype=np.uint8)
+
+
+class BatchCountingDetector(MockEmotionDetector):
+    def __init__(self):
+        super().__init__()
+        self.batch_sizes = []
+
+    def detect_batch(self, frames):
+        self.batch_sizes.append(len(frames))
+        return super().detect_batch(frames)
+
+
+def _make_images(directory, names):
+    for name in names:
+        (directory / name).write_bytes(b"")
+
+
+def test_image_directory_is_analyzed_in_batches(tmp_path, mock_storage):
+    """Test that an image folder is decoded, batched and written in bulk."""
+    _make_images(tmp_path, [f"img{i:02d}.jpg" for i in range(10)] + ["notes.txt"])
+    detector = BatchCountingDetector()
+    input_data = InputData(image_path=str(tmp_path), batch_size=4, decode_threads=2)
+
+    analyzer = EmotionAnalyzer(input_data, detector, mock_storage, video_factory=None, image_reader=MockImageReader())
+    analyzer.run()
+
+    assert detector.batch_sizes == [4, 4, 2]
+    assert [d.file_name for d in mock_storage.saved_data] == [f"img{i:02d}.jpg" for i in range(10)]
+
+
+def test_image_directory_shrinks_batches_under_memory_pressure(tmp_path, mock_storage):
+    """Test that batches shrink near the memory budget and every image is still analyzed."""
+    _make_images(tmp_path, [f"img{i:02d}.jpg" for i in range(10)])
+    detector = BatchCountingDetector()
+    budget = MemoryBudget(max_bytes=1000)
+    budget.reserve(900)  # held elsewhere, e.g. by another worker
+    input_data = InputData(image_path=str(tmp_path), batch_size=4)
+
+    analyzer = EmotionAnalyzer(input_data, detector, mock_storage, video_factory=None,
+                               image_reader=MockImageReader(), memory_budget=budget)
+    analyzer.run()
+
+    assert max(detector.batch_sizes) <= 2
+    assert len(mock_storage.saved_data) == 10
+    assert budget.in_use == 900
+
+
+def test_image_directory_skips_unreadable_files(tmp_path, mock_storage):
+    """Test that images which cannot be decoded are skipped."""
+    _make_images(tmp_path, ["a.jpg", "broken.jpg", "c.png"])
+    input_data = InputData(image_path=str(tmp_path), batch_size=8)
+
+    analyzer = EmotionAnalyzer(
+        input_data, MockEmotionDetector(), mock_storage, video_factory=None, image_reader=MockImageReader()
+    )
+    analyzer.run()
+
+    assert [d.file_name for d in mock_storage.saved_data] == ["a.jpg", "c.png"]
+
+
+class SingleSourceFactory(IVideoFactory):
+    def __init__(self, source):
+        self.source = source
+
+    def create(self, file_path):
+        return self.source
+
+
+class StoppingStorage(MockStorage):
+    """Requests a stop from inside the pipeline after the first flush."""
+
+    def __init__(self):
+        super().__init__()
+        self.analyzer = None
+
+    def write_batch(self, rows):
+        super().write_batch(rows)
+        self.analyzer.request_stop()
+
+
+def test_stop_request_flushes_partial_video():
+    """Test that a stop request ends the video early but keeps buffered results."""
+    source = MockVideoSource(num_frames=100, fps=1.0)
+    storage = StoppingStorage()
+    analyzer = EmotionAnalyzer(InputData(video_path="show.mp4"), MockEmotionDetector(), storage,
+                               video_factory=SingleSourceFactory(source))
+    storage.analyzer = analyzer
+
+    assert analyzer.process_video("show.mp4") is False
+
+    # The stop is seen before the next frame is read, after the first batch of 10
+    assert len(storage.saved_data) == 10
+    assert not source.is_opened
+
+
+class StoppingFacelessDetector(MockEmotionDetector):
+    """Finds no face and requests a stop after a few frames."""
+
+    def __init__(self):
+        super().__init__()
+        self.analyzer = None
+        self.calls = 0
+
+    def detect(self, image):
+        self.calls += 1
+        if self.calls == 5:
+            self.analyzer.request_stop()
+        return None
+
+
+def test_stop_request_ends_a_stretch_without_faces():
+    """Test that the stop is checked per frame, not only when a result is found."""
+    source = MockVideoSource(num_frames=100, fps=1.0)
+    detector = StoppingFacelessDetector()
+    analyzer = EmotionAnalyzer(InputData(video_path="show.mp4"), detector, MockStorage(),
+                               video_factory=SingleSourceFactory(source))
+    detector.analyzer = analyzer
+
+    assert analyzer.process_video("show.mp4") is False
+    assert source.frames_decoded == 5
+
+
+def test_process_video_reports_failures():
+    """Test that a video that cannot be opened is not reported as analyzed."""
+    source = MockVideoSource(num_frames=10, fps=1.0)
+    source.is_opened = False
+    analyzer = EmotionAnalyzer(InputData(video_path="show.mp4"), MockEmotionDetector(), MockStorage(),
+                               video_factory=SingleSourceFactory(source))
+
+    assert analyzer.process_video("show.mp4") is False
+
+    completed = EmotionAnalyzer(InputData(video_path="show.mp4"), MockEmotionDetector(), MockStorage(),
+                                video_factory=SingleSourceFactory(MockVideoSource(num_frames=10, fps=1.0)))
+    assert completed.process_video("show.mp4") is True
+
+
+class PerPathFactory(IVideoFactory):
+    def create(self, file_path):
+        return MockVideoSource(num_frames=20, fps=1.0)
+
+
+def test_video_directory_with_parallel_workers(tmp_path, mock_storage):
+    """Test that a thread budget with several workers analyzes every video of a folder."""
+    names = [f"Guest{i}_Host_Topic.mp4" for i in range(5)]
+    _make_images(tmp_path, names)
+    input_data = InputData(
+        video_path=str(tmp_path),
+        thread_budget=ThreadBudget(total_cores=4, workers=3, decode_threads=1, inference_threads=1),
+    )
+
+    analyzer = EmotionAnalyzer(input_data, MockEmotionDetector(), mock_storage, video_factory=PerPathFactory())
+    analyzer.run()
+
+    assert sorted(mock_storage.aggregates) == sorted(names)
+    assert len(mock_storage.saved_data) == 5 * 20
+
+
+class FailingVideoSource(MockVideoSource):
+    """Fails with a decoder error after a few frames."""
+
+    def read(self):
+        if self.current_idx >= 5:
+            raise IOError("corrupt packet")
+        return super().read()
+
+
+class SingleSourceFactory(IVideoFactory):
+    def __init__(self, source):
+        self.source = source
+
+    def create(self, file_path):
+        return self.source
+
+
+def test_failed_video_releases_its_result_reservations(tmp_path, mock_storage):
+    """Test that results buffered before a failure do not stay reserved in the memory budget."""
+    budget = MemoryBudget(max_bytes=10 ** 6)
+    input_data = InputData(video_path=str(tmp_path / "broken.mp4"), interval=1, batch_size=100)
+
+    analyzer = EmotionAnalyzer(input_data, MockEmotionDetector(), mock_storage,
+                               video_factory=SingleSourceFactory(FailingVideoSource(num_frames=30)),
+                               memory_budget=budget)
+
+    assert analyzer._process_video(input_data.video_path) is False
+    assert budget.peak > 0
+    assert budget.in_use == 0
@@ -0,0 +1,123 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from backend.src.application.async_analyzer import AsyncEmotionAnalyzer
+from backend.src.domain.models import InputData
+from backend.src.infrastructure.async_adapters import AsyncStorageWriter, PacedFileVideoSource
+from backend.tests.conftest import MockEmotionDetector, MockVideoSource
+
+
+class ConcurrencyTrackingDetector(MockEmotionDetector):
+    def __init__(self, delay=0.01):
+        super().__init__("happy")
+        self.delay = delay
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+
+    def detect(self, image):
+        with self._lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        time.sleep(self.delay)
+        with self._lock:
+            self.active -= 1
+        return super().detect(image)
+
+
+def test_streams_run_concurrently_under_a_global_inference_limit(mock_storage):
+    """Test that paced streams share one loop and never exceed the inference limit."""
+    detector = ConcurrencyTrackingDetector()
+    analyzer = AsyncEmotionAnalyzer(
+        InputData(interval=2, batch_size=3, timeline="both"),
+        detector,
+        AsyncStorageWriter(mock_storage),
+        max_concurrent_inferences=1,
+    )
+    sources = {
+        f"cam{i}.mp4": PacedFileVideoSource(MockVideoSource(num_frames=10, fps=100.0))
+        for i in range(3)
+    }
+
+    start = time.monotonic()
+    counts = asyncio.run(analyzer.analyze_many(sources))
+    elapsed = time.monotonic() - start
+
+    assert counts == {"cam0.mp4": 5, "cam1.mp4": 5, "cam2.mp4": 5}
+    assert detector.max_active == 1
+    # Three 0.1 s streams played side by side, not one after the other
+    assert elapsed < 0.5
+    assert len(mock_storage.saved_data) == 15
+    assert sorted(r.seconds for r in mock_storage.saved_data if r.file_name == "cam0.mp4") == [0.0, 0.02, 0.04, 0.06, 0.08]
+    assert set(mock_storage.aggregates) == set(sources)
+    assert len(mock_storage.saved_segments) == 3
+
+
+def test_paced_source_delivers_frames_at_their_frame_rate():
+    """Test that a file-backed source waits for the live time of each frame."""
+    async def read_all():
+        source = PacedFileVideoSource(MockVideoSource(num_frames=5, fps=50.0))
+        await source.open()
+        start = time.monotonic()
+        frames = 0
+        while await source.read() is not None:
+            frames += 1
+        await source.release()
+        return frames, time.monotonic() - start
+
+    frames, elapsed = asyncio.run(read_all())
+
+    assert frames == 5
+    assert elapsed >= 4 / 50.0 - 0.005
+
+
+def test_cancelled_stream_keeps_its_results(mock_storage, mock_detector):
+    """Test that cancelling a live stream still writes what was analyzed."""
+    async def run():
+        analyzer = AsyncEmotionAnalyzer(InputData(interval=1, batch_size=100), mock_detector,
+                                        AsyncStorageWriter(mock_storage))
+        task = asyncio.create_task(
+            analyzer.analyze("live.mp4", PacedFileVideoSource(MockVideoSource(num_frames=1000, fps=100.0)))
+        )
+        await asyncio.sleep(0.1)
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+    asyncio.run(run())
+
+    assert 0 < len(mock_storage.saved_data) < 1000
+    assert "live.mp4" in mock_storage.aggregates
+
+
+def test_analyzer_serves_several_event_loops(mock_storage):
+    """Test that the inference limit is bound to the running loop, not to the loop of the constructor."""
+    detector = ConcurrencyTrackingDetector()
+    analyzer = AsyncEmotionAnalyzer(InputData(interval=1, batch_size=10), detector,
+                                    AsyncStorageWriter(mock_storage), max_concurrent_inferences=1)
+
+    for run in range(2):
+        sources = {
+            f"run{run}-cam{i}.mp4": PacedFileVideoSource(MockVideoSource(num_frames=5, fps=1000.0))
+            for i in range(2)
+        }
+        assert asyncio.run(analyzer.analyze_many(sources)) == {source_id: 5 for source_id in sources}
+    analyzer.close()
+
+    assert detector.max_active == 1
+    assert analyzer.executor._shutdown
+
+
+def test_close_leaves_a_given_executor_running(mock_storage, mock_detector):
+    """Test that only the executor created by the analyzer is shut down."""
+    executor = ThreadPoolExecutor(max_workers=1)
+    analyzer = AsyncEmotionAnalyzer(InputData(), mock_detector, AsyncStorageWriter(mock_storage), executor=executor)
+
+    analyzer.close()
+
+    assert executor.submit(lambda: 42).result() == 42
+    executor.shutdown()
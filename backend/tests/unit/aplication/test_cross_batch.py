@@ -0,0 +1,90 @@
+import os
+
+import numpy as np
+
+from backend.src.application.analyzer import EmotionAnalyzer
+from backend.src.application.cross_batch import CrossVideoBatcher
+from backend.src.domain.interfaces import IVideoFactory
+from backend.src.domain.models import InputData
+from backend.tests.conftest import MockEmotionDetector, MockVideoSource
+
+
+class TaggedVideoSource(MockVideoSource):
+    """Frames carry the number of their video."""
+
+    def __init__(self, tag, **kwargs):
+        super().__init__(**kwargs)
+        self.tag = tag
+
+    def read(self):
+        frame = super().read()
+        if frame is not None:
+            frame = np.full((4, 4, 3), self.tag, dtype=np.uint8)
+        return frame
+
+
+class ClipFactory(IVideoFactory):
+    """Clip number n has n + 1 seconds at 10 FPS."""
+
+    def __init__(self):
+        self.created = []
+
+    def create(self, video_path):
+        tag = int(os.path.basename(video_path).split(".")[0][-1])
+        source = TaggedVideoSource(tag, num_frames=10 * (tag + 1), fps=10.0)
+        self.created.append(source)
+        return source
+
+
+class BatchRecordingDetector(MockEmotionDetector):
+    """Records the videos in every batch; video 0 is sad, all others happy."""
+
+    def __init__(self):
+        super().__init__()
+        self.batches = []
+
+    def detect(self, image):
+        emotion = "sad" if image[0, 0, 0] == 0 else "happy"
+        return {"dominant_emotion": emotion, "emotion": {emotion: 100.0}}
+
+    def detect_batch(self, images):
+        self.batches.append([int(image[0, 0, 0]) for image in images])
+        return super().detect_batch(images)
+
+
+def test_batches_are_filled_with_frames_of_several_videos(mock_storage):
+    """Test that short clips share full batches and every result goes back to its own video."""
+    detector = BatchRecordingDetector()
+    factory = ClipFactory()
+    input_data = InputData(interval=5, batch_size=8, timeline="both")
+    videos = [f"clip{i}.mp4" for i in range(4)]
+
+    detected = CrossVideoBatcher(input_data, detector, mock_storage, factory, videos_in_flight=3).run(videos)
+
+    # 2 + 4 + 6 + 8 sampled frames
+    assert detected == 20
+    assert [len(batch) for batch in detector.batches] == [8, 8, 4]
+    assert len(set(detector.batches[0])) == 3
+
+    for i, source in enumerate(factory.created):
+        rows = [row for row in mock_storage.saved_data if row.file_name == f"clip{i}.mp4"]
+        assert [row.seconds for row in rows] == [0.5 * n for n in range(2 * (i + 1))]
+        assert {row.dominant_emotion for row in rows} == {"sad" if i == 0 else "happy"}
+        assert mock_storage.aggregates[f"clip{i}.mp4"].total_frames == len(rows)
+        assert not source.is_opened
+
+    assert sorted(s.file_name for s in mock_storage.saved_segments) == [f"clip{i}.mp4" for i in range(4)]
+
+
+def test_analyzer_batches_video_folders_across_videos(tmp_path, mock_storage):
+    """Test that --cross-batch runs a video folder through the cross-video batcher."""
+    for i in range(3):
+        (tmp_path / f"clip{i}.mp4").touch()
+    detector = BatchRecordingDetector()
+    input_data = InputData(video_path=str(tmp_path), interval=5, batch_size=4, cross_batch=3)
+
+    EmotionAnalyzer(input_data, detector, mock_storage, video_factory=ClipFactory()).run()
+
+    assert len(mock_storage.saved_data) == 12
+    assert len(set(detector.batches[0])) == 3
+    assert set(mock_storage.aggregates) == {"clip0.mp4", "clip1.mp4", "clip2.mp4"}
@@ -0,0 +1,142 @@
+import os
+
+from backend.src.application.daemon import WatchFolderDaemon
+from backend.src.infrastructure.file_utils import FileUtils
+
+
+class RecordingAnalyzer:
+    """Stands in for EmotionAnalyzer and records the processed videos."""
+
+    def __init__(self, fail=(), stop_on=()):
+        self.processed = []
+        self.stop_requested = False
+        self.fail = set(fail)
+        self.stop_on = set(stop_on)
+
+    def process_video(self, video_path):
+        name = os.path.basename(video_path)
+        self.processed.append(name)
+        if name in self.stop_on:
+            self.stop_requested = True
+            return False
+        return name not in self.fail
+
+    def request_stop(self):
+        self.stop_requested = True
+
+
+class RecordingStaging:
+    """Stands in for StagedStorage and records commits and discards."""
+
+    def __init__(self):
+        self.calls = []
+
+    def commit(self):
+        self.calls.append("commit")
+
+    def discard(self):
+        self.calls.append("discard")
+
+
+def _daemon(tmp_path, analyzer, stable_checks=1, staging=None):
+    watch = tmp_path / "watch"
+    watch.mkdir(exist_ok=True)
+    return watch, WatchFolderDaemon(
+        analyzer, str(watch), ledger_path=str(tmp_path / "ledger.json"), list_videos=FileUtils.get_video_files,
+        staging=staging, poll_interval=0, stable_checks=stable_checks,
+    )
+
+
+def test_video_is_processed_once_its_size_is_stable(tmp_path):
+    """Test that a file still being copied is not picked up."""
+    analyzer = RecordingAnalyzer()
+    watch, daemon = _daemon(tmp_path, analyzer)
+
+    video = watch / "Guest_Host.mp4"
+    video.write_bytes(b"x" * 10)
+    assert daemon.poll_once() == []  # first sighting
+
+    with open(video, "ab") as f:
+        f.write(b"x" * 10)  # still growing
+    assert daemon.poll_once() == []
+
+    assert daemon.poll_once() == [str(video)]
+    assert daemon.poll_once() == []
+    assert analyzer.processed == ["Guest_Host.mp4"]
+
+
+def test_ledger_prevents_reprocessing_after_restart(tmp_path):
+    """Test that processed videos are remembered across daemon restarts."""
+    watch, daemon = _daemon(tmp_path, RecordingAnalyzer())
+    (watch / "a.mp4").write_bytes(b"a")
+    (watch / "notes.txt").write_bytes(b"n")
+    daemon.poll_once()
+    daemon.poll_once()
+
+    analyzer = RecordingAnalyzer()
+    _, restarted = _daemon(tmp_path, analyzer)
+    restarted.poll_once()
+    restarted.poll_once()
+
+    assert analyzer.processed == []
+
+
+def test_stop_ends_run_loop_and_stops_analyzer(tmp_path):
+    """Test that stop() (as called by the SIGTERM handler) ends the daemon."""
+    analyzer = RecordingAnalyzer()
+    _, daemon = _daemon(tmp_path, analyzer)
+
+    daemon.stop()
+    daemon.run()
+
+    assert analyzer.stop_requested
+
+
+def test_completed_video_is_committed_before_it_is_recorded(tmp_path):
+    """Test that the staged results of a finished video are committed."""
+    staging = RecordingStaging()
+    watch, daemon = _daemon(tmp_path, RecordingAnalyzer(), staging=staging)
+    (watch / "a.mp4").write_bytes(b"a")
+    daemon.poll_once()
+
+    assert daemon.poll_once() == [str(watch / "a.mp4")]
+    assert staging.calls == ["commit"]
+    assert os.path.exists(tmp_path / "ledger.json")
+
+
+def test_failed_video_is_discarded_and_retried_once_it_changes(tmp_path):
+    """Test that a failed video is neither recorded nor retried on every poll."""
+    staging = RecordingStaging()
+    analyzer = RecordingAnalyzer(fail={"a.mp4"})
+    watch, daemon = _daemon(tmp_path, analyzer, staging=staging)
+    video = watch / "a.mp4"
+    video.write_bytes(b"a")
+    daemon.poll_once()
+
+    assert daemon.poll_once() == []
+    assert daemon.poll_once() == []
+    assert analyzer.processed == ["a.mp4"]
+    assert staging.calls == ["discard"]
+
+    analyzer.fail.clear()
+    video.write_bytes(b"ab")  # replaced by a complete copy
+    daemon.poll_once()
+    assert daemon.poll_once() == [str(video)]
+    assert staging.calls == ["discard", "commit"]
+
+
+def test_interrupted_video_is_discarded_and_processed_after_restart(tmp_path):
+    """Test that a stop during a video leaves neither rows nor a ledger entry."""
+    staging = RecordingStaging()
+    watch, daemon = _daemon(tmp_path, RecordingAnalyzer(stop_on={"a.mp4"}), staging=staging)
+    (watch / "a.mp4").write_bytes(b"a")
+    daemon.poll_once()
+
+    assert daemon.poll_once() == []
+    assert staging.calls == ["discard"]
+
+    analyzer = RecordingAnalyzer()
+    _, restarted = _daemon(tmp_path, analyzer)
+    restarted.poll_once()
+    assert restarted.poll_once() == [str(watch / "a.mp4")]
+    assert analyzer.processed == ["a.mp4"]
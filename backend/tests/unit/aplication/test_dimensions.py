@@ -0,0 +1,46 @@
+import pytest
+
+from backend.src.application.dimensions import DimensionService, parse_file_name
+from backend.src.domain.models import OutputData
+
+
+def test_parse_file_name_follows_naming_convention():
+    """Test the Guest_Host_Topic.mp4 convention, including missing parts."""
+    assert parse_file_name("/in/MarkRutte/MarkRutte_MariekeElsinga_MSC.mkv") == ("MarkRutte", "MariekeElsinga", "MSC")
+    assert parse_file_name("MarkRutte_MatthijsNieuwkerk.mp4") == ("MarkRutte", "MatthijsNieuwkerk", "")
+    assert parse_file_name("Guest_Host_Long_Topic.mp4") == ("Guest", "Host", "Long_Topic")
+
+
+def test_distribution_by_guest_uses_video_aggregates(mock_storage):
+    """Test that per-guest distributions are combined from per-video aggregates."""
+    service = DimensionService(mock_storage)
+    mock_storage.save_aggregates([
+        service.build_aggregate("Rutte_Elsinga_MSC.mp4", {"happy": 3, "sad": 1}),
+        service.build_aggregate("Rutte_Nieuwkerk.mp4", {"happy": 1, "sad": 3}),
+        service.build_aggregate("Jansen_Elsinga.mp4", {"angry": 2}),
+    ])
+
+    stats = {s.value: s for s in service.distribution_by("guest")}
+
+    assert stats["Rutte"].videos == 2
+    assert stats["Rutte"].total_frames == 8
+    assert stats["Rutte"].emotion_distribution == {"happy": 50.0, "sad": 50.0}
+    assert stats["Jansen"].most_frequent_emotion == "angry"
+    assert [s.value for s in service.distribution_by("host")] == ["Elsinga", "Nieuwkerk"]
+
+
+def test_rebuild_index_from_raw_results(mock_storage):
+    """Test that the index can be backfilled from existing raw rows."""
+    mock_storage.write_batch([
+        OutputData("Rutte_Elsinga.mp4", "happy", {}),
+        OutputData("Rutte_Elsinga.mp4", "sad", {}),
+    ])
+    service = DimensionService(mock_storage)
+
+    assert service.rebuild_index() == 1
+    assert mock_storage.load_aggregates()[0].emotion_counts == {"happy": 1, "sad": 1}
+
+
+def test_unknown_dimension_is_rejected(mock_storage):
+    with pytest.raises(ValueError):
+        DimensionService(mock_storage).distribution_by("channel")
@@ -0,0 +1,110 @@
+import time
+
+import pytest
+
+from backend.src.application.analyzer import EmotionAnalyzer
+from backend.src.application.realtime import RealTimeController
+from backend.src.domain.interfaces import IVideoFactory
+from backend.src.domain.models import InputData, RealTimeTarget
+from backend.tests.conftest import MockEmotionDetector, MockVideoSource
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def _run_window(controller, clock, media_seconds, wall_seconds, samples=10):
+    """Records one measurement window with the given throughput."""
+    for _ in range(samples):
+        clock.now += wall_seconds / samples
+        controller.record(media_seconds / samples)
+
+
+def test_too_slow_without_workers_thins_the_sampling():
+    """Test that the step grows with the missing throughput when no worker can be added."""
+    clock = FakeClock()
+    controller = RealTimeController(RealTimeTarget(factor=0.5, window=10), base_step=2, clock=clock)
+
+    _run_window(controller, clock, media_seconds=10, wall_seconds=10)  # warm-up window
+    _run_window(controller, clock, media_seconds=10, wall_seconds=10)  # 1x, 2x needed
+
+    assert controller.step == 4
+    assert controller.workers == 1
+
+
+def test_workers_are_added_before_thinning_the_sampling():
+    """Test that parallelism is tried first and dropped again when it does not pay off."""
+    clock = FakeClock()
+    controller = RealTimeController(RealTimeTarget(factor=0.5, max_workers=4, window=10), base_step=1, clock=clock)
+
+    _run_window(controller, clock, 10, 10)
+    _run_window(controller, clock, 10, 10)
+    assert controller.workers == 2 and controller.step == 1
+
+    _run_window(controller, clock, 10.5, 10)  # a second worker adds only 5%
+    assert controller.workers == 1
+
+    _run_window(controller, clock, 10, 10)
+    assert controller.workers == 1 and controller.step == 2
+
+
+def test_headroom_returns_to_the_requested_interval():
+    """Test that the sampling gets denser again when the target is easily met."""
+    clock = FakeClock()
+    controller = RealTimeController(RealTimeTarget(factor=1.0, window=10), base_step=1, clock=clock)
+    controller.step = 8
+
+    _run_window(controller, clock, 10, 10)
+    _run_window(controller, clock, media_seconds=100, wall_seconds=10)
+
+    assert controller.step == 1
+
+
+def test_deadline_sets_the_required_rate():
+    """Test that a deadline is converted into the rate needed for the remaining video."""
+    clock = FakeClock()
+    controller = RealTimeController(RealTimeTarget(deadline=clock.now + 100), base_step=1, clock=clock)
+    controller.set_total_media(400)
+
+    assert controller.required_rate() == pytest.approx(4.0)
+
+    clock.now += 200
+    assert controller.required_rate() == float("inf")
+
+
+def test_target_needs_factor_or_deadline():
+    with pytest.raises(ValueError):
+        RealTimeController(RealTimeTarget(), base_step=1)
+
+
+class SlowDetector(MockEmotionDetector):
+    def detect(self, image):
+        time.sleep(0.001)
+        return super().detect(image)
+
+
+class SingleSourceFactory(IVideoFactory):
+    def __init__(self, source):
+        self.source = source
+
+    def create(self, file_path):
+        return self.source
+
+
+def test_analyzer_thins_sampling_to_meet_the_target(mock_storage):
+    """Test that an unreachable target makes the analyzer skip frames and report the achieved RTF."""
+    source = MockVideoSource(num_frames=300, fps=30.0)
+    input_data = InputData(video_path="show.mp4", realtime=RealTimeTarget(factor=1e-6, window=5))
+
+    analyzer = EmotionAnalyzer(input_data, SlowDetector(), mock_storage, video_factory=SingleSourceFactory(source))
+    analyzer.run()
+
+    report = analyzer.realtime.report()
+    assert len(mock_storage.saved_data) < 100
+    assert report["frame_step"] > 1
+    assert report["media_seconds"] == pytest.approx(10.0)
+    assert report["achieved_rtf"] > 0
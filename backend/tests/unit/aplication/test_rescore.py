@@ -0,0 +1,131 @@
+import threading
+from typing import Dict, Iterator, List
+
+import numpy as np
+
+from backend.src.application.rescore import CropRescorer
+from backend.src.application.video import Video
+from backend.src.domain.interfaces import IFaceCropper, IFaceCropStore
+from backend.src.domain.models import FaceCrop, InputData, VideoAggregate
+from backend.tests.conftest import MockEmotionDetector, MockVideoSource
+
+
+class BoxCropper(IFaceCropper):
+    def __init__(self):
+        self.boxes = []
+
+    def crop_region(self, frame, box):
+        self.boxes.append(box)
+        return np.zeros((16, 16, 3), dtype=np.uint8)
+
+
+class RegionDetector(MockEmotionDetector):
+    """Reports the face region it classified, like DeepFace and the ONNX backend."""
+
+    def detect(self, image):
+        result = super().detect(image)
+        result["region"] = {"x": 10, "y": 10, "w": 20, "h": 20, "left_eye": None}
+        return result
+
+
+class MemoryCropStore(IFaceCropStore):
+    def __init__(self):
+        self.crops: Dict[str, List[FaceCrop]] = {}
+        self.flushes = 0
+        self.finished = []
+
+    def write(self, crops):
+        for crop in crops:
+            self.crops.setdefault(crop.file_name, []).append(crop)
+
+    def flush(self):
+        self.flushes += 1
+
+    def finish(self, file_name):
+        self.finished.append(file_name)
+
+    def videos(self):
+        return sorted(self.crops)
+
+    def load(self, file_name) -> Iterator[FaceCrop]:
+        return iter(self.crops[file_name])
+
+
+class CountingDetector(MockEmotionDetector):
+    def __init__(self, fixed_emotion="sad"):
+        super().__init__(fixed_emotion)
+        self.classified = 0
+
+    def classify_faces(self, faces):
+        self.classified += len(faces)
+        return super().classify_faces(faces)
+
+
+def test_video_keeps_the_classified_face_of_every_analyzed_frame():
+    """Test that the crop stage stores the region the detector classified, without a second face detection."""
+    store = MemoryCropStore()
+    cropper = BoxCropper()
+    video = Video(MockVideoSource(num_frames=20, fps=10.0), RegionDetector(), "show.mp4",
+                  cropper=cropper, crop_store=store)
+
+    list(video.process(frame_step=5))
+
+    crops = store.crops["show.mp4"]
+    assert [crop.frame_idx for crop in crops] == [0, 5, 10, 15]
+    assert [crop.seconds for crop in crops] == [0.0, 0.5, 1.0, 1.5]
+    assert crops[0].box == (10, 10, 20, 20)
+    assert cropper.boxes == [(10, 10, 20, 20)] * 4
+    assert store.finished == ["show.mp4"]
+
+
+def test_frames_without_a_detector_region_keep_no_crop(mock_detector):
+    """Test that no crop is stored when the detector does not say which face it classified."""
+    store = MemoryCropStore()
+    video = Video(MockVideoSource(num_frames=20, fps=10.0), mock_detector, "show.mp4",
+                  cropper=BoxCropper(), crop_store=store)
+
+    list(video.process(frame_step=5))
+
+    assert store.crops == {}
+
+
+def test_interrupted_video_does_not_finish_its_crops():
+    """Test that the crops of a stopped scan are not marked final."""
+    store = MemoryCropStore()
+    stop = threading.Event()
+    video = Video(MockVideoSource(num_frames=20, fps=10.0), RegionDetector(), "show.mp4",
+                  cropper=BoxCropper(), crop_store=store, stop_event=stop)
+
+    for _ in video.process(frame_step=5):
+        stop.set()
+
+    assert store.finished == []
+
+
+def test_rescore_refuses_an_output_holding_the_videos(mock_storage):
+    """Test that re-scoring into the folder of the original run does not duplicate its rows."""
+    store = MemoryCropStore()
+    store.write([FaceCrop("show.mp4", frame_idx=0, seconds=0.0, box=(0, 0, 1, 1), image=np.zeros((4, 4, 3), np.uint8))])
+    mock_storage.save_aggregates([VideoAggregate("show.mp4", "", "", "", 1, {"happy": 1})])
+    detector = CountingDetector()
+
+    assert CropRescorer(InputData(), detector, mock_storage, store).run() == 0
+    assert detector.classified == 0
+    assert mock_storage.saved_data == []
+
+
+def test_rescore_runs_only_the_classifier(mock_storage):
+    """Test that stored crops are re-scored into timestamped results and the video index."""
+    store = MemoryCropStore()
+    store.write([
+        FaceCrop("show.mp4", frame_idx=i, seconds=s, box=(0, 0, 1, 1), image=np.zeros((4, 4, 3), np.uint8))
+        for i, s in [(30, 1.0), (0, 0.0), (90, 3.0)]
+    ])
+    detector = CountingDetector()
+
+    CropRescorer(InputData(batch_size=2, timeline="both"), detector, mock_storage, store).run()
+
+    assert detector.classified == 3
+    assert [(r.seconds, r.timestamp) for r in mock_storage.saved_data] == [(0.0, "00:00"), (1.0, "00:01"), (3.0, "00:03")]
+    assert mock_storage.aggregates["show.mp4"].emotion_counts == {"sad": 3}
+    assert len(mock_storage.saved_segments) == 1
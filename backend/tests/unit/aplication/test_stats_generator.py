@@ -1,5 +1,5 @@
 from backend.src.application.stats import StatisticsService
-from backend.src.domain.models import OutputData
+from backend.src.domain.models import EmotionSegment, OutputData
 
 
 def test_generate_report_calculates_correct_percentages(mock_storage):
@@ -130,3 +130,20 @@ def test_stress_tie_breaking(mock_storage):
     # Counter.most_common() preserves insertion order for ties, 
     # so "happy" should win because it was added first.
     assert stats.most_frequent_emotion == "happy"
+
+def test_segment_report_weights_by_duration(mock_storage):
+    """Test that the segment report uses durations rather than segment counts."""
+    service = StatisticsService(mock_storage)
+
+    mock_storage.write_segments([
+        EmotionSegment("video1.mp4", 0.0, 30.0, "happy", {"happy": 90.0}, 30),
+        EmotionSegment("video1.mp4", 30.0, 40.0, "sad", {"sad": 70.0}, 10),
+        EmotionSegment("video1.mp4", 40.0, 50.0, "sad", {"sad": 70.0}, 10),
+    ])
+
+    service.generate_report(from_segments=True)
+
+    stats = mock_storage.saved_stats[0]
+    assert stats.total_frames == 50
+    assert stats.most_frequent_emotion == "happy"
+    assert stats.emotion_distribution == {"happy": 60.0, "sad": 40.0}
@@ -0,0 +1,87 @@
+import random
+from collections import Counter
+
+import numpy as np
+
+from backend.src.application.analyzer import EmotionAnalyzer
+from backend.src.application.summary import SummarySampler, error_bound, stratified_order
+from backend.src.domain.interfaces import IVideoFactory
+from backend.src.domain.models import InputData, SummarySampling
+from backend.tests.conftest import MockEmotionDetector, MockVideoSource
+
+
+class IndexedVideoSource(MockVideoSource):
+    """Frames carry their index modulo 10."""
+
+    def read(self):
+        if self.current_idx >= self.num_frames:
+            return None
+        frame = np.full((4, 4, 3), self.current_idx % 10, dtype=np.uint8)
+        self.current_idx += 1
+        self.frames_decoded += 1
+        return frame
+
+
+class ShareDetector(MockEmotionDetector):
+    """Happy on 7 of every 10 frames, sad otherwise."""
+
+    def detect(self, image):
+        emotion = "happy" if image[0, 0, 0] < 7 else "sad"
+        return {"dominant_emotion": emotion, "emotion": {emotion: 100.0}}
+
+
+def test_stratified_order_visits_every_frame_once_and_spreads_early():
+    """Test that each round samples every stratum and nothing is visited twice."""
+    order = list(stratified_order(100, 4, random.Random(1)))
+
+    assert sorted(order) == list(range(100))
+    assert sorted(position // 25 for position in order[:4]) == [0, 1, 2, 3]
+
+
+def test_error_bound_shrinks_with_samples_and_vanishes_for_full_scans():
+    """Test that the bound narrows with more samples and is zero for the whole population."""
+    small = error_bound(Counter(happy=7, sad=3), 10, 10000, 0.95)
+    large = error_bound(Counter(happy=700, sad=300), 1000, 10000, 0.95)
+
+    assert large < small
+    assert error_bound(Counter(happy=7, sad=3), 10, 10, 0.95) == 0.0
+
+
+def test_sampler_stops_once_the_distribution_has_converged():
+    """Test that seeking sources are sampled until the tolerance is met, far before the end."""
+    source = IndexedVideoSource(num_frames=20000, fps=25.0, seekable=True)
+    sampler = SummarySampler(ShareDetector(), SummarySampling(tolerance=5.0, seed=3))
+
+    stats, results = sampler.sample(source, "show.mp4")
+
+    assert stats.error_bound <= 5.0
+    assert stats.confidence == 0.95
+    assert abs(stats.emotion_distribution["happy"] - 70.0) <= 2 * 5.0
+    assert stats.total_frames == len(results) < 2000
+    assert source.frames_decoded == len(results)
+    assert [r.seconds for r in results] == sorted(r.seconds for r in results)
+
+
+def test_sampler_scans_sources_that_cannot_seek():
+    """Test that a sequential source gives an exact summary without error."""
+    source = IndexedVideoSource(num_frames=100, fps=25.0)
+    stats, results = SummarySampler(ShareDetector(), SummarySampling(), step=2).sample(source, "show.mp4")
+
+    assert len(results) == 50
+    assert stats.error_bound == 0.0
+    assert stats.emotion_distribution == {"happy": 80.0, "sad": 20.0}  # even frames: 0, 2, 4, 6 happy, 8 sad
+
+
+def test_analyzer_saves_sampled_summaries(mock_storage):
+    """Test that summary-only runs save one summary per video with its error bound."""
+    class Factory(IVideoFactory):
+        def create(self, video_path):
+            return IndexedVideoSource(num_frames=5000, fps=25.0, seekable=True)
+
+    input_data = InputData(video_path="show.mp4", summary=SummarySampling(tolerance=10.0, seed=1))
+    EmotionAnalyzer(input_data, ShareDetector(), mock_storage, video_factory=Factory()).run()
+
+    assert [s.file_name for s in mock_storage.saved_stats] == ["show.mp4"]
+    assert mock_storage.saved_stats[0].error_bound <= 10.0
+    assert "show.mp4" in mock_storage.aggregates
+    assert len(mock_storage.saved_data) == mock_storage.saved_stats[0].total_frames
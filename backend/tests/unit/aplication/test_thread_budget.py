@@ -0,0 +1,107 @@
+import time
+
+import numpy as np
+
+from backend.src.application.thread_budget import (
+    ThreadBudgetCalibrator, candidate_budgets, collect_sample_frames, plan_thread_budget
+)
+from backend.src.domain.interfaces import IVideoFactory
+from backend.src.domain.models import InputData
+from backend.src.infrastructure.file_utils import FileUtils
+from backend.tests.conftest import MockEmotionDetector, MockVideoSource
+
+
+class SlowDetector(MockEmotionDetector):
+    """Blocks like a model call that releases the GIL, so more workers are faster."""
+
+    def detect(self, image):
+        time.sleep(0.005)
+        return super().detect(image)
+
+
+class SingleSourceFactory(IVideoFactory):
+    def __init__(self, source):
+        self.source = source
+
+    def create(self, file_path):
+        return self.source
+
+
+def test_plan_never_exceeds_the_core_budget():
+    """Test that every planned split fits into the given cores."""
+    for cores in range(1, 17):
+        for budget in candidate_budgets(cores):
+            assert budget.total_cores == cores
+            assert budget.inference_pool + budget.decode_threads <= cores
+
+
+def test_plan_defaults_to_one_worker():
+    """Test that without a worker count the runtime gets the remaining cores."""
+    budget = plan_thread_budget(8)
+
+    assert budget.workers == 1
+    assert budget.decode_threads == 2
+    assert budget.inference_threads == 6
+
+
+def test_candidates_double_the_workers():
+    """Test the splits tried by the calibration run."""
+    assert [budget.workers for budget in candidate_budgets(8)] == [1, 2, 4]
+    assert [budget.workers for budget in candidate_budgets(1)] == [1]
+
+
+def test_calibration_picks_the_fastest_split():
+    """Test that the calibrator applies every candidate and keeps the fastest one."""
+    applied = []
+    frames = [np.zeros((10, 10, 3), dtype=np.uint8)] * 4
+    detector = SlowDetector()
+    calibrator = ThreadBudgetCalibrator(lambda budget: detector, frames, apply_budget=applied.append, duration=0.1)
+
+    best = calibrator.calibrate(candidate_budgets(8))
+
+    assert [budget.workers for budget in applied] == [1, 2, 4]
+    assert best.workers == 4
+
+
+def test_each_candidate_gets_a_detector_created_after_its_budget_is_applied():
+    """Test that runtimes sizing their pools at construction run with the candidate's threads."""
+    events = []
+
+    def create(budget):
+        events.append(("create", budget.workers))
+        return SlowDetector()
+
+    frames = [np.zeros((10, 10, 3), dtype=np.uint8)]
+    calibrator = ThreadBudgetCalibrator(
+        create, frames, apply_budget=lambda budget: events.append(("apply", budget.workers)), duration=0.01
+    )
+    calibrator.calibrate(candidate_budgets(8))
+
+    assert events == [("apply", 1), ("create", 1), ("apply", 2), ("create", 2), ("apply", 4), ("create", 4)]
+
+
+def test_single_core_is_not_oversubscribed():
+    """Test that one core is shared by decoding and inference instead of split in two."""
+    budget = plan_thread_budget(1)
+
+    assert budget.decode_threads == 0
+    assert budget.workers == budget.inference_threads == 1
+
+
+def test_calibration_without_frames_keeps_the_plan():
+    """Test that the first candidate is used when there is nothing to measure."""
+    calibrator = ThreadBudgetCalibrator(lambda budget: SlowDetector(), [], apply_budget=lambda budget: None)
+
+    assert calibrator.calibrate(candidate_budgets(8)).workers == 1
+
+
+def test_sample_frames_follow_the_interval():
+    """Test that the calibration frames are taken at the sampling interval of a video."""
+    source = MockVideoSource(num_frames=10)
+    frames = collect_sample_frames(
+        InputData(video_path="show.mp4", interval=3), SingleSourceFactory(source),
+        list_images=FileUtils.get_image_files, list_videos=FileUtils.get_video_files, count=8,
+    )
+
+    assert len(frames) == 4  # frames 0, 3, 6 and 9
+    assert not source.is_opened
@@ -0,0 +1,39 @@
+from backend.src.application.timeline import SegmentBuilder
+from backend.src.domain.models import OutputData
+
+
+def _sample(name, emotion, seconds, score=100.0):
+    return OutputData(name, emotion, {emotion: score}, seconds=seconds)
+
+
+def test_consecutive_samples_are_merged():
+    """Test that runs of the same emotion become one segment with averaged scores."""
+    builder = SegmentBuilder()
+    samples = [
+        _sample("a.mp4", "happy", 0.0, 80.0),
+        _sample("a.mp4", "happy", 1.0, 60.0),
+        _sample("a.mp4", "sad", 2.0),
+        _sample("a.mp4", "sad", 3.0),
+    ]
+
+    segments = builder.add_all(samples) + [builder.flush()]
+
+    assert [(s.dominant_emotion, s.start, s.end, s.sample_count) for s in segments] == [
+        ("happy", 0.0, 2.0, 2),
+        ("sad", 2.0, 4.0, 2),
+    ]
+    assert segments[0].emotion["happy"] == 70.0
+
+
+def test_new_video_closes_open_segment():
+    """Test that segments never span two videos."""
+    builder = SegmentBuilder()
+
+    segments = builder.add_all([
+        _sample("a.mp4", "happy", 0.0),
+        _sample("a.mp4", "happy", 0.5),
+        _sample("b.mp4", "happy", 0.0),
+    ]) + [builder.flush()]
+
+    assert [(s.file_name, s.start, s.end) for s in segments] == [("a.mp4", 0.0, 1.0), ("b.mp4", 0.0, 0.0)]
+    assert builder.flush() is None
@@ -1,4 +1,8 @@
+import numpy as np
+
 from backend.src.application.video import Video
+from backend.src.domain.models import AdaptiveSampling, OutputData
+from backend.src.infrastructure.memory_budget import MemoryBudget
 from backend.tests.conftest import MockVideoSource, MockEmotionDetector
 
 
@@ -101,3 +105,108 @@ def test_stress_stride_larger_than_video():
     # Next check is 100, which is > 9 -> Stop
     assert len(results) == 1
     assert results[0].timestamp == "00:00"
+
+
+class StepChangeVideoSource(MockVideoSource):
+    """Frames carry their index in the pixel values (frame i is filled with i)."""
+
+    def read(self):
+        if self.current_idx >= self.num_frames:
+            return None
+        frame = np.full((10, 10, 3), self.current_idx, dtype=np.uint8)
+        self.current_idx += 1
+        return frame
+
+
+class StepChangeDetector(MockEmotionDetector):
+    """Returns 'happy' before `change_at` and 'sad' afterwards, counting calls."""
+
+    def __init__(self, change_at=50):
+        super().__init__()
+        self.change_at = change_at
+        self.calls = 0
+
+    def detect(self, image):
+        self.calls += 1
+        emotion = "happy" if image[0, 0, 0] < self.change_at else "sad"
+        return {"dominant_emotion": emotion, "emotion": {emotion: 100.0}}
+
+
+def test_adaptive_refines_around_emotion_change():
+    """Test that adaptive sampling locates the exact change frame with few inferences."""
+    source = StepChangeVideoSource(num_frames=100, fps=1.0)
+    detector = StepChangeDetector(change_at=50)
+    video = Video(source, detector, "test.mp4")
+
+    results = list(video.process(frame_step=20, adaptive=AdaptiveSampling()))
+    timestamps = [r.timestamp for r in results]
+
+    # Coarse samples 0..80, the closing frame 99 and the bisection down to 49/50
+    assert timestamps == sorted(timestamps)
+    assert "00:49" in timestamps and "00:50" in timestamps
+    by_time = {r.timestamp: r.dominant_emotion for r in results}
+    assert by_time["00:49"] == "happy"
+    assert by_time["00:50"] == "sad"
+    assert detector.calls < 20
+
+
+def test_adaptive_without_changes_only_scans_coarsely():
+    """Test that a constant emotion needs no refinement."""
+    source = StepChangeVideoSource(num_frames=100, fps=1.0)
+    detector = StepChangeDetector(change_at=1000)
+    video = Video(source, detector, "test.mp4")
+
+    results = list(video.process(frame_step=20, adaptive=AdaptiveSampling()))
+
+    # 0, 20, 40, 60, 80 and the closing frame 99
+    assert len(results) == 6
+    assert detector.calls == 6
+
+
+def test_adaptive_respects_refinement_budget():
+    """Test that refinement stops once the per-video budget is spent, coarse samples are not counted."""
+    source = StepChangeVideoSource(num_frames=100, fps=1.0)
+    detector = StepChangeDetector(change_at=50)
+    video = Video(source, detector, "test.mp4")
+
+    list(video.process(frame_step=20, adaptive=AdaptiveSampling(max_refinements=2)))
+
+    # 6 coarse samples (0..80 and the closing frame) + 2 refinements
+    assert detector.calls == 8
+
+
+def test_seekable_source_skips_decoding(mock_detector):
+    """Test that a seekable source only decodes the sampled frames and yields the same timeline."""
+    seekable = MockVideoSource(num_frames=100, fps=10.0, seekable=True)
+    sequential = MockVideoSource(num_frames=100, fps=10.0)
+
+    seek_results = list(Video(seekable, mock_detector, "a.mp4").process(frame_step=10))
+    read_results = list(Video(sequential, mock_detector, "a.mp4").process(frame_step=10))
+
+    assert [r.seconds for r in seek_results] == [r.seconds for r in read_results]
+    assert seekable.frames_decoded == 10
+    assert sequential.frames_decoded == 100
+
+
+def test_adaptive_skips_refinement_beyond_memory_budget():
+    """Test that gaps whose frames do not fit into the memory budget stay coarse."""
+    source = StepChangeVideoSource(num_frames=100, fps=1.0)
+    detector = StepChangeDetector(change_at=50)
+    budget = MemoryBudget(max_bytes=2000)  # 300 bytes per frame, a 19 frame gap does not fit
+    video = Video(source, detector, "test.mp4", memory_budget=budget)
+
+    results = list(video.process(frame_step=20, adaptive=AdaptiveSampling()))
+
+    assert len(results) == 6
+    assert detector.calls == 6
+    assert budget.in_use == 0
+    assert 0 < budget.peak <= 2000
+
+
+def test_stamp_keeps_exact_seconds_and_truncates_the_timestamp():
+    """Test that results get their exact position and a whole-second "MM:SS" timestamp."""
+    result = OutputData("test.mp4", "happy", {})
+    Video.stamp(result, 754.9)
+
+    assert result.seconds == 754.9
+    assert result.timestamp == "12:34"
@@ -0,0 +1,84 @@
+import gzip
+import os
+
+from backend.src.application.stats import StatisticsService
+from backend.src.domain.models import OutputData
+from backend.src.infrastructure import compressed_storage
+from backend.src.infrastructure.compressed_storage import CompressedCSVStorage
+
+
+def _rows(file_name, count, emotion="happy"):
+    return [
+        OutputData(file_name=file_name, dominant_emotion=emotion, emotion={emotion: 90.0}, timestamp=f"00:{i:02d}")
+        for i in range(count)
+    ]
+
+
+def test_rows_are_buffered_compressed_and_rotated(tmp_path):
+    """Test that flushed batches rotate into several gzip segments that read back in order."""
+    storage = CompressedCSVStorage(str(tmp_path), max_segment_bytes=1, buffer_rows=4)
+    storage.write_batch(_rows("a.mp4", 6))
+    storage.write_batch(_rows("b.mp4", 3, emotion="sad"))
+    storage.flush()
+
+    segments = sorted(os.listdir(storage.results_dir))
+    assert segments == ["results-00000.csv.gz", "results-00001.csv.gz", "results_index.json"]
+    assert gzip.decompress((tmp_path / "results" / segments[0]).read_bytes()).startswith(b"file_name,")
+    assert not (tmp_path / "analysis_results.csv").exists()
+
+    rows = CompressedCSVStorage(str(tmp_path)).load_all()
+    assert [row["file_name"] for row in rows] == ["a.mp4"] * 6 + ["b.mp4"] * 3
+    assert rows[5]["timestamp"] == "00:05"
+
+
+def test_video_index_limits_the_segments_read(tmp_path):
+    """Test that a video is read from the segments listed for it only."""
+    storage = CompressedCSVStorage(str(tmp_path), max_segment_bytes=1, buffer_rows=100)
+    storage.write_batch(_rows("a.mp4", 2))
+    storage.flush()
+    storage.write_batch(_rows("b.mp4", 3))
+    storage.flush()
+
+    assert storage.segments_for("b.mp4") == ["results-00001.csv.gz"]
+    assert len(list(storage.iter_video("b.mp4"))) == 3
+
+
+def test_report_streams_from_compressed_segments(tmp_path):
+    """Test that the statistics report reads the compressed log, including buffered rows."""
+    storage = CompressedCSVStorage(str(tmp_path), buffer_rows=1000)
+    storage.write_batch(_rows("a.mp4", 3) + _rows("a.mp4", 1, emotion="sad"))
+
+    StatisticsService(storage).generate_report()
+
+    report = (tmp_path / "summary_report.csv").read_text()
+    assert "a.mp4,4,happy,75.0" in report
+
+
+def test_rows_stream_in_blocks_and_reading_can_stop_early(tmp_path, monkeypatch):
+    """Test that large segments are read block by block and an abandoned read releases its readers."""
+    monkeypatch.setattr(compressed_storage, "READ_BLOCK_ROWS", 3)
+    storage = CompressedCSVStorage(str(tmp_path), max_segment_bytes=1, buffer_rows=50, read_workers=2)
+    for name in ("a.mp4", "b.mp4", "c.mp4"):
+        storage.write_batch(_rows(name, 40))
+        storage.flush()
+
+    rows = storage.iter_all()
+    first = [next(rows) for _ in range(5)]
+    rows.close()  # must not hang on readers blocked by full queues
+
+    assert [row["timestamp"] for row in first] == ["00:00", "00:01", "00:02", "00:03", "00:04"]
+    assert len(storage.load_all()) == 120
+
+
+def test_no_second_header_after_a_crash_before_the_index_was_saved(tmp_path):
+    """Test that a segment appended to without an index entry does not get a header row in the middle."""
+    storage = CompressedCSVStorage(str(tmp_path))
+    storage.write_batch(_rows("a.mp4", 2))
+    storage.flush()
+    os.remove(storage.results_index_path)  # the process died right after the append
+
+    restarted = CompressedCSVStorage(str(tmp_path))
+    restarted.write_batch(_rows("b.mp4", 2))
+    restarted.flush()
+
+    assert [row["file_name"] for row in restarted.load_all()] == ["a.mp4", "a.mp4", "b.mp4", "b.mp4"]
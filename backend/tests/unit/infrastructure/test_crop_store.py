@@ -0,0 +1,90 @@
+import os
+
+import cv2
+import numpy as np
+import pytest
+
+from backend.src.domain.models import FaceCrop
+from backend.src.infrastructure.crop_store import NpzFaceCropStore
+from backend.src.infrastructure.face_locator import HaarFaceCropper
+
+FACE_IMAGE = os.path.join(os.path.dirname(__file__), "../../../../data/input/img11.jpg")
+
+
+def _crops(file_name, count, value=0):
+    return [
+        FaceCrop(file_name, frame_idx=i * 5, seconds=i * 0.5, box=(i, 2, 30, 30),
+                 image=np.full((8, 8, 3), value + i, dtype=np.uint8))
+        for i in range(count)
+    ]
+
+
+def test_crops_are_chunked_and_reloaded(tmp_path):
+    """Test that crops survive a restart in write order, split into chunks."""
+    store = NpzFaceCropStore(str(tmp_path), chunk_size=2)
+    store.write(_crops("a.mp4", 5))
+    store.finish("a.mp4")
+
+    reloaded = list(NpzFaceCropStore(str(tmp_path)).load("a.mp4"))
+
+    assert len([f for f in os.listdir(tmp_path) if f.endswith(".npz")]) == 3
+    assert [crop.frame_idx for crop in reloaded] == [0, 5, 10, 15, 20]
+    assert reloaded[3].box == (3, 2, 30, 30)
+    assert reloaded[3].seconds == 1.5
+    assert int(reloaded[4].image[0, 0, 0]) == 4
+
+
+def test_new_run_replaces_the_crops_of_a_video(tmp_path):
+    """Test that analyzing a video again does not duplicate its crops."""
+    first = NpzFaceCropStore(str(tmp_path))
+    first.write(_crops("a.mp4", 3) + _crops("b.mp4", 1))
+    first.finish("a.mp4")
+    first.finish("b.mp4")
+
+    second = NpzFaceCropStore(str(tmp_path))
+    second.write(_crops("a.mp4", 2, value=100))
+    second.finish("a.mp4")
+
+    assert second.videos() == ["a.mp4", "b.mp4"]
+    assert [int(crop.image[0, 0, 0]) for crop in second.load("a.mp4")] == [100, 101]
+    assert len([f for f in os.listdir(tmp_path) if f.endswith(".npz")]) == 2
+
+
+def test_interrupted_run_keeps_the_previous_crops(tmp_path):
+    """Test that crops of an unfinished video neither replace the old ones nor stay on disk."""
+    first = NpzFaceCropStore(str(tmp_path), chunk_size=2)
+    first.write(_crops("a.mp4", 3))
+    first.finish("a.mp4")
+
+    interrupted = NpzFaceCropStore(str(tmp_path), chunk_size=2)
+    interrupted.write(_crops("a.mp4", 5, value=100))
+    interrupted.flush()
+    assert [int(crop.image[0, 0, 0]) for crop in interrupted.load("a.mp4")] == [0, 1, 2]
+
+    restarted = NpzFaceCropStore(str(tmp_path))
+    assert [int(crop.image[0, 0, 0]) for crop in restarted.load("a.mp4")] == [0, 1, 2]
+    assert len([f for f in os.listdir(tmp_path) if f.endswith(".npz")]) == 2
+
+
+class EdgeLocator:
+    def locate(self, image):
+        return [(0, 0, 20, 10)]
+
+
+def test_crop_is_square_and_padded_at_the_edge():
+    """Test that faces at the frame border are padded instead of stretched."""
+    frame = np.full((50, 50, 3), 200, dtype=np.uint8)
+    box, crop = HaarFaceCropper(locator=EdgeLocator(), size=32, margin=0.25).crop(frame)
+
+    assert box == (0, 0, 20, 10)
+    assert crop.shape == (32, 32, 3)
+    assert (crop == 200).all()
+
+
+@pytest.mark.skipif(not os.path.exists(FACE_IMAGE), reason="sample image not available")
+def test_crop_of_a_real_face():
+    """Test that the largest face of a photo is cropped."""
+    result = HaarFaceCropper(size=64).crop(cv2.imread(FACE_IMAGE))
+
+    assert result is not None
+    assert result[1].shape == (64, 64, 3)
@@ -0,0 +1,185 @@
+import logging
+import shutil
+import subprocess
+import sys
+
+import cv2
+import numpy as np
+import pytest
+
+from backend.src.domain.models import VideoMetadata
+from backend.src.infrastructure.ffmpeg_adapter import FFmpegVideoFactory, FFmpegVideoSource, output_size
+from backend.src.infrastructure.opencv_adapter import OpenCVVideoSource
+
+
+def _metadata(width=1920, height=1080):
+    return VideoMetadata(file_name="a.mp4", frame_count=100, fps=25.0, duration=4.0,
+                         width=width, height=height, codec="h264")
+
+
+def test_output_size_keeps_aspect_and_even_sides():
+    """Test that wide videos are scaled to the working width and small ones are left alone."""
+    assert output_size(1920, 1080, 640) == (640, 360)
+    assert output_size(1280, 717, 321) == (320, 180)
+    assert output_size(320, 240, 640) == (320, 240)
+    assert output_size(1920, 1080, None) == (1920, 1080)
+
+
+def test_command_selects_and_scales_in_the_decoder():
+    """Test that frame selection, scaling and the decoder threads are passed to ffmpeg."""
+    source = FFmpegVideoSource("a.mp4", metadata=_metadata(), frame_step=5, max_width=640, threads=3)
+    source.width, source.height = output_size(1920, 1080, 640)
+
+    command = source.build_command()
+
+    assert command[command.index("-threads") + 1] == "3"
+    assert command[command.index("-vf") + 1] == "select='not(mod(n,5))',scale=640:360:flags=area"
+    assert command[-5:] == ["-f", "rawvideo", "-pix_fmt", "bgr24", "pipe:1"]
+    assert source.get_frame_count() == 20
+
+
+def test_factory_falls_back_to_opencv_without_ffmpeg():
+    """Test that a missing ffmpeg executable gives OpenCV sources."""
+    factory = FFmpegVideoFactory(frame_step=5, ffmpeg="ffmpeg-that-does-not-exist")
+
+    assert not factory.available
+    assert isinstance(factory.create("a.mp4"), OpenCVVideoSource)
+
+
+@pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="ffmpeg is not installed")
+def test_pipe_delivers_selected_scaled_frames(tmp_path):
+    """Test that every n-th frame arrives at the working resolution with the reduced frame rate."""
+    path = str(tmp_path / "clip.avi")
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), 20.0, (128, 96))
+    for i in range(20):
+        writer.write(np.full((96, 128, 3), i * 10, dtype=np.uint8))
+    writer.release()
+
+    source = FFmpegVideoFactory(frame_step=4, max_width=64).create(path)
+    assert source.open()
+    frames = []
+    while (frame := source.read()) is not None:
+        frames.append(frame.copy())
+    source.release()
+
+    assert source.get_fps() == pytest.approx(5.0)
+    assert len(frames) == 5
+    assert frames[0].shape == (48, 64, 3)
+
+
+FAKE_FFMPEG = """#!{python}
+import os, sys
+if "-version" in sys.argv:
+    print("ffmpeg version " + os.environ.get("FAKE_FFMPEG_VERSION", "6.1") + " Copyright (c) the FFmpeg developers")
+    sys.exit(0)
+frame_size = 4 * 2 * 3
+for i in range(int(os.environ.get("FAKE_FFMPEG_FRAMES", "3"))):
+    sys.stdout.buffer.write(bytes([i]) * frame_size)
+sys.stdout.buffer.write(b"x" * int(os.environ.get("FAKE_FFMPEG_TAIL", "0")))  # a truncated last frame
+sys.stderr.write("fake decoder message")
+sys.exit(int(os.environ.get("FAKE_FFMPEG_EXIT", "0")))
+"""
+
+
+@pytest.fixture
+def fake_ffmpeg(tmp_path):
+    """An executable speaking the ffmpeg pipe protocol: raw 4x2 BGR frames filled with their index."""
+    path = tmp_path / "ffmpeg"
+    path.write_text(FAKE_FFMPEG.format(python=sys.executable))
+    path.chmod(0o755)
+    video = tmp_path / "clip.mp4"
+    video.write_bytes(b"not decoded by the fake")
+    return str(path), str(video)
+
+
+def _fake_source(fake_ffmpeg, **kwargs):
+    ffmpeg, video = fake_ffmpeg
+    return FFmpegVideoSource(video, metadata=_metadata(width=4, height=2), ffmpeg=ffmpeg, **kwargs)
+
+
+def test_pipe_reads_frames_into_the_buffer_ring(fake_ffmpeg, monkeypatch):
+    """Test that frames are read in order into reused buffers and a partial last frame is dropped."""
+    monkeypatch.setenv("FAKE_FFMPEG_TAIL", "5")
+    source = _fake_source(fake_ffmpeg, buffers=2)
+    assert source.open()
+
+    frames = []
+    while (frame := source.read()) is not None:
+        frames.append((frame, int(frame[0, 0, 0])))
+    source.release()
+
+    assert [value for _, value in frames] == [0, 1, 2]
+    assert frames[0][0] is frames[2][0]  # the ring has two buffers
+    assert frames[0][0] is not frames[1][0]
+    assert frames[0][0].shape == (2, 4, 3)
+
+
+def test_pipe_without_buffer_reuse_returns_new_arrays(fake_ffmpeg):
+    """Test that callers keeping frames get a fresh array per read."""
+    source = _fake_source(fake_ffmpeg, buffers=0)
+    assert source.open()
+    first, second = source.read(), source.read()
+    source.release()
+
+    assert int(first[0, 0, 0]) == 0 and int(second[0, 0, 0]) == 1
+
+
+def test_failed_decode_is_logged_after_a_full_read(fake_ffmpeg, monkeypatch, caplog):
+    """Test that ffmpeg's error output is reported when the stream ended with a failure."""
+    monkeypatch.setenv("FAKE_FFMPEG_FRAMES", "0")
+    monkeypatch.setenv("FAKE_FFMPEG_EXIT", "1")
+    source = _fake_source(fake_ffmpeg)
+    assert source.open()
+
+    assert source.read() is None
+    with caplog.at_level(logging.ERROR, logger="FFmpegAdapter"):
+        source.release()
+
+    assert "fake decoder message" in caplog.text
+
+
+def test_early_release_stops_the_decoder(fake_ffmpeg, monkeypatch):
+    """Test that releasing before the end terminates ffmpeg and does not report the broken pipe."""
+    monkeypatch.setenv("FAKE_FFMPEG_FRAMES", "100000")
+    source = _fake_source(fake_ffmpeg)
+    assert source.open()
+    assert source.read() is not None
+    process = source._process
+
+    source.release()
+
+    assert process.poll() is not None
+    assert source.read() is None
+
+
+@pytest.mark.parametrize("version, option", [("4.4.2", "-vsync"), ("5.1", "-fps_mode"), ("N-111-gabc", "-fps_mode")])
+def test_factory_picks_the_passthrough_option_of_the_installed_ffmpeg(fake_ffmpeg, monkeypatch, version, option):
+    """Test that ffmpeg releases before 5.1 get -vsync, as they reject -fps_mode."""
+    monkeypatch.setenv("FAKE_FFMPEG_VERSION", version)
+    ffmpeg, video = fake_ffmpeg
+    factory = FFmpegVideoFactory(ffmpeg=ffmpeg)
+
+    source = factory.create(video)
+    source.metadata = _metadata(width=4, height=2)
+    source.width, source.height = 4, 2
+
+    assert factory.sync_option == option
+    command = source.build_command()
+    assert command[command.index("passthrough") - 1] == option
+
+
+def test_factory_probe_does_not_start_the_decoder(fake_ffmpeg, tmp_path, monkeypatch):
+    """Test that planning reads durations without spawning an ffmpeg process."""
+    path = str(tmp_path / "clip.avi")
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), 20.0, (64, 48))
+    for _ in range(40):
+        writer.write(np.zeros((48, 64, 3), dtype=np.uint8))
+    writer.release()
+    factory = FFmpegVideoFactory(ffmpeg=fake_ffmpeg[0])
+
+    def no_decoder(*args, **kwargs):
+        raise AssertionError("ffmpeg must not be started")
+
+    monkeypatch.setattr(subprocess, "Popen", no_decoder)
+
+    assert factory.probe(path).duration == pytest.approx(2.0)
@@ -0,0 +1,127 @@
+import os
+
+import cv2
+import numpy as np
+
+from backend.src.infrastructure.face_locator import HaarFaceLocator
+from backend.src.infrastructure.frame_cache import CachedEmotionDetector, frame_key, perceptual_hash
+from backend.tests.conftest import MockEmotionDetector
+
+SAMPLE_DIR = os.path.join(os.path.dirname(__file__), "../../../../data/input")
+
+
+class CountingDetector(MockEmotionDetector):
+    def __init__(self):
+        super().__init__()
+        self.calls = 0
+
+    def detect(self, image):
+        self.calls += 1
+        return super().detect(image)
+
+
+def _frame(seed):
+    rng = np.random.default_rng(seed)
+    return rng.integers(0, 255, (90, 160, 3), dtype=np.uint8)
+
+
+def test_perceptual_hash_tolerates_small_noise():
+    """Test that a slightly altered copy of a frame keeps its hash."""
+    frame = np.tile(np.linspace(0, 250, 160, dtype=np.uint8), (90, 1))
+    frame = np.dstack([frame] * 3)
+    noisy = np.clip(frame.astype(int) + 1, 0, 255).astype(np.uint8)
+
+    assert perceptual_hash(frame) == perceptual_hash(noisy)
+    assert len(perceptual_hash(frame)) == 16
+
+
+def test_changed_expression_of_a_small_face_gets_a_new_key():
+    """Test that a change inside one face of a wide shot misses, although the full-frame hash stays."""
+    locator = HaarFaceLocator(max_width=640, min_neighbors=5)
+    frame = cv2.imread(os.path.join(SAMPLE_DIR, "img3.jpg"))
+    x, y, w, h = locator.locate(frame)[0]
+    changed = frame.copy()
+    cv2.ellipse(changed, (x + w // 2, y + int(h * 0.78)), (w // 6, h // 14), 0, 0, 360, (40, 40, 60), -1)
+
+    assert perceptual_hash(frame) == perceptual_hash(changed)
+    assert frame_key(frame, locator) != frame_key(changed, locator)
+
+
+def test_reencoded_frame_keeps_its_key():
+    """Test that a re-encoded copy of a frame still hits."""
+    locator = HaarFaceLocator(max_width=640, min_neighbors=5)
+    frame = cv2.imread(os.path.join(SAMPLE_DIR, "img11.jpg"))
+    _, encoded = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, 90])
+
+    assert frame_key(frame, locator) == frame_key(cv2.imdecode(encoded, cv2.IMREAD_COLOR), locator)
+
+
+def test_repeated_frames_are_served_from_cache(tmp_path):
+    """Test hits, misses and the hit-rate metric."""
+    inner = CountingDetector()
+    detector = CachedEmotionDetector(inner, str(tmp_path / "cache.json"), model_id="mock")
+
+    for _ in range(3):
+        detector.detect(_frame(1))
+    detector.detect(_frame(2))
+
+    stats = detector.get_stats()
+    assert inner.calls == 2
+    assert stats["cache_hits"] == 2
+    assert stats["cache_hit_rate"] == 0.5
+
+
+def test_cache_is_persisted_and_invalidated_on_model_change(tmp_path):
+    """Test that the cache survives a restart but not a model change."""
+    path = str(tmp_path / "cache.json")
+    first = CachedEmotionDetector(CountingDetector(), path, model_id="model-a")
+    first.detect(_frame(1))
+    first.close()
+
+    inner = CountingDetector()
+    CachedEmotionDetector(inner, path, model_id="model-a").detect(_frame(1))
+    assert inner.calls == 0
+
+    inner = CountingDetector()
+    CachedEmotionDetector(inner, path, model_id="model-b").detect(_frame(1))
+    assert inner.calls == 1
+
+
+def test_lru_size_limit(tmp_path):
+    """Test that the least recently used entry is evicted."""
+    inner = CountingDetector()
+    detector = CachedEmotionDetector(inner, str(tmp_path / "cache.json"), model_id="mock", max_entries=2)
+
+    detector.detect(_frame(1))
+    detector.detect(_frame(2))
+    detector.detect(_frame(1))  # refresh frame 1
+    detector.detect(_frame(3))  # evicts frame 2
+    detector.detect(_frame(1))
+
+    assert detector.get_stats()["cache_size"] == 2
+    assert inner.calls == 3
+
+
+def test_hits_return_copies(tmp_path):
+    """Test that changing a returned result does not change the cached one."""
+    detector = CachedEmotionDetector(CountingDetector(), str(tmp_path / "cache.json"), model_id="mock")
+
+    detector.detect(_frame(1))["emotion"]["happy"] = 0.0
+    first_hit = detector.detect(_frame(1))
+    first_hit["dominant_emotion"] = "sad"
+
+    assert detector.detect(_frame(1)) == {"dominant_emotion": "happy", "emotion": {"happy": 100.0}}
+
+
+def test_verified_hits_measure_the_hit_accuracy(tmp_path):
+    """Test that every n-th hit is analyzed again and compared with the cached result."""
+    inner = CountingDetector()
+    detector = CachedEmotionDetector(inner, str(tmp_path / "cache.json"), model_id="mock", verify_every=2)
+
+    for _ in range(5):
+        detector.detect(_frame(1))
+
+    stats = detector.get_stats()
+    assert inner.calls == 3  # the miss and hits 2 and 4
+    assert stats["cache_verified"] == 2
+    assert stats["cache_hit_accuracy"] == 1.0
@@ -0,0 +1,135 @@
+import os
+import signal
+import socket
+import threading
+
+import cv2
+import numpy as np
+import pytest
+
+from backend.src.infrastructure.inference_server import (
+    InferenceServer,
+    RemoteEmotionDetector,
+    _recv_message,
+    _send_message,
+    parse_address,
+)
+from backend.tests.conftest import MockEmotionDetector
+
+
+class BatchRecordingDetector(MockEmotionDetector):
+    def __init__(self):
+        super().__init__()
+        self.batch_sizes = []
+
+    def detect_batch(self, frames):
+        self.batch_sizes.append(len(frames))
+        return [
+            {"dominant_emotion": "sad" if frame.mean() > 0 else "happy", "emotion": {"sad": np.float32(99.5)}}
+            for frame in frames
+        ]
+
+
+@pytest.fixture
+def server():
+    detector = BatchRecordingDetector()
+    server = InferenceServer(detector, "127.0.0.1:0", max_batch_size=8, max_latency_ms=200)
+    server.start()
+    yield server, detector
+    server.shutdown()
+
+
+def test_remote_detector_round_trip(server):
+    """Test that a frame is sent over the socket and the result dict comes back."""
+    server, _ = server
+    client = RemoteEmotionDetector(server.address)
+
+    result = client.detect(np.ones((4, 4, 3), dtype=np.uint8))
+    client.close()
+
+    assert result == {"dominant_emotion": "sad", "emotion": {"sad": 99.5}}
+
+
+def test_concurrent_requests_are_coalesced_into_batches(server):
+    """Test that requests from several clients share detector batches."""
+    server, detector = server
+    client = RemoteEmotionDetector(server.address)
+    results = [None] * 8
+    start = threading.Barrier(8)
+
+    def send(i):
+        start.wait()
+        results[i] = client.detect(np.full((4, 4, 3), i % 2, dtype=np.uint8))
+
+    threads = [threading.Thread(target=send, args=(i,)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert [r["dominant_emotion"] for r in results] == ["happy", "sad"] * 4
+    assert sum(detector.batch_sizes) == 8
+    assert len(detector.batch_sizes) < 8
+
+    # The worker threads have ended, their connections are closed all the same
+    sockets = list(client._sockets)
+    client.close()
+    assert len(sockets) == 8
+    assert all(sock.fileno() == -1 for sock in sockets)
+
+
+def test_unreachable_server_gives_no_result():
+    """Test that a refused connection is reported as a missing result and its socket is closed."""
+    listener = socket.socket()
+    listener.bind(("127.0.0.1", 0))
+    address = "127.0.0.1:%d" % listener.getsockname()[1]
+    listener.close()  # nothing listens on the port any more
+    client = RemoteEmotionDetector(address, timeout=1.0)
+
+    assert client.detect(np.ones((4, 4, 3), dtype=np.uint8)) is None
+    assert not client._sockets
+
+
+def test_image_paths_are_decoded_by_the_client(server, tmp_path):
+    """Test that a path is read on the client side and the server only receives pixels."""
+    server, detector = server
+    path = str(tmp_path / "frame.png")
+    cv2.imwrite(path, np.ones((4, 4, 3), dtype=np.uint8))
+    client = RemoteEmotionDetector(server.address)
+
+    assert client.detect(path)["dominant_emotion"] == "sad"
+    assert client.detect(str(tmp_path / "missing.png")) is None
+    client.close()
+    assert detector.batch_sizes == [1]
+
+
+def test_path_requests_are_rejected(server):
+    """Test that the server never opens files named by a client."""
+    server, detector = server
+    family, address = parse_address(server.address)
+    with socket.socket(family, socket.SOCK_STREAM) as sock:
+        sock.connect(address)
+        _send_message(sock, {"path": "/etc/passwd"})
+        reply, _ = _recv_message(sock)
+
+    assert "error" in reply
+    assert detector.batch_sizes == []
+
+
+@pytest.mark.parametrize("address", ["0.0.0.0:0", "192.0.2.1:0", "example.com:0"])
+def test_non_loopback_addresses_are_refused(address):
+    """Test that the unauthenticated service cannot be exposed on the network."""
+    with pytest.raises(ValueError):
+        InferenceServer(BatchRecordingDetector(), address)
+
+
+def test_sigterm_stops_serve_forever():
+    """Test that SIGTERM ends the service loop and restores the previous handler."""
+    server = InferenceServer(BatchRecordingDetector(), "127.0.0.1:0")
+    previous = signal.getsignal(signal.SIGTERM)
+    threading.Timer(0.2, os.kill, (os.getpid(), signal.SIGTERM)).start()
+
+    server.serve_forever()
+    server.shutdown()
+
+    assert signal.getsignal(signal.SIGTERM) is previous
@@ -0,0 +1,92 @@
+import logging
+import logging.handlers
+import threading
+
+from backend.src.infrastructure.logger import RateLimitedLogger, setup_logger
+
+
+class ListHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.messages = []
+
+    def emit(self, record):
+        self.messages.append(record.getMessage())
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _make_logger(name, level=logging.INFO):
+    logger = logging.getLogger(name)
+    logger.setLevel(level)
+    logger.propagate = False
+    handler = ListHandler()
+    logger.addHandler(handler)
+    return logger, handler
+
+
+def test_rate_limited_logger_suppresses_repeats_within_interval():
+    """Test that repeated per-frame messages are collapsed and counted."""
+    logger, handler = _make_logger("test.rate_limit")
+    clock = FakeClock()
+    limited = RateLimitedLogger(logger, interval=5.0, clock=clock)
+
+    for i in range(100):
+        limited.warning("No face detected in frame: %s", i)
+    clock.now = 6.0
+    limited.warning("No face detected in frame: %s", 100)
+
+    assert handler.messages == [
+        "No face detected in frame: 0",
+        "No face detected in frame: 100 (99 similar messages suppressed)",
+    ]
+
+
+def test_rate_limited_logger_skips_disabled_levels():
+    """Test that filtered levels are dropped before any formatting."""
+    logger, handler = _make_logger("test.rate_limit_disabled", level=logging.INFO)
+    limited = RateLimitedLogger(logger)
+
+    class Exploding:
+        def __str__(self):
+            raise AssertionError("must not be formatted")
+
+    limited.debug("Analyzing frame: %s", Exploding())
+
+    assert handler.messages == []
+
+
+def test_setup_logger_uses_background_queue(tmp_path):
+    """Test that loggers only enqueue records and share one listener per file."""
+    log_file = str(tmp_path / "app.log")
+    first = setup_logger("test.queue.first", log_file=log_file)
+    second = setup_logger("test.queue.second", log_file=log_file)
+
+    assert len(first.handlers) == 1
+    assert isinstance(first.handlers[0], logging.handlers.QueueHandler)
+    assert first.handlers[0] is second.handlers[0]
+
+
+def test_messages_are_formatted_on_the_listener_thread(tmp_path):
+    """Test that the message arguments are merged by the listener, not by the caller."""
+    logger = setup_logger("test.queue.deferred", log_file=str(tmp_path / "app.log"))
+    formatted = threading.Event()
+    threads = []
+
+    class Recorder:
+        def __str__(self):
+            threads.append(threading.current_thread())
+            formatted.set()
+            return "frame"
+
+    logger.propagate = False  # only the queue handler sees the record
+    logger.info("Analyzing %s", Recorder())
+
+    assert formatted.wait(5.0)
+    assert threading.main_thread() not in threads
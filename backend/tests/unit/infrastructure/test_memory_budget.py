@@ -0,0 +1,25 @@
+from backend.src.infrastructure.memory_budget import MemoryBudget
+
+
+def test_budget_tracks_usage_and_peak():
+    """Test that reservations are accounted and the peak is kept after releases."""
+    budget = MemoryBudget(max_bytes=1000)
+    budget.reserve(600)
+    budget.reserve(300)
+    budget.release(900)
+
+    assert budget.in_use == 0
+    assert budget.peak == 900
+    assert budget.report()["peak_bytes"] == 900
+
+
+def test_sizes_shrink_past_the_high_water_mark():
+    """Test that batch sizes are kept below the mark and shrink linearly above it."""
+    budget = MemoryBudget(max_bytes=1000, high_water=0.8)
+
+    assert budget.scaled(16) == 16
+    budget.reserve(900)
+    assert budget.under_pressure
+    assert budget.scaled(16) == 8
+    budget.reserve(200)
+    assert budget.scaled(16) == 1
@@ -0,0 +1,122 @@
+import glob
+import os
+
+import cv2
+import numpy as np
+import pytest
+
+from backend.src.infrastructure.face_locator import HaarFaceCropper
+from backend.src.infrastructure.onnx_detector import EMOTION_LABELS, OnnxEmotionDetector, export_deepface_model
+
+onnx = pytest.importorskip("onnx")
+pytest.importorskip("onnxruntime")
+
+SAMPLE_IMAGES = sorted(glob.glob(os.path.join(os.path.dirname(__file__), "../../../../data/input/*.jpg")))
+
+
+@pytest.fixture(scope="module")
+def tiny_model(tmp_path_factory):
+    """A small linear classifier with the input and output of the exported emotion model."""
+    from onnx import TensorProto, helper, numpy_helper
+
+    rng = np.random.default_rng(7)
+    weights = numpy_helper.from_array(rng.normal(0, 0.05, (48 * 48, 7)).astype(np.float32), "weights")
+    bias = numpy_helper.from_array(np.zeros(7, dtype=np.float32), "bias")
+    shape = numpy_helper.from_array(np.array([-1, 48 * 48], dtype=np.int64), "shape")
+    graph = helper.make_graph(
+        [
+            helper.make_node("Reshape", ["input", "shape"], ["flat"]),
+            helper.make_node("MatMul", ["flat", "weights"], ["logits"]),
+            helper.make_node("Add", ["logits", "bias"], ["scores"]),
+            helper.make_node("Softmax", ["scores"], ["probabilities"], axis=1),
+        ],
+        "tiny_emotion",
+        [helper.make_tensor_value_info("input", TensorProto.FLOAT, [None, 48, 48, 1])],
+        [helper.make_tensor_value_info("probabilities", TensorProto.FLOAT, [None, 7])],
+        initializer=[weights, bias, shape],
+    )
+    model = helper.make_model(graph, opset_imports=[helper.make_opsetid("", 13)])
+    model.ir_version = 8
+
+    path = str(tmp_path_factory.mktemp("models") / "tiny_emotion.onnx")
+    onnx.save(model, path)
+    return path
+
+
+@pytest.fixture(scope="module")
+def exported_model(tmp_path_factory):
+    """The real emotion model: EMOTION_ONNX_MODEL or a fresh export of the DeepFace Keras model."""
+    path = os.environ.get("EMOTION_ONNX_MODEL")
+    if path and os.path.exists(path):
+        return path
+    pytest.importorskip("tensorflow")
+    pytest.importorskip("tf2onnx")
+    return export_deepface_model(str(tmp_path_factory.mktemp("models") / "facial_expression_model_weights.onnx"))
+
+
+@pytest.fixture(scope="module")
+def deepface_detector():
+    pytest.importorskip("tensorflow")
+    from backend.src.infrastructure.detectors import DeepFaceEmotionDetector
+
+    return DeepFaceEmotionDetector()
+
+
+def test_detects_faces_with_deepface_style_results(tiny_model):
+    """Test that every sample image gets a result with all seven emotion scores."""
+    detector = OnnxEmotionDetector(tiny_model)
+    results = detector.detect_batch(SAMPLE_IMAGES + [np.zeros((120, 160, 3), dtype=np.uint8)])
+
+    assert results[-1] is None
+    for result in results[:-1]:
+        assert set(result["emotion"]) == set(EMOTION_LABELS)
+        assert sum(result["emotion"].values()) == pytest.approx(100.0)
+        assert result["dominant_emotion"] == max(result["emotion"], key=result["emotion"].get)
+
+
+@pytest.mark.parametrize("image_path", SAMPLE_IMAGES)
+def test_onnx_matches_deepface_on_sample_images(exported_model, deepface_detector, image_path):
+    """Test that the ONNX backend agrees with DeepFace on the sample images."""
+    expected = deepface_detector.detect(image_path)
+    actual = OnnxEmotionDetector(exported_model).detect(image_path)
+
+    if expected is None:
+        assert actual is None
+        return
+
+    assert actual["dominant_emotion"] == expected["dominant_emotion"]
+    for emotion, score in expected["emotion"].items():
+        # Both use the OpenCV face detector, but DeepFace also rotates the crop to level the eyes.
+        # On a 48x48 input that rotation can move single softmax scores by several points, so
+        # this bound only catches a broken export (wrong scaling or channel order shifts scores
+        # by tens of points); the dominant emotion above is the agreement that must hold.
+        assert actual["emotion"][emotion] == pytest.approx(float(score), abs=10.0)
+
+
+@pytest.mark.parametrize("image_path", SAMPLE_IMAGES)
+def test_int8_model_matches_fp32(tiny_model, image_path):
+    """Test that quantization keeps the dominant emotion."""
+    fp32 = OnnxEmotionDetector(tiny_model).detect(image_path)
+    int8 = OnnxEmotionDetector(tiny_model, quantized=True).detect(image_path)
+
+    assert (fp32 is None) == (int8 is None)
+    if fp32:
+        assert int8["dominant_emotion"] == fp32["dominant_emotion"]
+        for emotion, score in fp32["emotion"].items():
+            assert int8["emotion"][emotion] == pytest.approx(score, abs=2.0)
+
+
+@pytest.mark.parametrize("image_path", SAMPLE_IMAGES)
+def test_classifying_the_stored_crop_matches_detection(tiny_model, image_path):
+    """Test that re-scoring a face crop gives the result of the full detection."""
+    detector = OnnxEmotionDetector(tiny_model)
+    image = cv2.imread(image_path)
+    expected = detector.detect(image)
+    face = HaarFaceCropper(locator=detector.locator, size=96).crop(image)
+
+    if expected is None:
+        assert face is None
+        return
+
+    actual = detector.classify_faces([face[1]])[0]
+    assert actual["dominant_emotion"] == expected["dominant_emotion"]
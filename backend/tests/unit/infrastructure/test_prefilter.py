@@ -0,0 +1,43 @@
+import os
+
+import cv2
+import numpy as np
+
+from backend.src.infrastructure.prefilter import FacePrefilterDetector
+from backend.tests.conftest import MockEmotionDetector
+
+FACE_IMAGE = os.path.join(os.path.dirname(__file__), "../../../../data/input/img11.jpg")
+
+
+class CountingDetector(MockEmotionDetector):
+    def __init__(self):
+        super().__init__()
+        self.calls = 0
+
+    def detect(self, image):
+        self.calls += 1
+        return super().detect(image)
+
+
+def test_frame_without_face_is_rejected_without_inference():
+    """Test that an empty frame takes the fast path and is counted."""
+    inner = CountingDetector()
+    detector = FacePrefilterDetector(inner)
+
+    result = detector.detect(np.zeros((720, 1280, 3), dtype=np.uint8))
+
+    assert result is None
+    assert inner.calls == 0
+    assert detector.get_stats()["prefilter_rejected"] == 1
+
+
+def test_frame_with_face_reaches_full_detector():
+    """Test that a frame with a face is passed on to the wrapped detector."""
+    inner = CountingDetector()
+    detector = FacePrefilterDetector(inner)
+
+    result = detector.detect(cv2.imread(FACE_IMAGE))
+
+    assert result["dominant_emotion"] == "happy"
+    assert inner.calls == 1
+    assert detector.get_stats()["prefilter_passed"] == 1
@@ -0,0 +1,136 @@
+import os
+import threading
+
+import pytest
+
+from backend.src.application.stats import StatisticsService
+from backend.src.domain.models import OutputData
+from backend.src.infrastructure.sharded_storage import ShardedCSVStorage
+
+
+def _results(file_name, emotions, start=0):
+    return [
+        OutputData(file_name=file_name, dominant_emotion=emotion, emotion={emotion: 90.0},
+                   timestamp=f"{(start + i) // 60:02d}:{(start + i) % 60:02d}", seconds=float(start + i))
+        for i, emotion in enumerate(emotions)
+    ]
+
+
+def _write_in_thread(storage, batches):
+    def write():
+        for batch in batches:
+            storage.write_batch(batch)
+
+    worker = threading.Thread(target=write)
+    worker.start()
+    worker.join()
+
+
+def test_each_worker_writes_its_own_shard(tmp_path):
+    """Test that worker threads append to separate shards that merge by video and time."""
+    storage = ShardedCSVStorage(str(tmp_path))
+    _write_in_thread(storage, [_results("b.mp4", ["sad", "sad"]), _results("d.mp4", ["happy"])])
+    _write_in_thread(storage, [_results("a.mp4", ["angry"]), _results("c.mp4", ["fear", "fear"])])
+
+    rows = storage.load_all()
+
+    assert len(storage.shard_paths()) == 2
+    assert [(row["file_name"], row["timestamp"]) for row in rows] == [
+        ("a.mp4", "00:00"), ("b.mp4", "00:00"), ("b.mp4", "00:01"),
+        ("c.mp4", "00:00"), ("c.mp4", "00:01"), ("d.mp4", "00:00"),
+    ]
+
+
+def test_out_of_order_writes_start_a_new_run(tmp_path):
+    """Test that every shard stays sorted, so the k-way merge stays ordered."""
+    storage = ShardedCSVStorage(str(tmp_path))
+    storage.write_batch(_results("b.mp4", ["sad"], start=6000))  # 100:00 sorts after 99:59
+    storage.write_batch(_results("a.mp4", ["happy", "happy"]))
+
+    # A later run continues after the existing shards
+    ShardedCSVStorage(str(tmp_path)).write_batch(_results("b.mp4", ["neutral"], start=5999))
+
+    rows = list(ShardedCSVStorage(str(tmp_path)).iter_all())
+
+    assert len(storage.shard_paths()) == 3
+    assert [(row["file_name"], row["timestamp"]) for row in rows] == [
+        ("a.mp4", "00:00"), ("a.mp4", "00:01"), ("b.mp4", "99:59"), ("b.mp4", "100:00"),
+    ]
+
+
+def test_report_combines_partial_aggregates_of_shards(tmp_path):
+    """Test that shards are counted in worker processes and the partial counts are added up."""
+    storage = ShardedCSVStorage(str(tmp_path))
+    _write_in_thread(storage, [_results("show.mp4", ["happy", "happy", "sad"])])
+    _write_in_thread(storage, [_results("show.mp4", ["happy"], start=10), _results("other.mp4", ["sad"])])
+
+    saved = []
+    storage.save_stats = saved.extend
+    StatisticsService(storage, workers=2).generate_report()
+
+    stats = {s.file_name: s for s in saved}
+    assert stats["show.mp4"].total_frames == 4
+    assert stats["show.mp4"].most_frequent_emotion == "happy"
+    assert stats["show.mp4"].emotion_distribution == {"happy": 75.0, "sad": 25.0}
+    assert stats["other.mp4"].total_frames == 1
+
+
+def test_samples_within_a_second_merge_by_exact_time(tmp_path):
+    """Test that the merge orders by the seconds column, not by the whole-second timestamp."""
+    storage = ShardedCSVStorage(str(tmp_path))
+    late = OutputData("a.mp4", "sad", {"sad": 90.0}, timestamp="00:00", seconds=0.8)
+    early = OutputData("a.mp4", "happy", {"happy": 90.0}, timestamp="00:00", seconds=0.2)
+    _write_in_thread(storage, [[late]])
+    _write_in_thread(storage, [[early]])
+
+    assert [row["seconds"] for row in storage.load_all()] == ["0.2", "0.8"]
+
+
+def test_worker_process_logs_reach_the_parent(tmp_path, caplog):
+    """Test that records of the spawned aggregation workers are logged by the parent process."""
+    storage = ShardedCSVStorage(str(tmp_path))
+    _write_in_thread(storage, [_results("show.mp4", ["happy"])])
+    _write_in_thread(storage, [_results("show.mp4", [""], start=1)])  # a row the workers skip
+
+    storage.save_stats = lambda stats: None
+    StatisticsService(storage, workers=2).generate_report()
+
+    assert "Skipped 1 result rows" in caplog.text
+
+
+def test_out_of_order_runs_are_compacted_to_the_fan_in(tmp_path):
+    """Test that descending writes do not leave one shard per video for the merge to open."""
+    storage = ShardedCSVStorage(str(tmp_path), fan_in=4)
+    for i in reversed(range(20)):
+        storage.write_batch(_results(f"video{i:02d}.mp4", ["happy"]))
+        storage.flush()
+
+    rows = list(storage.iter_all())
+
+    assert len(storage.shard_paths()) <= 4
+    assert [row["file_name"] for row in rows] == [f"video{i:02d}.mp4" for i in range(20)]
+
+
+def test_shards_of_live_writers_are_not_compacted(tmp_path):
+    """Test that compaction leaves the shard a running worker still appends to."""
+    storage = ShardedCSVStorage(str(tmp_path), fan_in=2)
+    for name in ["c.mp4", "b.mp4", "a.mp4"]:
+        _write_in_thread(storage, [_results(name, ["sad"])])
+    storage.write_batch(_results("z.mp4", ["happy"]))
+    current = storage._local.shard["path"]
+
+    storage.compact()
+    storage.write_batch(_results("z.mp4", ["happy"], start=1))
+
+    assert os.path.exists(current)
+    assert [row["file_name"] for row in storage.load_all()] == ["a.mp4", "b.mp4", "c.mp4", "z.mp4", "z.mp4"]
+
+
+def test_unreadable_shards_fail_the_read(tmp_path):
+    """Test that a shard that cannot be opened raises instead of returning a partial result."""
+    storage = ShardedCSVStorage(str(tmp_path))
+    storage.write_batch(_results("a.mp4", ["happy"]))
+    os.makedirs(os.path.join(storage.shards_dir, "shard-00009.csv"))  # opening a folder fails
+
+    with pytest.raises(OSError):
+        storage.load_all()
@@ -0,0 +1,65 @@
+import csv
+
+from backend.src.domain.models import EmotionSegment, OutputData, VideoStats
+from backend.src.infrastructure.staged_storage import StagedStorage
+from backend.src.infrastructure.storage import CSVStorage
+
+
+def _results(file_name, count):
+    return [
+        OutputData(file_name=file_name, dominant_emotion="happy", emotion={"happy": 90.0},
+                   timestamp=f"00:{i:02d}", seconds=float(i))
+        for i in range(count)
+    ]
+
+
+def test_writes_reach_the_storage_only_on_commit(tmp_path):
+    """Test that staged rows and segments are stored in write order on commit."""
+    storage = CSVStorage(str(tmp_path))
+    staged = StagedStorage(storage, spill_dir=str(tmp_path))
+    staged.write_batch(_results("a.mp4", 2))
+    staged.write_segments([EmotionSegment("a.mp4", 0.0, 1.0, "happy", {"happy": 90.0}, 2)])
+    staged.write_batch(_results("a.mp4", 3)[2:])
+    staged.flush()
+
+    assert staged.load_all() == []
+
+    staged.commit()
+
+    assert [row["timestamp"] for row in staged.load_all()] == ["00:00", "00:01", "00:02"]
+    assert len(staged.load_segments()) == 1
+
+
+def test_discard_drops_the_staged_writes(tmp_path):
+    """Test that an interrupted video leaves nothing behind and the next one commits alone."""
+    storage = CSVStorage(str(tmp_path))
+    staged = StagedStorage(storage, spill_dir=str(tmp_path))
+    staged.write_batch(_results("a.mp4", 2))
+    staged.discard()
+
+    staged.write_batch(_results("b.mp4", 1))
+    staged.commit()
+
+    assert [row["file_name"] for row in storage.load_all()] == ["b.mp4"]
+
+
+def test_summaries_are_upserted_into_the_report_on_commit(tmp_path):
+    """Test that a video's summary replaces its earlier row and keeps the other videos."""
+    storage = CSVStorage(str(tmp_path))
+    storage.upsert_stats([
+        VideoStats("a.mp4", 10, "happy", {"happy": 100.0}, error_bound=4.0, confidence=0.95),
+        VideoStats("b.mp4", 10, "sad", {"sad": 100.0}, error_bound=5.0, confidence=0.95),
+    ])
+    staged = StagedStorage(storage, spill_dir=str(tmp_path))
+    staged.upsert_stats([VideoStats("a.mp4", 20, "fear", {"fear": 100.0}, error_bound=2.0, confidence=0.95)])
+
+    with open(storage.stats_csv_path, encoding="utf-8") as report:
+        assert [row["most_frequent_emotion"] for row in csv.DictReader(report)] == ["happy", "sad"]
+
+    staged.commit()
+
+    with open(storage.stats_csv_path, encoding="utf-8") as report:
+        rows = list(csv.DictReader(report))
+    assert [(row["file_name"], row["total_frames"], row["error_bound"]) for row in rows] == [
+        ("a.mp4", "20", "2.0"), ("b.mp4", "10", "5.0"),
+    ]
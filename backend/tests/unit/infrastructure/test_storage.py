@@ -0,0 +1,37 @@
+from backend.src.domain.models import VideoAggregate
+from backend.src.infrastructure.storage import CSVStorage
+
+
+def _aggregate(file_name, emotion, count=1):
+    return VideoAggregate(file_name, "Guest", "Host", "Topic", count, {emotion: count})
+
+
+def _index_lines(storage):
+    with open(storage.index_csv_path, encoding="utf-8") as index_file:
+        return len(index_file.readlines()) - 1
+
+
+def test_video_index_upserts_are_appended(tmp_path):
+    """Test that finishing a video adds one row instead of rewriting the index."""
+    storage = CSVStorage(str(tmp_path))
+    for name in ["c.mp4", "a.mp4", "b.mp4"]:
+        storage.save_aggregates([_aggregate(name, "happy")])
+    storage.save_aggregates([_aggregate("a.mp4", "sad", count=4)])
+
+    aggregates = CSVStorage(str(tmp_path)).load_aggregates()
+
+    assert _index_lines(storage) == 4
+    assert [a.file_name for a in aggregates] == ["a.mp4", "b.mp4", "c.mp4"]
+    assert aggregates[0].emotion_counts == {"sad": 4}
+
+
+def test_video_index_is_compacted_once_replaced_rows_dominate(tmp_path):
+    """Test that repeated re-analyses do not grow the index without bound."""
+    storage = CSVStorage(str(tmp_path))
+    storage.save_aggregates([_aggregate("a.mp4", "happy"), _aggregate("b.mp4", "happy")])
+    for count in range(1, 10):
+        # A new instance continues from the rows already in the file
+        CSVStorage(str(tmp_path)).save_aggregates([_aggregate("a.mp4", "sad", count=count)])
+
+    assert _index_lines(storage) <= 4
+    assert {a.file_name: a.total_frames for a in storage.load_aggregates()} == {"a.mp4": 9, "b.mp4": 1}
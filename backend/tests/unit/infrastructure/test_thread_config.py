@@ -0,0 +1,24 @@
+import os
+
+import cv2
+
+from backend.src.domain.models import ThreadBudget
+from backend.src.infrastructure.thread_config import apply_thread_budget
+
+
+def test_budget_is_applied_to_opencv_and_env(monkeypatch):
+    """Test that OpenCV and the runtime environment get the budgeted thread counts."""
+    for name in ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS",
+                 "TF_NUM_INTRAOP_THREADS", "TF_NUM_INTEROP_THREADS"):
+        monkeypatch.setenv(name, "")
+    previous = cv2.getNumThreads()
+
+    try:
+        apply_thread_budget(ThreadBudget(total_cores=8, workers=2, decode_threads=2, inference_threads=3))
+
+        assert cv2.getNumThreads() == 2
+        assert os.environ["OMP_NUM_THREADS"] == "3"
+        assert os.environ["TF_NUM_INTRAOP_THREADS"] == "6"
+        assert os.environ["TF_NUM_INTEROP_THREADS"] == "2"
+    finally:
+        cv2.setNumThreads(previous)
@@ -0,0 +1,77 @@
+import json
+import threading
+
+from backend.src.application.video import Video
+from backend.src.infrastructure.tracing import Tracer, tracer
+from backend.tests.conftest import MockEmotionDetector, MockVideoSource
+
+
+def test_disabled_tracer_records_nothing(tmp_path):
+    """Test that spans are free no-ops until tracing is started."""
+    local = Tracer()
+    with local.frame("a.mp4", 1):
+        with local.span("detect"):
+            pass
+
+    assert local.export(str(tmp_path / "trace.json")) == 0
+
+
+def test_spans_are_exported_as_chrome_trace(tmp_path):
+    """Test that spans carry the frame context and the thread they ran on."""
+    local = Tracer()
+    local.start(capacity=100)
+    with local.frame("a.mp4", 7):
+        with local.span("detect"):
+            pass
+
+    worker = threading.Thread(target=lambda: local.span("storage.flush").__enter__().__exit__(), name="writer")
+    worker.start()
+    worker.join()
+
+    path = tmp_path / "trace.json"
+    assert local.export(str(path)) == 2
+
+    events = json.loads(path.read_text())["traceEvents"]
+    spans = [event for event in events if event["ph"] == "X"]
+    assert spans[0]["name"] == "detect"
+    assert spans[0]["args"] == {"video": "a.mp4", "frame": 7}
+    assert spans[1]["cat"] == "storage"
+    assert spans[0]["tid"] != spans[1]["tid"]
+    assert {"writer", threading.current_thread().name} <= {
+        event["args"]["name"] for event in events if event["ph"] == "M"
+    }
+
+
+def test_ring_buffer_keeps_the_latest_spans(tmp_path):
+    """Test that the oldest spans are dropped once the buffer is full."""
+    local = Tracer()
+    local.start(capacity=3)
+    for i in range(10):
+        with local.span("decode", frame=i):
+            pass
+
+    path = tmp_path / "trace.json"
+    local.export(str(path))
+
+    frames = [event["args"]["frame"] for event in json.loads(path.read_text())["traceEvents"] if event["ph"] == "X"]
+    assert frames == [7, 8, 9]
+
+
+def test_video_emits_decode_and_detect_spans(tmp_path):
+    """Test that the pipeline instruments every read and every sampled frame."""
+    tracer.start()
+    try:
+        video = Video(MockVideoSource(num_frames=6, fps=10.0), MockEmotionDetector(), "show.mp4")
+        list(video.process(frame_step=3))
+    finally:
+        tracer.stop()
+
+    path = tmp_path / "trace.json"
+    tracer.export(str(path))
+    spans = [event for event in json.loads(path.read_text())["traceEvents"] if event["ph"] == "X"]
+
+    detect = [span["args"]["frame"] for span in spans if span["name"] == "detect"]
+    decode = [span["args"]["frame"] for span in spans if span["name"] == "decode"]
+    assert detect == [0, 3]
+    assert decode == [0, 1, 2, 3, 4, 5, 6]  # the last read hits the end of the stream
+    assert all(span["args"]["video"] == "show.mp4" for span in spans)
@@ -0,0 +1,66 @@
+import sys
+import time
+
+import cv2
+import numpy as np
+import pytest
+
+from backend.src.infrastructure import video_metadata
+from backend.src.infrastructure.opencv_adapter import OpenCVVideoFactory
+from backend.src.infrastructure.video_metadata import VideoMetadataIndex
+
+
+@pytest.fixture
+def video_file(tmp_path):
+    """A 40 frame MJPEG video whose frame i is filled with the gray value 5 * i."""
+    path = str(tmp_path / "Guest_Host_Topic.avi")
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), 20.0, (64, 48))
+    if not writer.isOpened():
+        pytest.skip("OpenCV was built without a video writer")
+    for i in range(40):
+        writer.write(np.full((48, 64, 3), 5 * i, dtype=np.uint8))
+    writer.release()
+    return path
+
+
+def test_metadata_is_probed_once_and_cached(tmp_path, video_file, monkeypatch):
+    """Test that the sidecar index answers from the cache until the file changes."""
+    index_path = str(tmp_path / "video_metadata.json")
+    metadata = VideoMetadataIndex(index_path, use_ffprobe=False).get(video_file)
+
+    assert (metadata.frame_count, metadata.fps, metadata.width, metadata.height) == (40, 20.0, 64, 48)
+    assert metadata.duration == pytest.approx(2.0)
+    assert metadata.codec == "MJPG"
+
+    monkeypatch.setattr(video_metadata, "probe_opencv", lambda path: pytest.fail("probed again"))
+    assert VideoMetadataIndex(index_path, use_ffprobe=False).get(video_file) == metadata
+
+
+def test_seek_returns_the_target_frame(tmp_path, video_file):
+    """Test that short and long seeks land on the requested frame."""
+    factory = OpenCVVideoFactory(VideoMetadataIndex(str(tmp_path / "index.json"), use_ffprobe=False))
+    source = factory.create(video_file)
+    source.max_grab = 10
+    assert source.open()
+
+    assert source.seek(5)  # decoded forward
+    assert abs(int(source.read().mean()) - 25) <= 3
+    assert source.seek(30)  # jumped
+    assert abs(int(source.read().mean()) - 150) <= 3
+    assert source.get_duration() == pytest.approx(2.0)
+    source.release()
+
+
+def test_hanging_ffprobe_times_out_to_opencv(tmp_path, video_file):
+    """Test that a stuck ffprobe is killed and the index falls back to the OpenCV header."""
+    ffprobe = tmp_path / "ffprobe"
+    ffprobe.write_text(f"#!{sys.executable}\nimport time\ntime.sleep(30)\n")
+    ffprobe.chmod(0o755)
+
+    start = time.monotonic()
+    assert video_metadata.probe_ffprobe(video_file, str(ffprobe), timeout=0.5) is None
+    assert time.monotonic() - start < 5
+
+    index = VideoMetadataIndex(str(tmp_path / "index.json"), probe_timeout=0.5)
+    index.ffprobe = str(ffprobe)
+    assert index.get(video_file).frame_count == 40